@@ -0,0 +1,5 @@
+"""
+Benchmarks of the QuantFoot data pipeline.
+
+Run them from the data-pipeline directory, e.g. ``python -m benchmarks.pipeline``.
+"""
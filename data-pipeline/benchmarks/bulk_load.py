@@ -0,0 +1,148 @@
+"""
+Benchmark: dlt loader file formats for the raw Postgres tables.
+
+Loads the same synthetic season of fixtures (API-Football shaped JSON in the
+``data`` column) with each loader file format and reports the extract,
+normalize and load times, rows/sec and the peak memory of the process:
+
+- ``insert_values``: multi-row INSERT statements (dlt's default for postgres)
+- ``csv``: ``COPY ... FROM STDIN`` of the normalized files
+
+Each format runs in its own process so peak RSS is not shared between runs.
+Batch size and file rotation are the usual dlt settings, e.g.
+``DATA_WRITER__BUFFER_MAX_ITEMS`` and ``DATA_WRITER__FILE_MAX_ITEMS``.
+
+Usage:
+    python -m benchmarks.bulk_load --fixtures 100000
+
+Connection settings are read from the same POSTGRES_* variables as the pipeline.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+from typing import Any, Iterator
+
+import dlt
+
+from .common import DATA_PIPELINE_DIR, postgres_credentials, write_results
+
+FORMATS = ["insert_values", "csv"]
+DATASET = "bench_bulk_load"
+
+STATUSES = ["FT", "FT", "FT", "FT", "NS", "PST", "1H"]
+
+
+def synthetic_fixtures(count: int, season: int = 2025) -> Iterator[dict[str, Any]]:
+    """Rows shaped like raw_fixtures, with a realistic fixture JSON payload."""
+    for fixture_id in range(1, count + 1):
+        home, away = fixture_id % 400 + 1, (fixture_id * 7) % 400 + 1
+        status = STATUSES[fixture_id % len(STATUSES)]
+        goals_home, goals_away = (fixture_id % 4, fixture_id % 3) if status in ("FT", "1H") else (None, None)
+        timestamp = 1720000000 + fixture_id * 3600
+        yield {
+            "fixture_id": fixture_id,
+            "fixture_date": f"{season}-08-{fixture_id % 28 + 1:02d}T18:00:00+00:00",
+            "team_id": home,
+            "season": season,
+            "status": status,
+            "data": {
+                "fixture": {
+                    "id": fixture_id,
+                    "referee": f"Referee {fixture_id % 300}",
+                    "timezone": "UTC",
+                    "date": f"{season}-08-{fixture_id % 28 + 1:02d}T18:00:00+00:00",
+                    "timestamp": timestamp,
+                    "periods": {"first": timestamp, "second": timestamp + 3600},
+                    "venue": {"id": 10000 + home, "name": f"Stadium {home}", "city": f"City {home}"},
+                    "status": {"long": "Match Finished", "short": status, "elapsed": 90},
+                },
+                "league": {
+                    "id": home % 20 + 1,
+                    "name": f"League {home % 20 + 1}",
+                    "country": "Switzerland",
+                    "logo": f"https://media.api-sports.io/football/leagues/{home % 20 + 1}.png",
+                    "flag": "https://media.api-sports.io/flags/ch.svg",
+                    "season": season,
+                    "round": f"Regular Season - {fixture_id % 38 + 1}",
+                },
+                "teams": {
+                    "home": {"id": home, "name": f"Team {home}", "logo": f"https://media.api-sports.io/football/teams/{home}.png", "winner": True},
+                    "away": {"id": away, "name": f"Team {away}", "logo": f"https://media.api-sports.io/football/teams/{away}.png", "winner": False},
+                },
+                "goals": {"home": goals_home, "away": goals_away},
+                "score": {
+                    "halftime": {"home": goals_home, "away": goals_away},
+                    "fulltime": {"home": goals_home, "away": goals_away},
+                    "extratime": {"home": None, "away": None},
+                    "penalty": {"home": None, "away": None},
+                },
+            },
+        }
+
+
+def run_format(loader_file_format: str, fixtures: int) -> dict[str, Any]:
+    """Load the synthetic fixtures with one loader file format and measure every step."""
+    pipelines_dir = tempfile.mkdtemp(prefix="bench_bulk_load_")
+    pipeline = dlt.pipeline(
+        pipeline_name=f"bench_bulk_load_{loader_file_format}",
+        pipelines_dir=pipelines_dir,
+        dataset_name=DATASET,
+        destination=dlt.destinations.postgres(credentials=postgres_credentials()),
+    )
+    raw_fixtures = dlt.resource(
+        synthetic_fixtures(fixtures),
+        name="raw_fixtures",
+        write_disposition="replace",
+        columns={"data": {"data_type": "json"}},
+    )
+
+    pipeline.run(raw_fixtures, loader_file_format=loader_file_format)
+
+    steps = {step.step: (step.finished_at - step.started_at).total_seconds() for step in pipeline.last_trace.steps}
+    with pipeline.sql_client() as client:
+        client.execute_sql(f"DROP SCHEMA IF EXISTS {DATASET} CASCADE")
+        client.execute_sql(f"DROP SCHEMA IF EXISTS {DATASET}_staging CASCADE")
+
+    return {
+        "rows": fixtures,
+        "extract_s": round(steps["extract"], 3),
+        "normalize_s": round(steps["normalize"], 3),
+        "load_s": round(steps["load"], 3),
+        "load_rows_per_s": round(fixtures / steps["load"]),
+        "total_rows_per_s": round(fixtures / sum(steps[step] for step in ("extract", "normalize", "load"))),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fixtures", type=int, default=100_000, help="Synthetic raw_fixtures rows")
+    parser.add_argument("--formats", nargs="+", default=FORMATS, choices=FORMATS)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/)")
+    parser.add_argument("--format", help=argparse.SUPPRESS)  # single run, in a child process
+    args = parser.parse_args()
+
+    if args.format:
+        print(json.dumps(run_format(args.format, args.fixtures)))
+        return
+
+    results: dict[str, Any] = {"parameters": {"fixtures": args.fixtures}}
+    for loader_file_format in args.formats:
+        child = subprocess.run(
+            [sys.executable, "-m", __spec__.name, "--format", loader_file_format, "--fixtures", str(args.fixtures)],
+            cwd=DATA_PIPELINE_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results[loader_file_format] = json.loads(child.stdout.strip().splitlines()[-1])
+
+    write_results("bulk_load", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Helpers shared by the benchmarks: database connection and result files.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+from pathlib import Path
+from typing import Any
+
+import psycopg2
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DATA_PIPELINE_DIR = BENCHMARKS_DIR.parent
+DBT_PROJECT_DIR = DATA_PIPELINE_DIR / "dbt_project"
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+
+
+def postgres_credentials(database: str | None = None) -> dict[str, Any]:
+    """Credentials of the pipeline's Postgres (POSTGRES_* variables), in dlt's format."""
+    return {
+        "database": database or os.getenv("POSTGRES_DB", "football_data"),
+        "username": os.getenv("POSTGRES_USER", "dagster"),
+        "password": os.getenv("POSTGRES_PASSWORD", "dagster_password"),
+        "host": os.getenv("POSTGRES_HOST", "localhost"),
+        "port": int(os.getenv("POSTGRES_PORT", "5432")),
+    }
+
+
+def connect(database: str | None = None) -> Any:
+    """Open an autocommit psycopg2 connection with the POSTGRES_* settings."""
+    credentials = postgres_credentials(database)
+    connection = psycopg2.connect(
+        host=credentials["host"],
+        port=credentials["port"],
+        user=credentials["username"],
+        password=credentials["password"],
+        dbname=credentials["database"],
+    )
+    connection.autocommit = True
+    return connection
+
+
+def ensure_database(database: str) -> None:
+    """Create ``database`` on the POSTGRES_* server if it does not exist yet."""
+    connection = connect("postgres")
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (database,))
+        if cursor.fetchone() is None:
+            cursor.execute(f'CREATE DATABASE "{database}"')
+    finally:
+        connection.close()
+
+
+def git_revision() -> str | None:
+    """Commit the benchmark runs on (with a "-dirty" suffix for uncommitted changes)."""
+    try:
+        revision = subprocess.run(
+            ["git", "describe", "--always", "--dirty", "--exclude", "*"],
+            cwd=BENCHMARKS_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision or None
+
+
+def write_results(benchmark: str, results: dict[str, Any], output: str | None = None) -> Path:
+    """
+    Print benchmark results and store them as JSON.
+
+    Args:
+        benchmark: Benchmark name, prefix of the result file
+        results: Measurements (JSON serializable)
+        output: Result file (default: results/<benchmark>-<commit>-<timestamp>.json)
+
+    Returns:
+        Path of the result file
+    """
+    revision = git_revision()
+    document = {
+        "benchmark": benchmark,
+        "revision": revision,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        **results,
+    }
+
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{benchmark}-{revision or 'unknown'}-{time.strftime('%Y%m%d%H%M%S')}.json"
+
+    report = json.dumps(document, indent=2)
+    print(report)
+    Path(output).write_text(report)
+    return Path(output)
@@ -0,0 +1,55 @@
+"""
+Compare two benchmark result files (e.g. of two commits).
+
+Prints every numeric measurement found in both files with its relative
+change, so regressions stand out. Timings and memory going up and throughput
+going down are flagged.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/pipeline-abc123-....json benchmarks/results/pipeline-def456-....json
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Iterator
+
+# Measurements where a higher value is better
+HIGHER_IS_BETTER = ("per_s",)
+
+
+def flatten(document: Any, prefix: str = "") -> Iterator[tuple[str, float]]:
+    """Yield (dotted path, value) for every number of a JSON document."""
+    if isinstance(document, dict):
+        for key, value in document.items():
+            yield from flatten(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(document, list):
+        for index, value in enumerate(document):
+            yield from flatten(value, f"{prefix}[{index}]")
+    elif isinstance(document, (int, float)) and not isinstance(document, bool):
+        yield prefix, float(document)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="Flag changes above this percentage")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    print(f"{baseline.get('revision')} -> {candidate.get('revision')}")
+
+    candidate_values = dict(flatten(candidate))
+    for path, before in flatten(baseline):
+        if path.startswith("parameters") or path not in candidate_values:
+            continue
+        after = candidate_values[path]
+        change = (after - before) / before * 100 if before else 0.0
+        better = after > before if path.endswith(HIGHER_IS_BETTER) else after < before
+        flag = "  <-- regression" if abs(change) >= args.threshold and not better else ""
+        print(f"{path:70} {before:>14.3f} {after:>14.3f} {change:>+8.1f}%{flag}")
+
+
+if __name__ == "__main__":
+    main()
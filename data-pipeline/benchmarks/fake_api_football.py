@@ -0,0 +1,431 @@
+"""
+Local stand-in for the API-Football v3 REST API.
+
+Serves deterministic synthetic data for the endpoints used by
+``api_football_source`` (countries, leagues, teams, teams/seasons,
+players/squads, fixtures and their details) with the same payload envelope as the real API
+(``get``/``parameters``/``errors``/``results``/``paging``/``response``).
+
+It can also behave like a busy production API:
+- ``latency_ms``/``jitter_ms``: delay every response
+- ``requests_per_minute``: per-minute quota, with the X-RateLimit-* headers;
+  requests above it get a 429 with Retry-After
+- ``daily_limit``: daily quota (x-ratelimit-requests-* headers); requests
+  above it get the API's "requests" error
+- ``error_rate``: fraction of requests answered with a 429 at random
+- ``page_size``: split list responses into pages (``paging.total``)
+
+Every served request is counted; ``GET /__stats`` returns the counters.
+
+Usage:
+    python -m benchmarks.fake_api_football --port 8799 --teams-per-league 20 --latency-ms 50
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlparse
+
+FINISHED = "FT"
+NOT_STARTED = "NS"
+POSITIONS = ["Goalkeeper", "Defender", "Midfielder", "Attacker"]
+
+
+@dataclass
+class FakeAPIConfig:
+    """Volumes and behaviour of the stand-in server."""
+
+    countries: int = 20
+    leagues: int = 5
+    teams_per_league: int = 20
+    seasons: int = 3
+    last_season: int = 2025
+    squad_size: int = 25
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    requests_per_minute: int = 0  # 0: unlimited
+    daily_limit: int = 0  # 0: unlimited
+    error_rate: float = 0
+    page_size: int = 0  # 0: no paging
+    seed: int = 42
+
+
+class FakeAPIFootball:
+    """Synthetic API-Football dataset and request accounting."""
+
+    def __init__(self, config: FakeAPIConfig):
+        self.config = config
+        self.requests: Counter[str] = Counter()
+        self.statuses: Counter[int] = Counter()
+        self.bytes_sent = 0
+        self._random = random.Random(config.seed)
+        self._minute_started = time.monotonic()
+        self._minute_count = 0
+        self._day_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def seasons(self) -> list[int]:
+        """Season years served, oldest first."""
+        return list(range(self.config.last_season - self.config.seasons + 1, self.config.last_season + 1))
+
+    def team_ids(self, league_id: Optional[int] = None) -> list[int]:
+        """Team ids, of every league or of one league."""
+        leagues = [league_id] if league_id else [self.league_id(index) for index in range(self.config.leagues)]
+        return [self.team_id(league, slot) for league in leagues for slot in range(self.config.teams_per_league)]
+
+    @staticmethod
+    def league_id(index: int) -> int:
+        return 100 + index
+
+    def team_id(self, league_id: int, slot: int) -> int:
+        return (league_id - 100) * 1000 + slot + 1
+
+    def team_league(self, team_id: int) -> int:
+        return 100 + (team_id - 1) // 1000
+
+    def country(self, index: int) -> dict[str, Any]:
+        return {"name": f"Country {index}", "code": f"C{index:02d}", "flag": f"https://media.example/flags/{index}.svg"}
+
+    def league(self, league_id: int) -> dict[str, Any]:
+        index = league_id - 100
+        return {
+            "league": {"id": league_id, "name": f"League {index}", "type": "League", "logo": f"https://media.example/leagues/{league_id}.png"},
+            "country": self.country(index % self.config.countries),
+            "seasons": [
+                {
+                    "year": season,
+                    "start": f"{season}-07-15",
+                    "end": f"{season + 1}-05-30",
+                    "current": season == self.config.last_season,
+                    "coverage": {"fixtures": {"events": True, "lineups": True, "statistics_fixtures": True}, "standings": True, "players": True},
+                }
+                for season in self.seasons
+            ],
+        }
+
+    def team(self, team_id: int) -> dict[str, Any]:
+        return {
+            "team": {"id": team_id, "name": f"Team {team_id}", "code": f"T{team_id % 1000:03d}", "country": f"Country {self.team_league(team_id) - 100}",
+                     "founded": 1880 + team_id % 120, "national": False, "logo": f"https://media.example/teams/{team_id}.png"},
+            "venue": {"id": 50000 + team_id, "name": f"Stadium {team_id}", "address": f"{team_id} Stadium Road", "city": f"City {team_id}",
+                      "capacity": 5000 + (team_id * 37) % 60000, "surface": "grass", "image": f"https://media.example/venues/{team_id}.png"},
+        }
+
+    def squad(self, team_id: int) -> dict[str, Any]:
+        return {
+            "team": {"id": team_id, "name": f"Team {team_id}", "logo": f"https://media.example/teams/{team_id}.png"},
+            "players": [
+                {"id": team_id * 100 + number, "name": f"Player {team_id}-{number}", "age": 17 + number % 19, "number": number,
+                 "position": POSITIONS[number % 4], "photo": f"https://media.example/players/{team_id * 100 + number}.png"}
+                for number in range(1, self.config.squad_size + 1)
+            ],
+        }
+
+    @lru_cache(maxsize=None)
+    def season_fixtures(self, league_id: int, season: int) -> tuple[dict[str, Any], ...]:
+        """Double round robin of a league season; fixtures before today are finished."""
+        teams = self.team_ids(league_id)
+        kickoff = datetime(season, 8, 1, 18, tzinfo=timezone.utc)
+        today = datetime.now(timezone.utc)
+        fixtures = []
+        for number, (home, away) in enumerate((home, away) for home in teams for away in teams if home != away):
+            fixture_id = (season % 100) * 10_000_000 + league_id * 10_000 + number
+            played_at = kickoff + timedelta(days=(number // max(1, len(teams) // 2)) * 3)
+            finished = played_at < today
+            goals_home, goals_away = (fixture_id % 4, fixture_id % 3) if finished else (None, None)
+            fixtures.append({
+                "fixture": {
+                    "id": fixture_id, "referee": f"Referee {fixture_id % 97}", "timezone": "UTC",
+                    "date": played_at.isoformat(), "timestamp": int(played_at.timestamp()),
+                    "periods": {"first": int(played_at.timestamp()) if finished else None, "second": None},
+                    "venue": {"id": 50000 + home, "name": f"Stadium {home}", "city": f"City {home}"},
+                    "status": {"long": "Match Finished" if finished else "Not Started",
+                               "short": FINISHED if finished else NOT_STARTED, "elapsed": 90 if finished else None},
+                },
+                "league": {"id": league_id, "name": f"League {league_id - 100}", "country": f"Country {league_id - 100}",
+                           "logo": f"https://media.example/leagues/{league_id}.png", "flag": None, "season": season,
+                           "round": f"Regular Season - {number // max(1, len(teams) // 2) + 1}"},
+                "teams": {
+                    "home": {"id": home, "name": f"Team {home}", "logo": f"https://media.example/teams/{home}.png",
+                             "winner": goals_home > goals_away if finished else None},
+                    "away": {"id": away, "name": f"Team {away}", "logo": f"https://media.example/teams/{away}.png",
+                             "winner": goals_away > goals_home if finished else None},
+                },
+                "goals": {"home": goals_home, "away": goals_away},
+                "score": {
+                    "halftime": {"home": goals_home, "away": goals_away},
+                    "fulltime": {"home": goals_home, "away": goals_away},
+                    "extratime": {"home": None, "away": None},
+                    "penalty": {"home": None, "away": None},
+                },
+            })
+        return tuple(fixtures)
+
+    def fixture_details(self, fixture: dict[str, Any]) -> dict[str, Any]:
+        """Events, lineups, team and player statistics of a finished fixture (empty before kickoff)."""
+        if fixture["fixture"]["status"]["short"] != FINISHED:
+            return {"events": [], "lineups": [], "statistics": [], "players": []}
+        fixture_id = fixture["fixture"]["id"]
+        sides = [fixture["teams"]["home"], fixture["teams"]["away"]]
+        squads = {side["id"]: self.squad(side["id"])["players"] for side in sides}
+        starters = {team_id: players[:11] for team_id, players in squads.items()}
+
+        events = []
+        for side, goals in zip(sides, (fixture["goals"]["home"], fixture["goals"]["away"])):
+            for goal in range(goals):
+                scorer = starters[side["id"]][(fixture_id + goal) % 10 + 1]
+                events.append({
+                    "time": {"elapsed": (fixture_id * (goal + 3)) % 90 + 1, "extra": None},
+                    "team": {"id": side["id"], "name": side["name"], "logo": side["logo"]},
+                    "player": {"id": scorer["id"], "name": scorer["name"]},
+                    "assist": {"id": None, "name": None},
+                    "type": "Goal", "detail": "Normal Goal", "comments": None,
+                })
+        events.sort(key=lambda event: event["time"]["elapsed"])
+
+        def player_entry(player: dict[str, Any]) -> dict[str, Any]:
+            return {"id": player["id"], "name": player["name"], "number": player["number"], "pos": player["position"][0], "grid": None}
+
+        return {
+            "events": events,
+            "lineups": [
+                {
+                    "team": {"id": side["id"], "name": side["name"], "logo": side["logo"]},
+                    "coach": {"id": 90000 + side["id"], "name": f"Coach {side['id']}", "photo": None},
+                    "formation": "4-4-2",
+                    "startXI": [{"player": player_entry(player)} for player in starters[side["id"]]],
+                    "substitutes": [{"player": player_entry(player)} for player in squads[side["id"]][11:18]],
+                }
+                for side in sides
+            ],
+            "statistics": [
+                {
+                    "team": {"id": side["id"], "name": side["name"], "logo": side["logo"]},
+                    "statistics": [
+                        {"type": "Shots on Goal", "value": (fixture_id + side["id"]) % 9},
+                        {"type": "Total Shots", "value": (fixture_id + side["id"]) % 9 + 6},
+                        {"type": "Ball Possession", "value": f"{50 + (-1) ** index * (fixture_id % 15)}%"},
+                        {"type": "Corner Kicks", "value": (fixture_id * side["id"]) % 11},
+                    ],
+                }
+                for index, side in enumerate(sides)
+            ],
+            "players": [
+                {
+                    "team": {"id": side["id"], "name": side["name"], "logo": side["logo"], "update": fixture["fixture"]["date"]},
+                    "players": [
+                        {
+                            "player": {"id": player["id"], "name": player["name"], "photo": player["photo"]},
+                            "statistics": [{
+                                "games": {"minutes": 90, "number": player["number"], "position": player["position"][0],
+                                          "rating": f"{6 + (fixture_id + player['id']) % 30 / 10:.1f}", "captain": False, "substitute": False},
+                                "goals": {"total": sum(event["player"]["id"] == player["id"] for event in events) or None},
+                                "passes": {"total": (fixture_id + player["id"]) % 60, "accuracy": None},
+                            }],
+                        }
+                        for player in starters[side["id"]]
+                    ],
+                }
+                for side in sides
+            ],
+        }
+
+    def fixtures(self, params: dict[str, str]) -> list[dict[str, Any]]:
+        if "ids" in params:
+            # Like the real API, only requests by id return the fixtures' details
+            wanted = {int(fixture_id) for fixture_id in params["ids"].split("-")}
+            return [
+                {**fixture, **self.fixture_details(fixture)}
+                for fixture_id in sorted(wanted)
+                for fixture in self.season_fixtures(self._fixture_league(fixture_id), self._fixture_season(fixture_id))
+                if fixture["fixture"]["id"] == fixture_id
+            ]
+        if "live" in params:
+            return []
+
+        season = int(params.get("season", self.config.last_season))
+        if "team" in params:
+            team_id = int(params["team"])
+            fixtures = [
+                fixture for fixture in self.season_fixtures(self.team_league(team_id), season)
+                if team_id in (fixture["teams"]["home"]["id"], fixture["teams"]["away"]["id"])
+            ]
+        else:
+            fixtures = list(self.season_fixtures(int(params["league"]), season))
+
+        if "from" in params and "to" in params:
+            start, end = date.fromisoformat(params["from"]), date.fromisoformat(params["to"])
+            fixtures = [fixture for fixture in fixtures if start <= date.fromisoformat(fixture["fixture"]["date"][:10]) <= end]
+        return fixtures
+
+    def _fixture_league(self, fixture_id: int) -> int:
+        return fixture_id % 10_000_000 // 10_000
+
+    def _fixture_season(self, fixture_id: int) -> int:
+        return self.config.last_season // 100 * 100 + fixture_id // 10_000_000
+
+    def respond(self, endpoint: str, params: dict[str, str]) -> list[Any]:
+        """The "response" array of an endpoint."""
+        if endpoint == "countries":
+            return [self.country(index) for index in range(self.config.countries)]
+        if endpoint == "leagues":
+            return [self.league(self.league_id(index)) for index in range(self.config.leagues)]
+        if endpoint == "teams":
+            if "id" in params:
+                return [self.team(int(params["id"]))]
+            return [self.team(team_id) for team_id in self.team_ids(int(params["league"]))]
+        if endpoint == "teams/seasons":
+            return self.seasons
+        if endpoint == "players/squads":
+            return [self.squad(int(params["team"]))]
+        if endpoint == "fixtures":
+            return self.fixtures(params)
+        return []
+
+    def admit(self) -> tuple[int, dict[str, str], Optional[dict[str, str]]]:
+        """
+        Count a request against the quotas.
+
+        Returns:
+            (HTTP status, rate-limit headers, API errors)
+        """
+        config = self.config
+        with self._lock:
+            now = time.monotonic()
+            if now - self._minute_started >= 60:
+                self._minute_started, self._minute_count = now, 0
+
+            headers = {}
+            if config.requests_per_minute:
+                headers["X-RateLimit-Limit"] = str(config.requests_per_minute)
+                headers["X-RateLimit-Remaining"] = str(max(0, config.requests_per_minute - self._minute_count - 1))
+            if config.daily_limit:
+                headers["x-ratelimit-requests-limit"] = str(config.daily_limit)
+                headers["x-ratelimit-requests-remaining"] = str(max(0, config.daily_limit - self._day_count - 1))
+
+            if config.requests_per_minute and self._minute_count >= config.requests_per_minute:
+                headers["Retry-After"] = str(max(1, int(60 - (now - self._minute_started))))
+                return 429, headers, None
+            if config.error_rate and self._random.random() < config.error_rate:
+                headers["Retry-After"] = "1"
+                return 429, headers, None
+            if config.daily_limit and self._day_count >= config.daily_limit:
+                return 200, headers, {"requests": "You have reached the request limit for the day"}
+
+            self._minute_count += 1
+            self._day_count += 1
+            return 200, headers, None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": sum(self.requests.values()),
+            "requests_by_endpoint": dict(self.requests),
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "bytes_sent": self.bytes_sent,
+            "config": asdict(self.config),
+        }
+
+
+def make_handler(api: FakeAPIFootball) -> type[BaseHTTPRequestHandler]:
+    """HTTP handler class bound to a dataset."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            endpoint = url.path.strip("/")
+            params = dict(parse_qsl(url.query))
+
+            if endpoint == "__stats":
+                self._send(200, api.stats(), {})
+                return
+
+            config = api.config
+            if config.latency_ms or config.jitter_ms:
+                time.sleep(max(0.0, config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000)
+
+            status, headers, errors = api.admit()
+            with api._lock:
+                api.requests[endpoint] += 1
+                api.statuses[status] += 1
+
+            if status == 429:
+                self._send(429, {"message": "Too many requests"}, headers)
+                return
+
+            response: list[Any] = [] if errors else api.respond(endpoint, params)
+            page, total = int(params.get("page", 1)), 1
+            if config.page_size and response:
+                total = -(-len(response) // config.page_size)
+                response = response[(page - 1) * config.page_size:page * config.page_size]
+
+            self._send(200, {
+                "get": endpoint,
+                "parameters": params,
+                "errors": errors or [],
+                "results": len(response),
+                "paging": {"current": page, "total": total},
+                "response": response,
+            }, headers)
+
+        def _send(self, status: int, payload: dict[str, Any], headers: dict[str, str]) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            with api._lock:
+                api.bytes_sent += len(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def serve(config: FakeAPIConfig, host: str = "127.0.0.1", port: int = 8799) -> None:
+    """Serve the stand-in API until interrupted."""
+    server = ThreadingHTTPServer((host, port), make_handler(FakeAPIFootball(config)))
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add one --option per FakeAPIConfig field."""
+    for field in fields(FakeAPIConfig):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=field.type, default=field.default)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeAPIConfig:
+    return FakeAPIConfig(**{field.name: getattr(args, field.name) for field in fields(FakeAPIConfig)})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print(f"Serving API-Football stand-in on http://{args.host}:{args.port}")
+    serve(config_from_args(args), args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
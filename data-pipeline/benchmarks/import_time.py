@@ -0,0 +1,142 @@
+"""
+Benchmark: import time of the quantfoot code location, with budgets for CI.
+
+Every Dagster process (webserver, daemon, each run worker) imports the code
+location and loads its definitions, so both are measured in fresh interpreters:
+
+- import: ``import quantfoot`` (should only cost the Dagster import)
+- load: ``quantfoot.defs()``, i.e. importing assets, sensors and resources
+  and building the Definitions (no source, pipeline or client is built)
+
+A ``python -X importtime`` run breaks the time down by top-level package and
+lists the slowest quantfoot modules. The first (warmup) run is not measured:
+it may regenerate a stale dbt manifest.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --import-budget-ms 1500 --own-budget-ms 300
+
+Exits with status 1 when a budget is exceeded.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any
+
+from .common import DATA_PIPELINE_DIR, write_results
+
+TIMED_LOAD = """
+import json, time
+started = time.perf_counter()
+import quantfoot
+imported = time.perf_counter()
+quantfoot.defs()
+loaded = time.perf_counter()
+print(json.dumps({"import_ms": 1000 * (imported - started), "load_ms": 1000 * (loaded - imported)}))
+"""
+
+
+def run_child(code: str, *options: str) -> subprocess.CompletedProcess:
+    """Run ``code`` in a fresh interpreter from the data-pipeline directory."""
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=DATA_PIPELINE_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def timed_load() -> dict[str, float]:
+    """Wall time of ``import quantfoot`` and of loading its definitions."""
+    return json.loads(run_child(TIMED_LOAD).stdout.strip().splitlines()[-1])
+
+
+def import_profile(top: int) -> dict[str, Any]:
+    """
+    Break the import of the code location down with ``-X importtime``.
+
+    Args:
+        top: Number of packages and modules listed
+
+    Returns:
+        Self time per top-level package and the slowest quantfoot modules, in ms
+    """
+    stderr = run_child("import quantfoot; quantfoot.defs()", "-X", "importtime").stderr
+
+    packages: dict[str, float] = defaultdict(float)
+    own_modules: dict[str, float] = {}
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line[len("import time:"):].split("|")
+        module = module.strip()
+        packages[module.split(".")[0]] += int(self_us) / 1000
+        if module.split(".")[0] == "quantfoot":
+            own_modules[module] = int(self_us) / 1000
+
+    return {
+        "total_ms": round(sum(packages.values()), 1),
+        "own_ms": round(packages.get("quantfoot", 0.0), 1),
+        "packages_ms": {
+            package: round(ms, 1) for package, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "own_modules_ms": {
+            module: round(ms, 1) for module, ms in sorted(own_modules.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Measured runs (median reported)")
+    parser.add_argument("--top", type=int, default=10, help="Packages and modules listed in the breakdown")
+    parser.add_argument("--import-budget-ms", type=float, help="Fail above this median 'import quantfoot' time")
+    parser.add_argument("--load-budget-ms", type=float, help="Fail above this median definitions load time")
+    parser.add_argument(
+        "--own-budget-ms",
+        type=float,
+        help="Fail above this self import time of the quantfoot modules (least machine dependent)",
+    )
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    timed_load()  # warmup: bytecode compilation, dbt manifest
+    runs = [timed_load() for _ in range(args.repeat)]
+    profile = import_profile(args.top)
+
+    results: dict[str, Any] = {
+        "parameters": {"repeat": args.repeat},
+        "import_ms": round(statistics.median(run["import_ms"] for run in runs), 1),
+        "load_ms": round(statistics.median(run["load_ms"] for run in runs), 1),
+        "import_min_ms": round(min(run["import_ms"] for run in runs), 1),
+        "load_min_ms": round(min(run["load_ms"] for run in runs), 1),
+        "profile": profile,
+    }
+
+    budgets = {
+        "import_ms": args.import_budget_ms,
+        "load_ms": args.load_budget_ms,
+        "own_ms": args.own_budget_ms,
+    }
+    measured = {"import_ms": results["import_ms"], "load_ms": results["load_ms"], "own_ms": profile["own_ms"]}
+    results["budgets"] = {name: budget for name, budget in budgets.items() if budget is not None}
+    exceeded = [
+        f"{name} {measured[name]:.1f} ms > budget {budget:.1f} ms"
+        for name, budget in budgets.items()
+        if budget is not None and measured[name] > budget
+    ]
+    results["budgets_exceeded"] = exceeded
+
+    write_results("import_time", results, args.output)
+    if exceeded:
+        print("Import time budget exceeded: " + "; ".join(exceeded), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
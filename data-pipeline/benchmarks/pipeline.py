@@ -0,0 +1,263 @@
+"""
+End-to-end benchmark: api_football_source -> Postgres -> dbt, against the local stand-in API.
+
+Starts ``fake_api_football`` in a child process, runs the real dlt resources
+into a dedicated benchmark database (BENCH_POSTGRES_DB, created if needed,
+never the pipeline's own database), then builds the dbt project on it.
+
+Reports:
+- API: requests, requests/sec, 429s and bytes served
+- dlt: extract/normalize/load times and rows loaded per table, rows/sec,
+  rows changed and unchanged rows skipped per resource
+- process: peak RSS of the pipeline (the stand-in runs in its own process)
+- dbt: elapsed time of every model and test (from run_results.json)
+
+The source is run ``--runs`` times: the first run is a cold full load, the
+following ones exercise the incremental paths (fixtures state, staging/marts merges,
+fixture details of the fixtures stored by the previous run).
+
+With ``--league-crawl`` the source follows the stand-in's leagues instead of
+its teams (one ``fixtures?league=`` call per league, see ``api_football_source``).
+
+Usage:
+    python -m benchmarks.pipeline --leagues 5 --teams-per-league 20 --latency-ms 30
+    python -m benchmarks.pipeline --leagues 5 --teams-per-league 20 --latency-ms 30 --league-crawl
+    python -m benchmarks.compare results/pipeline-a.json results/pipeline-b.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.request
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import dlt
+
+from quantfoot import destination
+from quantfoot.sources import api_football_source
+from quantfoot.sources.api_football.metrics import RequestMetrics
+
+from . import fake_api_football
+from .common import DBT_PROJECT_DIR, connect, ensure_database, postgres_credentials, write_results
+
+SCHEMAS = ["raw", "raw_staging", "staging", "marts"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_api(config: fake_api_football.FakeAPIConfig) -> tuple[multiprocessing.Process, str]:
+    """Start the stand-in API in a child process and wait until it answers."""
+    port = free_port()
+    process = multiprocessing.Process(
+        target=fake_api_football.serve, args=(config, "127.0.0.1", port), daemon=True
+    )
+    process.start()
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            fake_api_stats(base_url)
+            return process, base_url
+        except OSError:
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise
+            time.sleep(0.05)
+
+
+def fake_api_stats(base_url: str) -> dict[str, Any]:
+    with urllib.request.urlopen(f"{base_url}/__stats", timeout=5) as response:
+        return json.load(response)
+
+
+def reset_database(database: str) -> None:
+    """Drop the schemas left by a previous benchmark run."""
+    connection = connect(database)
+    try:
+        cursor = connection.cursor()
+        for schema in SCHEMAS:
+            cursor.execute(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+        cursor.execute(
+            "SELECT nspname FROM pg_namespace WHERE nspname LIKE 'raw\\_staging\\_%'"
+        )
+        for (schema,) in cursor.fetchall():
+            cursor.execute(f'DROP SCHEMA "{schema}" CASCADE')
+    finally:
+        connection.close()
+
+
+def run_source(
+    base_url: str,
+    database: str,
+    pipelines_dir: str,
+    config: fake_api_football.FakeAPIConfig,
+    max_workers: int,
+    loader_file_format: str,
+    league_crawl: bool = False,
+) -> dict[str, Any]:
+    """Load every team of the stand-in for its last season and measure each dlt step."""
+    api = fake_api_football.FakeAPIFootball(config)
+    stats_before = fake_api_stats(base_url)
+    metrics = RequestMetrics()
+
+    source = api_football_source(
+        api_key="benchmark",
+        base_url=base_url,
+        season=config.last_season,
+        team_ids=api.team_ids(),
+        league_ids=[api.league_id(index) for index in range(config.leagues)] if league_crawl else None,
+        max_workers=max_workers,
+        # The stand-in's headers set the real pace, this is only the starting point
+        requests_per_minute=config.requests_per_minute or 100_000,
+        metrics=metrics,
+    )
+    pipeline = dlt.pipeline(
+        pipeline_name="bench_api_football",
+        pipelines_dir=pipelines_dir,
+        dataset_name="raw",
+        destination=destination.postgres(credentials=postgres_credentials(database)),
+    )
+
+    started = time.perf_counter()
+    pipeline.run(source, loader_file_format=loader_file_format)
+    elapsed = time.perf_counter() - started
+
+    steps = {step.step: (step.finished_at - step.started_at).total_seconds() for step in pipeline.last_trace.steps}
+    rows = extracted_rows(pipeline)
+    stats_after = fake_api_stats(base_url)
+    requests = stats_after["requests"] - stats_before["requests"]
+    throttled = stats_after["statuses"].get("429", 0) - stats_before["statuses"].get("429", 0)
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "extract_s": round(steps.get("extract", 0), 3),
+        "normalize_s": round(steps.get("normalize", 0), 3),
+        "load_s": round(steps.get("load", 0), 3),
+        "api_requests": requests,
+        "api_requests_429": throttled,
+        "api_requests_per_s": round(requests / steps["extract"], 1) if steps.get("extract") else None,
+        "api_bytes": stats_after["bytes_sent"] - stats_before["bytes_sent"],
+        "rows": rows,
+        "rows_per_s": round(sum(rows.values()) / elapsed, 1),
+        "rows_changed": {resource: stats["rows_changed"] for resource, stats in metrics.resources().items()},
+        "rows_skipped": {resource: stats["rows_skipped"] for resource, stats in metrics.resources().items()},
+    }
+
+
+def extracted_rows(pipeline: dlt.Pipeline) -> dict[str, int]:
+    """
+    Rows extracted per table in the last run.
+
+    Taken from the extract step: the normalize metrics of the csv writer count
+    values rather than rows.
+    """
+    rows: dict[str, int] = {}
+    for metrics in pipeline.last_trace.last_extract_info.metrics.values():
+        for step_metrics in metrics:
+            for table, table_metrics in step_metrics["table_metrics"].items():
+                if not table.startswith("_dlt"):
+                    rows[table] = rows.get(table, 0) + table_metrics.items_count
+    return rows
+
+
+def run_dbt(database: str) -> dict[str, Any]:
+    """Build the dbt project on the benchmark database and collect per-node timings."""
+    dbt = shutil.which("dbt")
+    if dbt is None:
+        raise RuntimeError("dbt executable not found on PATH")
+
+    with tempfile.TemporaryDirectory(prefix="bench_dbt_") as target_path:
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [
+                dbt, "build",
+                "--project-dir", str(DBT_PROJECT_DIR),
+                "--profiles-dir", str(DBT_PROJECT_DIR),
+                "--target-path", target_path,
+                "--log-path", target_path,
+            ],
+            env={**os.environ, "POSTGRES_DB": database},
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+        run_results = json.loads((Path(target_path) / "run_results.json").read_text())
+
+    nodes = {
+        result["unique_id"]: {"status": result["status"], "execution_time_s": round(result["execution_time"], 3)}
+        for result in run_results["results"]
+    }
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "success": completed.returncode == 0,
+        "models": {node: timing for node, timing in nodes.items() if node.startswith("model.")},
+        "tests_s": round(sum(timing["execution_time_s"] for node, timing in nodes.items() if node.startswith("test.")), 3),
+        "failed": [node for node, timing in nodes.items() if timing["status"] in ("error", "fail")],
+        "skipped": [node for node, timing in nodes.items() if timing["status"] == "skipped"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    fake_api_football.add_arguments(parser)
+    parser.add_argument("--runs", type=int, default=2, help="Source runs (first one is a full load)")
+    parser.add_argument("--max-workers", type=int, default=4, help="Concurrent API requests")
+    parser.add_argument("--loader-file-format", default="csv", choices=["csv", "insert_values"])
+    parser.add_argument("--league-crawl", action="store_true", help="Crawl the leagues instead of the teams")
+    parser.add_argument("--no-dbt", action="store_true", help="Skip the dbt build")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    config = fake_api_football.config_from_args(args)
+    database = os.getenv("BENCH_POSTGRES_DB", "quantfoot_bench")
+    if database == os.getenv("POSTGRES_DB", "football_data"):
+        parser.error("BENCH_POSTGRES_DB must not be the pipeline's database, its schemas are dropped")
+
+    ensure_database(database)
+    reset_database(database)
+
+    results: dict[str, Any] = {
+        "parameters": {
+            "fake_api": asdict(config),
+            "max_workers": args.max_workers,
+            "loader_file_format": args.loader_file_format,
+            "league_crawl": args.league_crawl,
+            "database": database,
+        },
+        "runs": [],
+    }
+
+    process, base_url = start_fake_api(config)
+    pipelines_dir = tempfile.mkdtemp(prefix="bench_pipelines_")
+    try:
+        for _ in range(args.runs):
+            run = {"source": run_source(
+                base_url, database, pipelines_dir, config, args.max_workers, args.loader_file_format, args.league_crawl
+            )}
+            if not args.no_dbt:
+                run["dbt"] = run_dbt(database)
+            results["runs"].append(run)
+    finally:
+        process.terminate()
+        shutil.rmtree(pipelines_dir, ignore_errors=True)
+
+    # ru_maxrss is in kilobytes on Linux
+    results["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    write_results("pipeline", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
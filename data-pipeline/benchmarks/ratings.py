@@ -0,0 +1,132 @@
+"""
+Benchmark: fit time of the rating models on synthetic matches.
+
+Draws leagues of matches from a known Dixon-Coles model (attack/defence per
+team, home advantage, Poisson goals) and, for each size, reports:
+
+- load: building the ``Matches`` arrays from columns
+- elo: rating every match (one vectorized update per match day)
+- dixon_coles: cold fit, and warm refit after 1% more matches from the
+  previous strengths (the incremental path of the asset), with iterations
+- probabilities: outcome probabilities of every match
+- recovery: correlation of the fitted strengths with the true ones
+
+Usage:
+    python -m benchmarks.ratings --matches 10000 100000 1000000 --teams 2000
+"""
+import argparse
+import time
+from typing import Any
+
+import numpy as np
+
+from quantfoot.analytics import (
+    DixonColesParameters,
+    EloParameters,
+    EloState,
+    Matches,
+    fit_dixon_coles,
+    outcome_probabilities,
+    update_elo,
+)
+
+from .common import write_results
+
+TEAMS_PER_LEAGUE = 20
+
+
+def synthetic_matches(count: int, teams: int, days: float, seed: int = 42) -> tuple[Matches, np.ndarray, np.ndarray]:
+    """
+    Matches between teams of the same league, played over ``days``.
+
+    Returns:
+        The matches, and the true attack and defence of each team index
+    """
+    rng = np.random.default_rng(seed)
+    attack = rng.normal(0.0, 0.25, teams)
+    defence = rng.normal(0.0, 0.25, teams)
+    attack -= attack.mean()
+    defence -= defence.mean()
+
+    home = rng.integers(0, teams, count)
+    league_start = home - home % TEAMS_PER_LEAGUE
+    league_size = np.minimum(TEAMS_PER_LEAGUE, teams - league_start)
+    away = league_start + (home - league_start + rng.integers(1, league_size, count)) % league_size
+
+    goals_home = rng.poisson(np.exp(0.1 + 0.25 + attack[home] + defence[away]))
+    goals_away = rng.poisson(np.exp(0.1 + attack[away] + defence[home]))
+    matches = Matches.from_columns(
+        fixture_id=np.arange(count),
+        day=rng.uniform(0.0, days, count),
+        home_team_id=home,
+        away_team_id=away,
+        goals_home=goals_home,
+        goals_away=goals_away,
+        team_ids=np.arange(teams),
+    )
+    return matches, attack, defence
+
+
+def timed(function, *args, **kwargs) -> tuple[Any, float]:
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, round(time.perf_counter() - started, 4)
+
+
+def run_size(count: int, teams: int, days: float) -> dict[str, Any]:
+    """Time every model on ``count`` matches."""
+    (matches, attack, defence), load_s = timed(synthetic_matches, count, teams, days)
+    # Every match counts the same, so the fit can be compared with the true strengths
+    parameters = DixonColesParameters(half_life_days=1e9, window_days=1e9)
+
+    elo_parameters = EloParameters()
+    (state, _, _), elo_s = timed(update_elo, EloState.initial(matches.n_teams, elo_parameters), matches, elo_parameters)
+
+    last_day = matches.day.max()
+    previous = matches.take(matches.day < np.quantile(matches.day, 0.99))
+    cold, cold_s = timed(fit_dixon_coles, previous, last_day, parameters)
+    warm, warm_s = timed(fit_dixon_coles, matches, last_day, parameters, initial=(cold.attack, cold.defence))
+
+    lambda_home, lambda_away = warm.expected_goals(matches.home, matches.away)
+    _, probabilities_s = timed(outcome_probabilities, lambda_home, lambda_away, warm.rho)
+
+    played = np.bincount(matches.home, minlength=teams) + np.bincount(matches.away, minlength=teams) > 0
+    return {
+        "matches": count,
+        "teams": teams,
+        "load_s": load_s,
+        "elo_s": elo_s,
+        "elo_match_days": int(len(np.unique(np.floor(matches.day)))),
+        "dixon_coles_cold_s": cold_s,
+        "dixon_coles_cold_iterations": cold.iterations,
+        "dixon_coles_warm_s": warm_s,
+        "dixon_coles_warm_iterations": warm.iterations,
+        "probabilities_s": probabilities_s,
+        "matches_per_s": round(count / max(cold_s, 1e-9)),
+        "home_advantage": round(warm.home_advantage, 4),
+        "rho": round(warm.rho, 4),
+        "attack_correlation": round(float(np.corrcoef(warm.attack[played], attack[played])[0, 1]), 4),
+        "defence_correlation": round(float(np.corrcoef(warm.defence[played], defence[played])[0, 1]), 4),
+        "elo_strength_correlation": round(
+            float(np.corrcoef(state.ratings[played], (attack - defence)[played])[0, 1]), 4
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--matches", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--teams", type=int, default=2000, help="Teams, in leagues of 20")
+    parser.add_argument("--days", type=float, default=3650, help="Days the matches are spread over")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {
+        "parameters": {"matches": args.matches, "teams": args.teams, "days": args.days},
+        "sizes": [run_size(count, args.teams, args.days) for count in args.matches],
+    }
+    write_results("ratings", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
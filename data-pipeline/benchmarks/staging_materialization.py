@@ -0,0 +1,277 @@
+"""
+Benchmark: staging as views vs. staging as indexed tables.
+
+Generates a synthetic raw dataset shaped like the dlt tables (JSONB ``data``
+column included) in a scratch schema, then times the ``fixtures`` mart query
+and a few typical lookups against:
+
+- ``view``: staging views re-parsing the raw JSON on every read (default)
+- ``view_raw_indexes``: the same views, with the expression indexes created
+  on ``raw_fixtures`` by the ``create_raw_json_indexes`` macro
+- ``table``: staging stored as tables with the indexes declared in the models
+  (``staging_materialized: incremental``)
+
+The SQL is taken from the dbt models themselves, so the benchmark follows
+the models as they change. Everything lives in ``bench_*`` schemas that are
+dropped at the end (``--keep`` to inspect them).
+
+Usage:
+    python -m benchmarks.staging_materialization --fixtures 300000
+
+Connection settings are read from the same POSTGRES_* variables as the pipeline.
+"""
+import argparse
+import ast
+import re
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import jinja2
+
+from .common import DBT_PROJECT_DIR, connect, write_results
+
+STAGING_MODELS = ["stg_fixtures", "stg_teams", "stg_venues", "stg_leagues"]
+
+RAW_SCHEMA = "bench_raw"
+VIEW_SCHEMA = "bench_view"
+TABLE_SCHEMA = "bench_table"
+
+# Team ids are contiguous per league, 20 teams per league
+SYNTHETIC_DATA = """
+CREATE TABLE {raw}.raw_team_info AS
+SELECT
+    t AS team_id,
+    'Team ' || t AS team_name,
+    10000 + t AS venue_id,
+    'Stadium ' || t AS venue_name,
+    jsonb_build_object(
+        'team', jsonb_build_object('id', t, 'name', 'Team ' || t, 'code', 'T' || t,
+                                   'country', 'Country ' || (t %% 50), 'founded', 1850 + t %% 150,
+                                   'national', false, 'logo', 'https://media.example/teams/' || t || '.png'),
+        'venue', jsonb_build_object('id', 10000 + t, 'name', 'Stadium ' || t, 'address', 'Street ' || t,
+                                    'city', 'City ' || t, 'capacity', 5000 + t %% 80000,
+                                    'surface', 'grass', 'image', 'https://media.example/venues/' || t || '.png')
+    ) AS data,
+    '1700000000.0'::text AS _dlt_load_id
+FROM generate_series(1, %(teams)s) AS t;
+
+CREATE TABLE {raw}.raw_venues AS
+SELECT venue_id, venue_name, team_id, data->'venue' AS data, _dlt_load_id
+FROM {raw}.raw_team_info;
+
+CREATE TABLE {raw}.raw_leagues AS
+SELECT
+    l AS league_id,
+    'League ' || l AS league_name,
+    'Country ' || l AS country_name,
+    jsonb_build_object(
+        'league', jsonb_build_object('id', l, 'name', 'League ' || l, 'type', 'League', 'logo', 'https://media.example/leagues/' || l || '.png'),
+        'country', jsonb_build_object('name', 'Country ' || l, 'code', 'C' || l, 'flag', 'https://media.example/flags/' || l || '.svg')
+    ) AS data,
+    '1700000000.0'::text AS _dlt_load_id
+FROM generate_series(1, ceil(%(teams)s / 20.0)::int) AS l;
+
+CREATE TABLE {raw}.raw_league_seasons AS
+SELECT
+    l.league_id,
+    s AS season,
+    make_date(s, 7, 1)::text AS season_start,
+    make_date(s + 1, 5, 31)::text AS season_end,
+    s = %(last_season)s AS is_current,
+    jsonb_build_object('year', s, 'current', s = %(last_season)s) AS data,
+    '1700000000.0'::text AS _dlt_load_id
+FROM {raw}.raw_leagues l
+CROSS JOIN generate_series(%(first_season)s, %(last_season)s) AS s;
+
+CREATE TABLE {raw}.raw_fixtures AS
+WITH f AS (
+    SELECT
+        i AS fixture_id,
+        (i / 7) %% ceil(%(teams)s / 20.0)::int AS league_offset,
+        %(first_season)s + i %% (%(last_season)s - %(first_season)s + 1) AS season,
+        i %% 20 AS home_slot,
+        (i %% 20 + 1 + (i / 20) %% 19) %% 20 AS away_slot,
+        timestamp '2015-07-01' + (i %% 100000) * interval '1 hour' AS kickoff,
+        (ARRAY['FT','FT','FT','FT','NS','PST','1H'])[1 + i %% 7] AS status
+    FROM generate_series(1, %(fixtures)s) AS i
+), t AS (
+    SELECT *,
+        least(league_offset * 20 + home_slot + 1, %(teams)s) AS home_id,
+        least(league_offset * 20 + away_slot + 1, %(teams)s) AS away_id,
+        CASE WHEN status IN ('FT', '1H') THEN fixture_id %% 4 END AS goals_home,
+        CASE WHEN status IN ('FT', '1H') THEN fixture_id %% 3 END AS goals_away
+    FROM f
+)
+SELECT
+    fixture_id,
+    kickoff::text AS fixture_date,
+    home_id AS team_id,
+    season,
+    status,
+    jsonb_build_object(
+        'fixture', jsonb_build_object(
+            'id', fixture_id, 'referee', 'Referee ' || fixture_id %% 300, 'timezone', 'UTC',
+            'date', kickoff, 'timestamp', extract(epoch FROM kickoff)::bigint,
+            'venue', jsonb_build_object('id', 10000 + home_id, 'name', 'Stadium ' || home_id, 'city', 'City ' || home_id),
+            'status', jsonb_build_object('long', status, 'short', status, 'elapsed', CASE WHEN status = 'FT' THEN 90 END)
+        ),
+        'league', jsonb_build_object(
+            'id', league_offset + 1, 'name', 'League ' || (league_offset + 1), 'country', 'Country ' || (league_offset + 1),
+            'logo', 'https://media.example/leagues/' || (league_offset + 1) || '.png', 'flag', null,
+            'season', season, 'round', 'Regular Season - ' || (1 + fixture_id %% 38)
+        ),
+        'teams', jsonb_build_object(
+            'home', jsonb_build_object('id', home_id, 'name', 'Team ' || home_id, 'logo', 'https://media.example/teams/' || home_id || '.png', 'winner', goals_home > goals_away),
+            'away', jsonb_build_object('id', away_id, 'name', 'Team ' || away_id, 'logo', 'https://media.example/teams/' || away_id || '.png', 'winner', goals_away > goals_home)
+        ),
+        'goals', jsonb_build_object('home', goals_home, 'away', goals_away),
+        'score', jsonb_build_object(
+            'halftime', jsonb_build_object('home', goals_home / 2, 'away', goals_away / 2),
+            'fulltime', jsonb_build_object('home', goals_home, 'away', goals_away),
+            'extratime', jsonb_build_object('home', null, 'away', null),
+            'penalty', jsonb_build_object('home', null, 'away', null)
+        )
+    ) AS data,
+    '1700000000.0'::text AS _dlt_load_id
+FROM t;
+
+ANALYZE {raw}.raw_team_info;
+ANALYZE {raw}.raw_venues;
+ANALYZE {raw}.raw_leagues;
+ANALYZE {raw}.raw_league_seasons;
+ANALYZE {raw}.raw_fixtures;
+"""
+
+# Typical reads of the marts layer: (name, SQL with {schema})
+QUERIES = [
+    ("fixtures_mart_full", "SELECT count(*) FROM ({mart}) AS m"),
+    ("fixtures_of_one_team", "SELECT count(*) FROM ({mart}) AS m WHERE m.home_team_id = 42 OR m.away_team_id = 42"),
+    ("fixtures_of_one_league_season", "SELECT count(*) FROM ({mart}) AS m WHERE m.league_id = 3 AND m.season = %(last_season)s"),
+    ("team_season_goals", """
+        SELECT home_team_id, sum(goals_home)
+        FROM {schema}.stg_fixtures
+        WHERE league_id = 3 AND season = %(last_season)s
+        GROUP BY home_team_id
+    """),
+]
+
+CONFIG_BLOCK = re.compile(r"\A\s*\{\{.*?^\}\}\s*$", re.DOTALL | re.MULTILINE)
+INCREMENTAL_BLOCK = re.compile(r"\{%\s*if is_incremental\(\)\s*%\}.*?\{%\s*endif\s*%\}", re.DOTALL)
+SOURCE_CALL = re.compile(r"\{\{\s*source\('raw',\s*'(\w+)'\)\s*\}\}")
+REF_CALL = re.compile(r"\{\{\s*ref\('(\w+)'\)\s*\}\}")
+INDEXES_ARG = re.compile(r"indexes=(\[.*?\])\s*\)", re.DOTALL)
+
+
+def render_model(path: Path, schema: str) -> str:
+    """
+    Turn a dbt model into plain SQL: drop the config and incremental blocks and
+    point source()/ref() at the benchmark schemas.
+    """
+    sql = path.read_text()
+    sql = CONFIG_BLOCK.sub("", sql)
+    sql = INCREMENTAL_BLOCK.sub("", sql)
+    sql = SOURCE_CALL.sub(lambda match: f"{RAW_SCHEMA}.{match.group(1)}", sql)
+    sql = REF_CALL.sub(lambda match: f"{schema}.{match.group(1)}", sql)
+    return sql.strip()
+
+
+def model_indexes(path: Path) -> list[dict[str, Any]]:
+    """Indexes declared in a model's config() block."""
+    match = INDEXES_ARG.search(path.read_text())
+    return ast.literal_eval(match.group(1)) if match else []
+
+
+def raw_index_sql() -> str:
+    """SQL of the create_raw_json_indexes macro, rendered for the benchmark raw schema."""
+    macro = (DBT_PROJECT_DIR / "macros" / "create_raw_json_indexes.sql").read_text()
+    return jinja2.Template(macro + f"{{{{ create_raw_json_indexes('{RAW_SCHEMA}') }}}}").render()
+
+
+def timed(function: Callable[[], Any]) -> float:
+    """Seconds taken by a call."""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def build_staging(cursor: Any, schema: str, materialized: str) -> float:
+    """Create the staging models as views or indexed tables, return the build time."""
+    start = time.perf_counter()
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema}")
+    for model in STAGING_MODELS:
+        path = DBT_PROJECT_DIR / "models" / "staging" / f"{model}.sql"
+        relation = "VIEW" if materialized == "view" else "TABLE"
+        cursor.execute(f"CREATE {relation} {schema}.{model} AS {render_model(path, schema)}")
+        if materialized == "table":
+            for number, index in enumerate(model_indexes(path)):
+                unique = "UNIQUE " if index.get("unique") else ""
+                columns = ", ".join(index["columns"])
+                cursor.execute(f"CREATE {unique}INDEX {model}_{number} ON {schema}.{model} ({columns})")
+            cursor.execute(f"ANALYZE {schema}.{model}")
+    return time.perf_counter() - start
+
+
+def run_queries(cursor: Any, schema: str, params: dict[str, Any], repeat: int) -> dict[str, dict[str, float]]:
+    """Time every query ``repeat`` times (after one warm-up run)."""
+    mart = render_model(DBT_PROJECT_DIR / "models" / "marts" / "fixtures.sql", schema)
+    results = {}
+    for name, template in QUERIES:
+        sql = template.format(mart=mart.replace("%", "%%"), schema=schema)
+        cursor.execute(sql, params)
+        timings = [timed(lambda: cursor.execute(sql, params)) for _ in range(repeat)]
+        results[name] = {
+            "median_s": round(statistics.median(timings), 4),
+            "min_s": round(min(timings), 4),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fixtures", type=int, default=300_000, help="Synthetic raw_fixtures rows")
+    parser.add_argument("--teams", type=int, default=2_000, help="Synthetic teams (20 per league)")
+    parser.add_argument("--seasons", type=int, default=10, help="Seasons spread over the fixtures")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/)")
+    parser.add_argument("--keep", action="store_true", help="Keep the bench_* schemas")
+    args = parser.parse_args()
+
+    params = {
+        "fixtures": args.fixtures,
+        "teams": args.teams,
+        "first_season": 2025 - args.seasons + 1,
+        "last_season": 2025,
+    }
+
+    connection = connect()
+    cursor = connection.cursor()
+    results: dict[str, Any] = {"parameters": params}
+    try:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {RAW_SCHEMA} CASCADE; CREATE SCHEMA {RAW_SCHEMA}")
+        results["generate_raw_s"] = round(
+            timed(lambda: cursor.execute(SYNTHETIC_DATA.format(raw=RAW_SCHEMA), params)), 3
+        )
+
+        results["view"] = {"build_s": round(build_staging(cursor, VIEW_SCHEMA, "view"), 3)}
+        results["view"]["queries"] = run_queries(cursor, VIEW_SCHEMA, params, args.repeat)
+
+        results["raw_indexes_build_s"] = round(timed(lambda: cursor.execute(raw_index_sql())), 3)
+        cursor.execute(f"ANALYZE {RAW_SCHEMA}.raw_fixtures")
+        results["view_raw_indexes"] = {"queries": run_queries(cursor, VIEW_SCHEMA, params, args.repeat)}
+
+        results["table"] = {"build_s": round(build_staging(cursor, TABLE_SCHEMA, "table"), 3)}
+        results["table"]["queries"] = run_queries(cursor, TABLE_SCHEMA, params, args.repeat)
+    finally:
+        if not args.keep:
+            cursor.execute(
+                f"DROP SCHEMA IF EXISTS {TABLE_SCHEMA}, {VIEW_SCHEMA}, {RAW_SCHEMA} CASCADE"
+            )
+        connection.close()
+
+    write_results("staging_materialization", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,17 +15,18 @@ cd "$(dirname "$0")"
 echo ""
 echo "Step 1: Building marts tables with automatic constraints..."
 echo "   → post-hooks apply PK, FK, CHECK, NOT NULL automatically"
-dbt build --select marts --target prod
+echo "   → marts are incremental: pass --full-refresh to rebuild them from scratch"
+dbt build --select marts --target prod "$@"
 
-# Step 2: Run tests to validate data quality
+# Step 2: Validate the rows (dbt build already ran the schema tests, one query each)
 echo ""
-echo "Step 2: Running data quality tests..."
-dbt test --select marts --target prod
+echo "Step 2: Validating data quality (one scan per table, see quantfoot/validation.py)..."
+(cd .. && python -m quantfoot.validation marts.teams marts.players marts.fixtures)
 
 # Step 3: Validate constraints are in place
 echo ""
 echo "Step 3: Validating database constraints..."
-dbt run-operation validate_constraints --target prod
+dbt run-operation validate_constraints --args '{schema_name: marts}' --target prod
 
 # Step 4: Generate documentation
 echo ""
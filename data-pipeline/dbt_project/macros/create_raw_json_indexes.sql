@@ -0,0 +1,56 @@
+{% macro create_raw_json_indexes(raw_schema='raw') %}
+
+{#-
+    Expression indexes on the JSON paths staging and marts join on, plus
+    _dlt_load_id for the incremental filters. Tables are owned by dlt and may
+    not exist before the first load, so every index is created conditionally.
+
+    An index created on the partitioned raw_fixtures would cascade to every
+    season partition, frozen ones included (see quantfoot/seasons.py): its
+    indexes are created on the partitions of the seasons that are not frozen
+    instead (e.g. raw_fixtures_2025_home_team_id), and those earlier versions
+    created on the partitioned table are dropped with their partitions' copies.
+-#}
+
+{%- set indexes = [
+    ('raw_fixtures', 'home_team_id', "(((data->'teams'->'home'->>'id')::int))"),
+    ('raw_fixtures', 'away_team_id', "(((data->'teams'->'away'->>'id')::int))"),
+    ('raw_fixtures', 'league_season', "(((data->'league'->>'id')::int), ((data->'league'->>'season')::int))"),
+    ('raw_fixtures', 'venue_id', "(((data->'fixture'->'venue'->>'id')::int))"),
+    ('raw_fixtures', 'load_id', "(_dlt_load_id)"),
+    ('raw_team_info', 'load_id', "(_dlt_load_id)"),
+    ('raw_venues', 'load_id', "(_dlt_load_id)"),
+    ('raw_players', 'load_id', "(_dlt_load_id)"),
+] -%}
+{%- set frozen = frozen_seasons(raw_schema) -%}
+
+DO $$
+DECLARE
+    partition_name text;
+BEGIN
+{%- for table, suffix, expression in indexes %}
+    IF to_regclass('{{ raw_schema }}.{{ table }}') IS NULL THEN
+        NULL;
+    ELSIF (SELECT relkind FROM pg_class WHERE oid = '{{ raw_schema }}.{{ table }}'::regclass) = 'p' THEN
+        DROP INDEX IF EXISTS {{ raw_schema }}.ix_{{ table }}_{{ suffix }};
+        FOR partition_name IN
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = '{{ raw_schema }}.{{ table }}'::regclass
+            {%- if frozen %}
+            AND c.relname NOT IN ('{{ table }}_{{ frozen | join("', '" ~ table ~ "_") }}')
+            {%- endif %}
+        LOOP
+            EXECUTE format(
+                'CREATE INDEX IF NOT EXISTS %I ON %I.%I {{ expression | replace("'", "''") }}',
+                partition_name || '_{{ suffix }}', '{{ raw_schema }}', partition_name
+            );
+        END LOOP;
+    ELSE
+        CREATE INDEX IF NOT EXISTS ix_{{ table }}_{{ suffix }} ON {{ raw_schema }}.{{ table }} {{ expression }};
+    END IF;
+{%- endfor %}
+END $$;
+
+{% endmacro %}
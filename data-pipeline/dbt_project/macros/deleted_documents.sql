@@ -0,0 +1,85 @@
+{#-
+    Documents of entities deleted from the marts.
+
+    A document is only regenerated when its entity changed, so the document
+    of a team, player or fixture deleted from its mart would stay in
+    documents (and its static export) for good. The documents pre-hook
+    deletes them and records them in <schema>.documents_deleted, read by the
+    static export to remove their files (quantfoot/documents.py), with the
+    teams whose pages showed them (regenerated by the same build):
+
+        pre_hook=["{{ delete_orphan_documents(this) }}"]
+
+    Full builds (blue/green, full refresh) generate no document for a deleted
+    entity: the live documents that have none are recorded instead, and the
+    records of the live schema are carried over into the shadow one. Records
+    older than deleted_documents_retention_days are dropped.
+-#}
+
+{% macro deleted_documents_table(model_relation) -%}
+    {{ model_relation.schema }}.{{ model_relation.identifier }}_deleted
+{%- endmacro %}
+
+
+{% macro delete_orphan_documents(model_relation, live_schema='marts') %}
+{%- set deleted = deleted_documents_table(model_relation) -%}
+{%- set live = none -%}
+{%- if execute and not is_incremental() -%}
+    {%- set live = adapter.get_relation(database=model_relation.database, schema=live_schema, identifier=model_relation.identifier) -%}
+{%- endif -%}
+create table if not exists {{ deleted }} (
+    doc_type varchar not null,
+    doc_key varchar not null,
+    deleted_at timestamptz not null,
+    -- Teams whose pages showed the document (a player's team, a fixture's teams)
+    team_ids bigint[] not null default '{}',
+    primary key (doc_type, doc_key)
+);
+
+delete from {{ deleted }}
+where deleted_at < now() - interval '{{ var("deleted_documents_retention_days", 30) }} days';
+
+{% if is_incremental() or live -%}
+{%- set live_deleted = adapter.get_relation(database=model_relation.database, schema=live_schema, identifier=model_relation.identifier ~ '_deleted') if live else none -%}
+{%- if live_deleted and live_schema != model_relation.schema %}
+insert into {{ deleted }} (doc_type, doc_key, deleted_at, team_ids)
+select doc_type, doc_key, deleted_at, team_ids from {{ live_deleted }}
+on conflict (doc_type, doc_key) do nothing;
+{% endif %}
+
+with orphans as (
+    {% if is_incremental() -%}
+    delete from {{ model_relation }} d
+    {%- else -%}
+    select d.doc_type, d.doc_key, {{ _document_team_ids('d.doc_type', 'd.doc') }} as team_ids
+    from {{ live }} d
+    {%- endif %}
+    where (d.doc_type = 'team' and not exists (
+            select 1 from {{ ref('teams') }} t where t.team_id = d.doc_key::bigint
+        ))
+        or (d.doc_type = 'player' and not exists (
+            select 1 from {{ ref('players') }} p where p.player_id = d.doc_key::bigint
+        ))
+        or (d.doc_type = 'fixture' and not exists (
+            select 1 from {{ ref('fixtures') }} f where f.fixture_id = d.doc_key::bigint
+        ))
+    {%- if is_incremental() %}
+    returning d.doc_type, d.doc_key, {{ _document_team_ids('d.doc_type', 'd.doc') }} as team_ids
+    {%- endif %}
+)
+
+insert into {{ deleted }} (doc_type, doc_key, deleted_at, team_ids)
+select doc_type, doc_key, now(), team_ids
+from orphans
+on conflict (doc_type, doc_key) do update set deleted_at = excluded.deleted_at, team_ids = excluded.team_ids
+{%- endif %}
+{% endmacro %}
+
+
+{% macro _document_team_ids(doc_type, doc) -%}
+    case {{ doc_type }}
+        when 'player' then array[({{ doc }}->'team'->>'id')::bigint]
+        when 'fixture' then array[({{ doc }}->'homeTeam'->>'teamId')::bigint, ({{ doc }}->'awayTeam'->>'teamId')::bigint]
+        else '{}'::bigint[]
+    end
+{%- endmacro %}
@@ -0,0 +1,35 @@
+{% macro ensure_constraint(relation, constraint_name, definition) %}
+
+{#-
+    Add a constraint only if the table does not have it yet.
+    Incremental marts keep their constraints between runs, so post-hooks
+    must be idempotent instead of failing on "constraint already exists".
+
+    On a full refresh, the previous table is still there as
+    "<identifier>__dbt_backup" with its own constraint, and the name of a
+    primary key or unique index must be unique in the schema: the backup's
+    constraint is renamed out of the way (the backup is dropped at the end).
+-#}
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_constraint
+        WHERE conname = '{{ constraint_name }}'
+        AND conrelid = '{{ relation.schema }}.{{ relation.identifier }}'::regclass
+    ) THEN
+        IF EXISTS (
+            SELECT 1
+            FROM pg_constraint
+            WHERE conname = '{{ constraint_name }}'
+            AND conrelid = to_regclass('{{ relation.schema }}.{{ relation.identifier }}__dbt_backup')
+        ) THEN
+            ALTER TABLE {{ relation.schema }}.{{ relation.identifier }}__dbt_backup
+                RENAME CONSTRAINT {{ constraint_name }} TO {{ constraint_name }}__dbt_backup;
+        END IF;
+        ALTER TABLE {{ relation }} ADD CONSTRAINT {{ constraint_name }} {{ definition }};
+    END IF;
+END $$
+
+{% endmacro %}
@@ -0,0 +1,19 @@
+{% macro frozen_seasons(raw_schema='raw') %}
+
+{#-
+    Seasons that are frozen (raw.frozen_seasons, see quantfoot/seasons.py):
+    incremental builds never rewrite their partitions.
+-#}
+
+{%- if not execute -%}
+    {{ return([]) }}
+{%- endif -%}
+
+{%- set exists = run_query("select to_regclass('" ~ raw_schema ~ ".frozen_seasons') is not null").columns[0].values()[0] -%}
+{%- if not exists -%}
+    {{ return([]) }}
+{%- endif -%}
+
+{{ return(run_query('select season from ' ~ raw_schema ~ '.frozen_seasons order by season').columns[0].values() | list) }}
+
+{% endmacro %}
@@ -0,0 +1,126 @@
+{#-
+    List partitioning of table models, configured with partition_by (a
+    column): one partition per value, named "<table>_<value>" (e.g.
+    fixtures_2025), created when a build first writes a value.
+
+    - Creating the table (first build, full refresh): the rows are staged in
+      a temporary table, then inserted into the partitioned table
+    - Incremental merges: the partitions of the new values are created, and
+      the merge only reads the target partitions of the values it writes. A
+      table created before it was partitioned is merged as is until its
+      next full refresh
+
+    Full refreshes build the table as "<table>__dbt_tmp", so its partitions
+    are named after it: add "{{ name_list_partitions(this) }}" to the
+    model's post-hooks.
+-#}
+
+{% macro postgres__create_table_as(temporary, relation, sql) -%}
+  {%- set partition_by = config.get('partition_by') -%}
+  {%- if temporary or not partition_by -%}
+    {{ dbt.postgres__create_table_as(temporary, relation, sql) }}
+  {%- else -%}
+    {%- set staged = relation.identifier ~ '__dbt_partitioned' -%}
+    create temporary table {{ staged }} as (
+      {{ sql }}
+    );
+    create table {{ relation }} (like {{ staged }}) partition by list ({{ partition_by }});
+    {{ create_list_partitions(relation, staged, partition_by) }};
+    insert into {{ relation }} select * from {{ staged }};
+    drop table {{ staged }};
+  {%- endif -%}
+{%- endmacro %}
+
+
+{% macro postgres__get_incremental_merge_sql(arg_dict) %}
+  {%- set partition_by = config.get('partition_by') -%}
+  {%- set target = arg_dict["target_relation"] -%}
+  {%- if not partition_by -%}
+    {% do return(dbt.default__get_incremental_merge_sql(arg_dict)) %}
+  {%- endif -%}
+
+  {%- set kind = run_query("select relkind from pg_class where oid = '" ~ target ~ "'::regclass").columns[0].values()[0] -%}
+  {%- if kind != 'p' -%}
+    {% do exceptions.warn(target ~ ' is not partitioned yet, a full refresh partitions it by ' ~ partition_by) %}
+    {% do return(dbt.default__get_incremental_merge_sql(arg_dict)) %}
+  {%- endif -%}
+
+  {%- set source = arg_dict["temp_relation"] -%}
+  {%- set values_query -%}
+    select distinct {{ partition_by }}::text from {{ source }} where {{ partition_by }} is not null
+  {%- endset -%}
+  {%- set values = run_query(values_query).columns[0].values() -%}
+
+  {#- Constants, so the planner prunes the other partitions of the target -#}
+  {%- set predicates = [] + (arg_dict["incremental_predicates"] or []) -%}
+  {%- if values -%}
+    {%- set literals = [] -%}
+    {%- for value in values -%}
+      {%- do literals.append("'" ~ value ~ "'") -%}
+    {%- endfor -%}
+    {%- do predicates.append('DBT_INTERNAL_DEST.' ~ partition_by ~ ' in (' ~ literals | join(', ') ~ ')') -%}
+  {%- endif -%}
+
+  {% set merge_sql %}
+    {{ create_list_partitions(target, source, partition_by) }};
+    {{ get_merge_sql(target, source, arg_dict["unique_key"], arg_dict["dest_columns"], predicates) }}
+  {% endset %}
+  {% do return(merge_sql) %}
+{% endmacro %}
+
+
+{% macro create_list_partitions(relation, source, column) %}
+DO $$
+DECLARE
+    value text;
+BEGIN
+    FOR value IN SELECT DISTINCT {{ column }}::text FROM {{ source }} WHERE {{ column }} IS NOT NULL LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I.%I PARTITION OF %I.%I FOR VALUES IN (%L)',
+            '{{ relation.schema }}', '{{ relation.identifier }}_' || value,
+            '{{ relation.schema }}', '{{ relation.identifier }}', value
+        );
+    END LOOP;
+END $$
+{% endmacro %}
+
+
+{% macro name_list_partitions(relation) %}
+
+{#-
+    Rename the partitions of a table built as "<table>__dbt_tmp" to
+    "<table>_<value>". The replaced table is still there as
+    "<table>__dbt_backup" (dropped at the end of the build): its partitions
+    are renamed out of the way.
+-#}
+
+{%- set prefix = relation.identifier ~ '__dbt_tmp_' -%}
+
+DO $$
+DECLARE
+    partition_name text;
+    value text;
+BEGIN
+    FOR partition_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = '{{ relation }}'::regclass
+        AND starts_with(c.relname, '{{ prefix }}')
+    LOOP
+        value := substr(partition_name, length('{{ prefix }}') + 1);
+        IF to_regclass(format('%I.%I', '{{ relation.schema }}', '{{ relation.identifier }}_' || value)) IS NOT NULL THEN
+            EXECUTE format(
+                'ALTER TABLE %I.%I RENAME TO %I',
+                '{{ relation.schema }}', '{{ relation.identifier }}_' || value,
+                '{{ relation.identifier }}__dbt_backup_' || value
+            );
+        END IF;
+        EXECUTE format(
+            'ALTER TABLE %I.%I RENAME TO %I',
+            '{{ relation.schema }}', partition_name, '{{ relation.identifier }}_' || value
+        );
+    END LOOP;
+END $$
+
+{% endmacro %}
@@ -0,0 +1,118 @@
+{#-
+    Loads an incremental mart has not processed yet.
+
+    dlt load ids are the timestamps the loads started at, not the order they
+    were committed in: a long partition run (or the live poller's upserts)
+    can commit after a build, with a lower load id than rows already built,
+    so a "source_load_id > max(source_load_id)" high-water mark skips its
+    rows for good. Marts (and staging tables, with staging_materialized:
+    incremental) track instead the loads completed since their last
+    build (raw._dlt_loads, written by dlt once a load is committed, ordered
+    by inserted_at).
+
+    Every build records, in a pre-hook, the loads it processes in
+    <schema>.dbt_load_watermarks: every load completed up to the newest
+    inserted_at it sees, less load_lookback_minutes, plus the ids of the
+    loads it sees within that lookback (a load whose inserted_at was taken
+    just before a build may commit after it). The model then selects the
+    rows of the loads processed now and not by the previous build:
+
+        pre_hook=["{{ record_load_watermark(this) }}"]
+        ...
+        where source_load_id >= {{ first_unprocessed_load_id(this) }}
+
+    source_load_id is the greatest load id of a row's inputs, so it is at
+    least the load id of any input loaded since the last build. When no load
+    was completed since, the bound is null and no row is selected.
+
+    Marts built on other marts (upstream) only process the loads every
+    upstream mart has processed, so a load completed between an upstream
+    build and theirs is picked up by their next build. The pre-hook runs in
+    the model's transaction: a failed build keeps the previous watermark.
+-#}
+
+{% macro load_watermarks_table(model_relation) -%}
+    {{ model_relation.schema }}.dbt_load_watermarks
+{%- endmacro %}
+
+
+{% macro load_lookback() -%}
+    interval '{{ var("load_lookback_minutes", 10) }} minutes'
+{%- endmacro %}
+
+
+{% macro record_load_watermark(model_relation, upstream=[], raw_schema='raw') %}
+{%- set watermarks = load_watermarks_table(model_relation) -%}
+-- Models built concurrently into a new schema all create the table: the
+-- ones that lose the race wait for the winner's commit and use its table
+DO $$
+BEGIN
+    create table if not exists {{ watermarks }} (
+        model varchar primary key,
+        -- Every load completed up to inserted_at less the lookback is processed,
+        -- and the loads of load_ids among those completed within the lookback
+        inserted_at timestamptz,
+        load_ids varchar[] not null default '{}',
+        -- The same, as of the previous build
+        previous_inserted_at timestamptz,
+        previous_load_ids varchar[] not null default '{}',
+        updated_at timestamptz not null default now()
+    );
+EXCEPTION WHEN unique_violation OR duplicate_table THEN
+    NULL;
+END $$;
+
+with previous as (
+    select inserted_at from {{ watermarks }} where model = '{{ model_relation.identifier }}'
+),
+
+-- Loads that can be processed now
+candidates as (
+    select l.load_id, l.inserted_at
+    from {{ raw_schema }}._dlt_loads l
+    where l.status = 0
+      and l.inserted_at > coalesce((select inserted_at from previous) - {{ load_lookback() }}, '-infinity')
+      {%- if upstream %}
+      -- processed by every upstream mart
+      and (
+          select count(*)
+          from {{ watermarks }} u
+          where u.model in ('{{ upstream | join("', '") }}')
+            and (l.inserted_at <= u.inserted_at - {{ load_lookback() }} or l.load_id = any(u.load_ids))
+      ) = {{ upstream | length }}
+      {%- endif %}
+),
+
+watermark as (
+    select coalesce(max(inserted_at), (select inserted_at from previous)) as inserted_at
+    from candidates
+)
+
+insert into {{ watermarks }} as w (model, inserted_at, load_ids)
+select
+    '{{ model_relation.identifier }}',
+    m.inserted_at,
+    array(select c.load_id from candidates c where c.inserted_at > m.inserted_at - {{ load_lookback() }})
+from watermark m
+on conflict (model) do update set
+    previous_inserted_at = w.inserted_at,
+    previous_load_ids = w.load_ids,
+    inserted_at = excluded.inserted_at,
+    load_ids = excluded.load_ids,
+    updated_at = now()
+{% endmacro %}
+
+
+{% macro first_unprocessed_load_id(model_relation, raw_schema='raw') -%}
+(
+    select min(l.load_id)
+    from {{ raw_schema }}._dlt_loads l
+    join {{ load_watermarks_table(model_relation) }} w on w.model = '{{ model_relation.identifier }}'
+    where l.status = 0
+      -- processed by this build
+      and (l.inserted_at <= w.inserted_at - {{ load_lookback() }} or l.load_id = any(w.load_ids))
+      -- and not by the previous one
+      and l.inserted_at > coalesce(w.previous_inserted_at - {{ load_lookback() }}, '-infinity')
+      and l.load_id <> all(w.previous_load_ids)
+)
+{%- endmacro %}
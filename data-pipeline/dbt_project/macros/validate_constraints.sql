@@ -1,136 +1,122 @@
-{% macro validate_constraints() %}
-
-{%- set schema = target.schema -%}
-
--- ==============================================
--- VALIDATE DATABASE CONSTRAINTS
--- ==============================================
-
-DO $$
-DECLARE
-    constraint_count INTEGER;
-    index_count INTEGER;
-    orphan_count INTEGER;
-BEGIN
-    RAISE NOTICE '==============================================';
-    RAISE NOTICE 'VALIDATING MART CONSTRAINTS';
-    RAISE NOTICE '==============================================';
-    
-    -- Check Primary Keys
-    SELECT COUNT(*) INTO constraint_count
-    FROM information_schema.table_constraints
-    WHERE constraint_schema = '{{ schema }}'
-    AND constraint_type = 'PRIMARY KEY'
-    AND table_name IN ('players', 'teams', 'fixtures');
-    
-    RAISE NOTICE '';
-    RAISE NOTICE '1. PRIMARY KEYS: % found (expected: 3)', constraint_count;
-    IF constraint_count < 3 THEN
-        RAISE WARNING '   ❌ Missing primary keys!';
-    ELSE
-        RAISE NOTICE '   ✅ All primary keys present';
-    END IF;
-    
-    -- Check Foreign Keys
-    SELECT COUNT(*) INTO constraint_count
-    FROM information_schema.table_constraints
-    WHERE constraint_schema = '{{ schema }}'
-    AND constraint_type = 'FOREIGN KEY';
-    
-    RAISE NOTICE '';
-    RAISE NOTICE '2. FOREIGN KEYS: % found (expected: 3+)', constraint_count;
-    IF constraint_count < 3 THEN
-        RAISE WARNING '   ❌ Missing foreign keys!';
-    ELSE
-        RAISE NOTICE '   ✅ Foreign keys present';
-    END IF;
-    
-    -- Check Indexes
-    SELECT COUNT(*) INTO index_count
-    FROM pg_indexes
-    WHERE schemaname = '{{ schema }}'
-    AND tablename IN ('players', 'teams', 'fixtures');
-    
-    RAISE NOTICE '';
-    RAISE NOTICE '3. INDEXES: % found', index_count;
-    IF index_count < 10 THEN
-        RAISE WARNING '   ⚠️  Consider adding more indexes for performance';
-    ELSE
-        RAISE NOTICE '   ✅ Good index coverage';
-    END IF;
-    
-    -- Check for orphan players (team_id not in teams)
-    SELECT COUNT(*) INTO orphan_count
-    FROM {{ schema }}.players p
-    WHERE p.team_id IS NOT NULL
-    AND NOT EXISTS (
-        SELECT 1 FROM {{ schema }}.teams t 
-        WHERE t.team_id = p.team_id
-    );
-    
-    RAISE NOTICE '';
-    RAISE NOTICE '4. ORPHAN PLAYERS: % found', orphan_count;
-    IF orphan_count > 0 THEN
-        RAISE WARNING '   ❌ Data integrity issue: players with invalid team_id';
-    ELSE
-        RAISE NOTICE '   ✅ No orphan records';
-    END IF;
-    
-    -- Check for orphan fixtures
-    SELECT COUNT(*) INTO orphan_count
-    FROM {{ schema }}.fixtures f
-    WHERE NOT EXISTS (
-        SELECT 1 FROM {{ schema }}.teams t 
-        WHERE t.team_id = f.home_team_id
-    )
-    OR NOT EXISTS (
-        SELECT 1 FROM {{ schema }}.teams t 
-        WHERE t.team_id = f.away_team_id
-    );
-    
-    RAISE NOTICE '';
-    RAISE NOTICE '5. ORPHAN FIXTURES: % found', orphan_count;
-    IF orphan_count > 0 THEN
-        RAISE WARNING '   ❌ Data integrity issue: fixtures with invalid teams';
-    ELSE
-        RAISE NOTICE '   ✅ No orphan fixtures';
-    END IF;
-    
-    -- Check for duplicate primary keys (shouldn't happen with PK constraint)
-    SELECT COUNT(*) - COUNT(DISTINCT player_id) INTO orphan_count
-    FROM {{ schema }}.players;
-    
-    RAISE NOTICE '';
-    RAISE NOTICE '6. DUPLICATE PLAYER IDS: % found', orphan_count;
-    IF orphan_count > 0 THEN
-        RAISE WARNING '   ❌ Critical: Duplicate player_id values!';
-    ELSE
-        RAISE NOTICE '   ✅ No duplicates';
-    END IF;
-    
-    RAISE NOTICE '';
-    RAISE NOTICE '==============================================';
-    RAISE NOTICE 'VALIDATION COMPLETE';
-    RAISE NOTICE '==============================================';
-END $$;
-
--- Show detailed constraint info
-SELECT 
-    tc.constraint_name,
-    tc.table_name,
-    tc.constraint_type,
-    kcu.column_name,
-    ccu.table_name AS foreign_table_name,
-    ccu.column_name AS foreign_column_name
-FROM information_schema.table_constraints tc
-LEFT JOIN information_schema.key_column_usage kcu
-    ON tc.constraint_name = kcu.constraint_name
-    AND tc.table_schema = kcu.table_schema
-LEFT JOIN information_schema.constraint_column_usage ccu
-    ON ccu.constraint_name = tc.constraint_name
-    AND ccu.table_schema = tc.table_schema
-WHERE tc.constraint_schema = '{{ schema }}'
-    AND tc.table_name IN ('players', 'teams', 'fixtures')
-ORDER BY tc.table_name, tc.constraint_type, tc.constraint_name;
+{% macro validate_constraints(schema_name=none, fail_on_error=false) %}
+
+{#-
+    Check the constraints and integrity of the marts of a schema (default: the target's).
+
+        dbt run-operation validate_constraints --args '{schema_name: marts}'
+
+    Problems are logged as warnings, or fail the operation with
+    fail_on_error (gate of the blue/green publish, see quantfoot.publish).
+    The checks run as queries: run-operation does not execute the SQL a
+    macro renders.
+-#}
+
+{%- set schema = schema_name or target.schema -%}
+
+{%- if execute -%}
+
+{{ log('==============================================', info=True) }}
+{{ log('VALIDATING MART CONSTRAINTS OF ' ~ schema, info=True) }}
+{{ log('==============================================', info=True) }}
+
+{%- set tables_query -%}
+    select
+        to_regclass('{{ schema }}.players') is not null
+        and to_regclass('{{ schema }}.teams') is not null
+        and to_regclass('{{ schema }}.fixtures') is not null
+{%- endset -%}
+
+{%- if not run_query(tables_query).columns[0].values()[0] -%}
+    {%- set message = 'Mart constraints of ' ~ schema ~ ': players, teams or fixtures table missing' -%}
+    {%- if fail_on_error -%}
+        {{ exceptions.raise_compiler_error(message) }}
+    {%- endif -%}
+    {{ exceptions.warn(message) }}
+    {{ return(false) }}
+{%- endif -%}
+
+{%- set checks_query -%}
+    select
+        -- Primary keys
+        (select count(*)
+         from information_schema.table_constraints
+         where constraint_schema = '{{ schema }}'
+         and constraint_type = 'PRIMARY KEY'
+         and table_name in ('players', 'teams', 'fixtures')) as primary_keys,
+
+        -- Foreign keys
+        (select count(*)
+         from information_schema.table_constraints
+         where constraint_schema = '{{ schema }}'
+         and constraint_type = 'FOREIGN KEY') as foreign_keys,
+
+        -- Indexes
+        (select count(*)
+         from pg_indexes
+         where schemaname = '{{ schema }}'
+         and tablename in ('players', 'teams', 'fixtures')) as indexes,
+
+        -- Orphan players (team_id not in teams)
+        (select count(*)
+         from {{ schema }}.players p
+         where p.team_id is not null
+         and not exists (select 1 from {{ schema }}.teams t where t.team_id = p.team_id)) as orphan_players,
+
+        -- Orphan fixtures
+        (select count(*)
+         from {{ schema }}.fixtures f
+         where not exists (select 1 from {{ schema }}.teams t where t.team_id = f.home_team_id)
+         or not exists (select 1 from {{ schema }}.teams t where t.team_id = f.away_team_id)) as orphan_fixtures,
+
+        -- Duplicate primary keys (shouldn't happen with PK constraint)
+        (select count(*) - count(distinct player_id) from {{ schema }}.players) as duplicate_players
+{%- endset -%}
+
+{%- set checks = run_query(checks_query).rows[0] -%}
+{%- set problems = [] -%}
+
+{{ log('1. PRIMARY KEYS: ' ~ checks['primary_keys'] ~ ' found (expected: 3)', info=True) }}
+{%- if checks['primary_keys'] < 3 -%}
+    {%- do problems.append('missing primary keys') -%}
+{%- endif -%}
+
+{{ log('2. FOREIGN KEYS: ' ~ checks['foreign_keys'] ~ ' found (expected: 3+)', info=True) }}
+{%- if checks['foreign_keys'] < 3 -%}
+    {%- do problems.append('missing foreign keys') -%}
+{%- endif -%}
+
+{{ log('3. INDEXES: ' ~ checks['indexes'] ~ ' found', info=True) }}
+{%- if checks['indexes'] < 10 -%}
+    {{ log('   Consider adding more indexes for performance', info=True) }}
+{%- endif -%}
+
+{{ log('4. ORPHAN PLAYERS: ' ~ checks['orphan_players'] ~ ' found', info=True) }}
+{%- if checks['orphan_players'] > 0 -%}
+    {%- do problems.append('players with invalid team_id') -%}
+{%- endif -%}
+
+{{ log('5. ORPHAN FIXTURES: ' ~ checks['orphan_fixtures'] ~ ' found', info=True) }}
+{%- if checks['orphan_fixtures'] > 0 -%}
+    {%- do problems.append('fixtures with invalid teams') -%}
+{%- endif -%}
+
+{{ log('6. DUPLICATE PLAYER IDS: ' ~ checks['duplicate_players'] ~ ' found', info=True) }}
+{%- if checks['duplicate_players'] > 0 -%}
+    {%- do problems.append('duplicate player_id values') -%}
+{%- endif -%}
+
+{%- if problems -%}
+    {%- set message = 'Mart constraints of ' ~ schema ~ ': ' ~ problems | join(', ') -%}
+    {%- if fail_on_error -%}
+        {{ exceptions.raise_compiler_error(message) }}
+    {%- endif -%}
+    {{ exceptions.warn(message) }}
+{%- else -%}
+    {{ log('VALIDATION COMPLETE: no problem found', info=True) }}
+{%- endif -%}
+
+{{ return(not problems) }}
+
+{%- endif -%}
 
 {% endmacro %}
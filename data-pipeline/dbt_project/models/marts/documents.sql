@@ -0,0 +1,329 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key=['doc_type', 'doc_key'],
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['doc_type', 'doc_key'], 'unique': True},
+            {'columns': ['generated_at']}
+        ],
+        pre_hook=[
+            "{{ record_load_watermark(this, upstream=['teams', 'players', 'fixtures']) }}",
+            "{{ delete_orphan_documents(this) }}"
+        ],
+        post_hook=[
+            "{{ ensure_constraint(this, this.name ~ '_pkey', 'PRIMARY KEY (doc_type, doc_key)') }}"
+        ]
+    )
+}}
+
+-- Read models of the web app and the APIs: one JSON document per entity,
+-- shaped like the API responses (camelCase), read with one key lookup:
+--   select doc from marts.documents where doc_type = 'team' and doc_key = '33'
+-- - fixture: fixture card (FixtureResponse)
+-- - player: player card with the player's team (PlayerResponse)
+-- - team: team page (TeamResponse) with the squad and the next scheduled fixtures
+--
+-- Incremental builds only regenerate the documents showing a row of a load
+-- the teams, players and fixtures marts processed since the last build. A
+-- team page shows its squad and fixtures: it is regenerated when the team,
+-- one of its players (joining, or leaving: the team of the player's previous
+-- card) or one of its fixtures changed, or was deleted from its mart (the
+-- documents of deleted entities are removed by the pre-hook, see
+-- macros/deleted_documents.sql). generated_at only moves when the
+-- document's content changed (doc_hash), so static exports
+-- (quantfoot/documents.py) rewrite changed documents only; full builds keep
+-- the generated_at of the live documents that did not change.
+
+{% set upcoming_fixtures = 5 %}
+{% set scheduled_statuses = "('TBD', 'NS')" %}
+{%- set frozen = frozen_seasons() if is_incremental() else [] %}
+{#- Full builds (blue/green into the shadow schema, full refresh) keep the
+    generated_at of the live documents that did not change -#}
+{%- set previous_documents = none %}
+{%- if is_incremental() %}
+    {%- set previous_documents = this %}
+{%- elif execute %}
+    {%- set previous_documents = adapter.get_relation(database=this.database, schema='marts', identifier=this.identifier) %}
+{%- endif %}
+
+with
+
+{% if is_incremental() %}
+-- Lowest load id of the loads processed since the last build (null when none),
+-- see macros/load_watermarks.sql
+watermark as (
+    select {{ first_unprocessed_load_id(this) }} as source_load_id
+),
+{% else %}
+watermark as (
+    select ''::varchar as source_load_id
+),
+{% endif %}
+
+changed_teams as (
+    select t.team_id
+    from {{ ref('teams') }} t, watermark w
+    where t.source_load_id >= w.source_load_id
+
+    union
+
+    select p.team_id
+    from {{ ref('players') }} p, watermark w
+    where p.source_load_id >= w.source_load_id
+
+    {% if is_incremental() %}
+    union
+
+    -- Team a changed player belonged to on their previous card
+    select (d.doc->'team'->>'id')::bigint
+    from {{ ref('players') }} p
+    cross join watermark w
+    join {{ this }} d on d.doc_type = 'player' and d.doc_key = p.player_id::text
+    where p.source_load_id >= w.source_load_id
+
+    union
+
+    -- Teams showing a document deleted by this build's pre-hook
+    select unnest(team_ids)
+    from {{ deleted_documents_table(this) }}
+    where deleted_at = now()
+    {% endif %}
+
+    union
+
+    select unnest(array[f.home_team_id, f.away_team_id])::bigint
+    from {{ ref('fixtures') }} f, watermark w
+    where f.source_load_id >= w.source_load_id
+    {%- if frozen %}
+    -- frozen seasons never change (their partitions are not scanned)
+    and f.season not in ({{ frozen | join(', ') }})
+    {%- endif %}
+),
+
+-- Changed fixtures, and the scheduled fixtures of the changed team pages
+fixture_cards as (
+    select
+        f.fixture_id,
+        f.home_team_id,
+        f.away_team_id,
+        f.fixture_datetime,
+        f.status in {{ scheduled_statuses }} as is_scheduled,
+        f.source_load_id,
+        f.source_load_id >= w.source_load_id as is_changed,
+        jsonb_build_object(
+            'id', f.fixture_id,
+            'fixtureDatetime', f.fixture_datetime,
+            'fixtureDate', f.fixture_date,
+            'season', f.season,
+            'status', f.status,
+            'statusLong', f.status_long,
+            'minutesElapsed', f.minutes_elapsed,
+            'league', jsonb_build_object(
+                'leagueId', f.league_id,
+                'leagueName', f.league_name,
+                'leagueType', f.league_type,
+                'leagueCountry', f.league_country,
+                'leagueRound', f.league_round
+            ),
+            'venue', case when f.venue_id is not null then jsonb_build_object(
+                'venueId', f.venue_id,
+                'venueName', f.venue_name,
+                'venueCity', f.venue_city,
+                'venueCapacity', f.venue_capacity
+            ) end,
+            'homeTeam', jsonb_build_object(
+                'teamId', f.home_team_id,
+                'teamName', f.home_team_name,
+                'teamCode', f.home_team_code,
+                'isWinner', f.home_team_winner
+            ),
+            'awayTeam', jsonb_build_object(
+                'teamId', f.away_team_id,
+                'teamName', f.away_team_name,
+                'teamCode', f.away_team_code,
+                'isWinner', f.away_team_winner
+            ),
+            'score', jsonb_build_object(
+                'goalsHome', f.goals_home,
+                'goalsAway', f.goals_away,
+                'halftimeHome', f.halftime_home,
+                'halftimeAway', f.halftime_away,
+                'fulltimeHome', f.fulltime_home,
+                'fulltimeAway', f.fulltime_away,
+                'totalGoals', f.total_goals,
+                'goalDifference', f.goal_difference
+            ),
+            'result', f.result,
+            'referee', f.referee,
+            'isLive', f.status in ('LIVE', '1H', 'HT', '2H'),
+            'isFinished', f.status in ('FT', 'AET', 'PEN')
+        ) as doc
+    from {{ ref('fixtures') }} f, watermark w
+    where (
+        f.source_load_id >= w.source_load_id
+        or (
+            f.status in {{ scheduled_statuses }}
+            and (
+                f.home_team_id in (select team_id from changed_teams)
+                or f.away_team_id in (select team_id from changed_teams)
+            )
+        )
+    )
+    {%- if frozen %}
+    and f.season not in ({{ frozen | join(', ') }})
+    {%- endif %}
+),
+
+-- Changed players, and the squads of the changed team pages
+player_cards as (
+    select
+        p.player_id,
+        p.team_id,
+        p.position,
+        p.jersey_number,
+        p.player_name,
+        p.source_load_id,
+        p.source_load_id >= w.source_load_id as is_changed,
+        jsonb_build_object(
+            'id', p.player_id,
+            'playerName', p.player_name,
+            'age', p.age,
+            'position', p.position,
+            'jerseyNumber', p.jersey_number,
+            'photoUrl', p.photo_url,
+            'team', case when p.team_id is not null then jsonb_build_object(
+                'id', p.team_id,
+                'teamName', p.team_name,
+                'teamCode', p.team_code,
+                'teamCountry', p.team_country,
+                'teamLogo', t.team_logo
+            ) end
+        ) as doc
+    from {{ ref('players') }} p
+    cross join watermark w
+    left join {{ ref('teams') }} t on t.team_id = p.team_id
+    where p.source_load_id >= w.source_load_id
+    or p.team_id in (select team_id from changed_teams)
+),
+
+squads as (
+    select
+        team_id,
+        jsonb_agg(
+            doc - 'team'
+            order by
+                case position
+                    when 'Goalkeeper' then 1
+                    when 'Defender' then 2
+                    when 'Midfielder' then 3
+                    when 'Attacker' then 4
+                end,
+                jersey_number,
+                player_name
+        ) as squad,
+        max(source_load_id) as source_load_id
+    from player_cards
+    where team_id in (select team_id from changed_teams)
+    group by team_id
+),
+
+team_fixtures as (
+    select home_team_id as team_id, fixture_id, fixture_datetime, source_load_id, doc
+    from fixture_cards
+    where is_scheduled
+
+    union all
+
+    select away_team_id, fixture_id, fixture_datetime, source_load_id, doc
+    from fixture_cards
+    where is_scheduled
+),
+
+upcoming as (
+    select
+        team_id,
+        jsonb_agg(doc order by fixture_datetime, fixture_id) as fixtures,
+        max(source_load_id) as source_load_id
+    from (
+        select
+            *,
+            row_number() over (partition by team_id order by fixture_datetime, fixture_id) as n
+        from team_fixtures
+        where team_id in (select team_id from changed_teams)
+    ) ranked
+    where n <= {{ upcoming_fixtures }}
+    group by team_id
+),
+
+team_pages as (
+    select
+        t.team_id,
+        greatest(t.source_load_id, s.source_load_id, u.source_load_id) as source_load_id,
+        jsonb_build_object(
+            'id', t.team_id,
+            'teamName', t.team_name,
+            'teamCode', t.team_code,
+            'teamCountry', t.team_country,
+            'teamFounded', t.team_founded,
+            'isNationalTeam', t.is_national_team,
+            'teamLogo', t.team_logo,
+            'venue', case when t.venue_id is not null then jsonb_build_object(
+                'venueId', t.venue_id,
+                'venueName', t.venue_name,
+                'venueAddress', t.venue_address,
+                'venueCity', t.venue_city,
+                'venueCapacity', t.venue_capacity,
+                'venueSurface', t.venue_surface
+            ) end,
+            'squad', coalesce(s.squad, '[]'::jsonb),
+            'upcomingFixtures', coalesce(u.fixtures, '[]'::jsonb)
+        ) as doc
+    from {{ ref('teams') }} t
+    left join squads s on s.team_id = t.team_id
+    left join upcoming u on u.team_id = t.team_id
+    where t.team_id in (select team_id from changed_teams)
+),
+
+documents as (
+    select 'team' as doc_type, team_id::text as doc_key, doc, source_load_id
+    from team_pages
+
+    union all
+
+    select 'player', player_id::text, doc, source_load_id
+    from player_cards
+    where is_changed
+
+    union all
+
+    select 'fixture', fixture_id::text, doc, source_load_id
+    from fixture_cards
+    where is_changed
+),
+
+final as (
+    select
+        d.doc_type,
+        d.doc_key,
+        d.doc,
+        md5(d.doc::text) as doc_hash,
+
+        -- When the content last changed (kept when a document is regenerated identical)
+        {% if previous_documents -%}
+        case when previous.doc_hash = md5(d.doc::text) then previous.generated_at else current_timestamp end as generated_at,
+        {%- else -%}
+        current_timestamp as generated_at,
+        {%- endif %}
+
+        -- Metadata
+        d.source_load_id,
+        current_timestamp as dbt_updated_at
+    from documents d
+    {% if previous_documents -%}
+    left join {{ previous_documents }} previous on previous.doc_type = d.doc_type and previous.doc_key = d.doc_key
+    {%- endif %}
+)
+
+select * from final
@@ -1,21 +1,26 @@
 {{
     config(
-        materialized='table',
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key=['fixture_id', 'season'],
+        on_schema_change='append_new_columns',
+        partition_by='season',
         indexes=[
-            {'columns': ['fixture_id'], 'unique': True},
-            {'columns': ['fixture_date']},
+            {'columns': ['fixture_date'], 'type': 'brin'},
             {'columns': ['home_team_id']},
             {'columns': ['away_team_id']},
-            {'columns': ['league_id']},
-            {'columns': ['status']},
-            {'columns': ['season']}
+            {'columns': ['league_id']}
+        ],
+        pre_hook=[
+            "{{ record_load_watermark(this) }}"
         ],
         post_hook=[
-            "ALTER TABLE {{ this }} ADD CONSTRAINT {{ this.name }}_pkey PRIMARY KEY (fixture_id)",
-            "ALTER TABLE {{ this }} ADD CONSTRAINT fk_{{ this.name }}_home_team FOREIGN KEY (home_team_id) REFERENCES {{ this.schema }}.teams(team_id) ON DELETE CASCADE",
-            "ALTER TABLE {{ this }} ADD CONSTRAINT fk_{{ this.name }}_away_team FOREIGN KEY (away_team_id) REFERENCES {{ this.schema }}.teams(team_id) ON DELETE CASCADE",
-            "ALTER TABLE {{ this }} ADD CONSTRAINT check_{{ this.name }}_teams_diff CHECK (home_team_id != away_team_id)",
-            "ALTER TABLE {{ this }} ADD CONSTRAINT check_{{ this.name }}_scores CHECK ((home_goals IS NULL OR home_goals >= 0) AND (away_goals IS NULL OR away_goals >= 0))",
+            "{{ name_list_partitions(this) }}",
+            "{{ ensure_constraint(this, this.name ~ '_pkey', 'PRIMARY KEY (fixture_id, season)') }}",
+            "{{ ensure_constraint(this, 'fk_' ~ this.name ~ '_home_team', 'FOREIGN KEY (home_team_id) REFERENCES ' ~ this.schema ~ '.teams(team_id) ON DELETE CASCADE') }}",
+            "{{ ensure_constraint(this, 'fk_' ~ this.name ~ '_away_team', 'FOREIGN KEY (away_team_id) REFERENCES ' ~ this.schema ~ '.teams(team_id) ON DELETE CASCADE') }}",
+            "{{ ensure_constraint(this, 'check_' ~ this.name ~ '_teams_diff', 'CHECK (home_team_id != away_team_id)') }}",
+            "{{ ensure_constraint(this, 'check_' ~ this.name ~ '_scores', 'CHECK ((goals_home IS NULL OR goals_home >= 0) AND (goals_away IS NULL OR goals_away >= 0))') }}",
             "ALTER TABLE {{ this }} ALTER COLUMN fixture_id SET NOT NULL",
             "ALTER TABLE {{ this }} ALTER COLUMN home_team_id SET NOT NULL",
             "ALTER TABLE {{ this }} ALTER COLUMN away_team_id SET NOT NULL",
@@ -24,6 +29,11 @@
     )
 }}
 
+-- One partition per season (fixtures_2025, ...), see macros/list_partitions.sql
+
+-- teams must exist before the foreign keys of the post-hooks
+-- depends_on: {{ ref('teams') }}
+
 with fixtures as (
     select * from {{ ref('stg_fixtures') }}
 ),
@@ -112,6 +122,7 @@ final as (
         f.referee,
         
         -- Metadata
+        greatest(f._dlt_load_id, ht._dlt_load_id, at._dlt_load_id, v._dlt_load_id, l._dlt_load_id) as source_load_id,
         current_timestamp as dbt_updated_at
         
     from fixtures f
@@ -122,3 +133,16 @@ final as (
 )
 
 select * from final
+
+{% if is_incremental() %}
+{%- set frozen = frozen_seasons() %}
+-- Only fixtures whose raw rows (or joined team/venue/league rows) were loaded since the last build,
+-- frozen seasons excepted (their partitions are never rewritten), see macros/load_watermarks.sql
+where source_load_id >= {{ first_unprocessed_load_id(this) }}
+{%- if frozen %}
+and season not in ({{ frozen | join(', ') }})
+{%- endif %}
+{% else %}
+-- Rows stored in date order, which the BRIN index on fixture_date relies on
+order by fixture_date
+{% endif %}
@@ -1,22 +1,31 @@
 {{
     config(
-        materialized='table',
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key='player_id',
+        on_schema_change='append_new_columns',
         indexes=[
             {'columns': ['player_id'], 'unique': True},
             {'columns': ['team_id']},
             {'columns': ['player_name']},
             {'columns': ['position']}
         ],
+        pre_hook=[
+            "{{ record_load_watermark(this) }}"
+        ],
         post_hook=[
-            "ALTER TABLE {{ this }} ADD CONSTRAINT {{ this.name }}_pkey PRIMARY KEY (player_id)",
-            "ALTER TABLE {{ this }} ADD CONSTRAINT fk_{{ this.name }}_team FOREIGN KEY (team_id) REFERENCES {{ this.schema }}.teams(team_id) ON DELETE SET NULL",
-            "ALTER TABLE {{ this }} ADD CONSTRAINT check_{{ this.name }}_age CHECK (age IS NULL OR (age >= 15 AND age <= 50))",
+            "{{ ensure_constraint(this, this.name ~ '_pkey', 'PRIMARY KEY (player_id)') }}",
+            "{{ ensure_constraint(this, 'fk_' ~ this.name ~ '_team', 'FOREIGN KEY (team_id) REFERENCES ' ~ this.schema ~ '.teams(team_id) ON DELETE SET NULL') }}",
+            "{{ ensure_constraint(this, 'check_' ~ this.name ~ '_age', 'CHECK (age IS NULL OR (age >= 15 AND age <= 50))') }}",
             "ALTER TABLE {{ this }} ALTER COLUMN player_id SET NOT NULL",
             "ALTER TABLE {{ this }} ALTER COLUMN player_name SET NOT NULL"
         ]
     )
 }}
 
+-- teams must exist before the foreign keys of the post-hooks
+-- depends_on: {{ ref('teams') }}
+
 with players as (
     select * from {{ ref('stg_players') }}
 ),
@@ -41,6 +50,7 @@ final as (
         t.team_country,
         
         -- Metadata
+        greatest(p._dlt_load_id, t._dlt_load_id) as source_load_id,
         current_timestamp as dbt_updated_at
         
     from players p
@@ -48,3 +58,9 @@ final as (
 )
 
 select * from final
+
+{% if is_incremental() %}
+-- Only players whose raw rows (or their team's row) were loaded since the last build
+-- (see macros/load_watermarks.sql)
+where source_load_id >= {{ first_unprocessed_load_id(this) }}
+{% endif %}
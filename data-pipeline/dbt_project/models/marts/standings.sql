@@ -0,0 +1,129 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['league_id', 'season'],
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['league_id', 'season', 'round_number']},
+            {'columns': ['team_id']}
+        ],
+        pre_hook=[
+            "{{ record_load_watermark(this, upstream=['team_results']) }}"
+        ],
+        post_hook=[
+            "{{ ensure_constraint(this, this.name ~ '_pkey', 'PRIMARY KEY (league_id, season, round_number, team_id)') }}"
+        ]
+    )
+}}
+
+-- League table after every round of the league seasons.
+--
+-- A new result changes the table of its league season from its round on, so
+-- incremental builds recompute the league seasons with results loaded since
+-- the last build, and replace them (delete+insert on league_id, season).
+-- Other league seasons are not read.
+
+with
+
+{% if is_incremental() %}
+changed as (
+    select distinct league_id, season
+    from {{ ref('team_results') }}
+    where source_load_id >= {{ first_unprocessed_load_id(this) }}
+),
+{% endif %}
+
+results as (
+    select r.*
+    from {{ ref('team_results') }} r
+    {% if is_incremental() %}
+    join changed c on c.league_id = r.league_id and c.season = r.season
+    {% endif %}
+    where r.round_number is not null
+),
+
+per_round as (
+    select
+        league_id,
+        season,
+        round_number,
+        team_id,
+        count(*) as played,
+        count(*) filter (where result = 'W') as won,
+        count(*) filter (where result = 'D') as drawn,
+        count(*) filter (where result = 'L') as lost,
+        sum(goals_for) as goals_for,
+        sum(goals_against) as goals_against,
+        sum(points) as points
+    from results
+    group by 1, 2, 3, 4
+),
+
+-- Every team of the league season at every round, so a team that did not
+-- play a round (postponed fixture) keeps its line in the table
+grid as (
+    select t.league_id, t.season, r.round_number, t.team_id
+    from (select distinct league_id, season, team_id from results) t
+    join (select distinct league_id, season, round_number from results) r
+      on r.league_id = t.league_id and r.season = t.season
+),
+
+cumulative as (
+    select
+        g.league_id,
+        g.season,
+        g.round_number,
+        g.team_id,
+        sum(coalesce(p.played, 0)) over team_rounds as played,
+        sum(coalesce(p.won, 0)) over team_rounds as won,
+        sum(coalesce(p.drawn, 0)) over team_rounds as drawn,
+        sum(coalesce(p.lost, 0)) over team_rounds as lost,
+        sum(coalesce(p.goals_for, 0)) over team_rounds as goals_for,
+        sum(coalesce(p.goals_against, 0)) over team_rounds as goals_against,
+        sum(coalesce(p.points, 0)) over team_rounds as points
+    from grid g
+    left join per_round p
+      on p.league_id = g.league_id
+     and p.season = g.season
+     and p.round_number = g.round_number
+     and p.team_id = g.team_id
+    window team_rounds as (partition by g.league_id, g.season, g.team_id order by g.round_number)
+),
+
+load_ids as (
+    select league_id, season, max(source_load_id) as source_load_id
+    from results
+    group by 1, 2
+),
+
+final as (
+    select
+        c.league_id,
+        c.season,
+        c.round_number,
+        rank() over (
+            partition by c.league_id, c.season, c.round_number
+            order by c.points desc, c.goals_for - c.goals_against desc, c.goals_for desc
+        ) as position,
+        c.team_id,
+        c.played,
+        c.won,
+        c.drawn,
+        c.lost,
+        c.goals_for,
+        c.goals_against,
+        c.goals_for - c.goals_against as goal_difference,
+        c.points,
+
+        -- Table of the latest round played in the league season
+        c.round_number = max(c.round_number) over (partition by c.league_id, c.season) as is_current,
+
+        -- Newest load of the league season's results
+        l.source_load_id,
+        current_timestamp as dbt_updated_at
+    from cumulative c
+    join load_ids l on l.league_id = c.league_id and l.season = c.season
+)
+
+select * from final
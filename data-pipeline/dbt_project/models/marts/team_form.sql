@@ -0,0 +1,157 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key=['team_id', 'fixture_id'],
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['team_id', 'fixture_id'], 'unique': True},
+            {'columns': ['team_id', 'fixture_datetime']}
+        ],
+        pre_hook=[
+            "{{ record_load_watermark(this, upstream=['team_results']) }}"
+        ],
+        post_hook=[
+            "{{ ensure_constraint(this, this.name ~ '_pkey', 'PRIMARY KEY (team_id, fixture_id)') }}"
+        ]
+    )
+}}
+
+-- Form of every team after each of its finished fixtures: last 5 results,
+-- points and goals over them, and the current streak. The latest form of a
+-- team is its newest row (index on team_id, fixture_datetime).
+--
+-- Incremental builds only recompute the teams with results loaded since the
+-- last build, from their earliest such fixture on (a late result moves the
+-- rows after it). The rolling window is seeded with the 4 results before that
+-- fixture, and the streak and match count with the last row already built.
+
+{% set form_window = 5 %}
+
+with
+
+{% if is_incremental() %}
+changed as (
+    select team_id, min(fixture_datetime) as since
+    from {{ ref('team_results') }}
+    where source_load_id >= {{ first_unprocessed_load_id(this) }}
+    group by team_id
+),
+
+previous as (
+    select distinct on (f.team_id)
+        f.team_id, f.streak_result, f.streak_length, f.matches_played
+    from {{ this }} f
+    join changed c on c.team_id = f.team_id
+    where f.fixture_datetime < c.since
+    order by f.team_id, f.fixture_datetime desc, f.fixture_id desc
+),
+
+recomputed as (
+    select r.*
+    from {{ ref('team_results') }} r
+    join changed c on c.team_id = r.team_id
+    where r.fixture_datetime >= c.since
+),
+
+context as (
+    select fixture_id, team_id, fixture_datetime, result, points, goals_for, goals_against
+    from (
+        select r.*, row_number() over (partition by r.team_id order by r.fixture_datetime desc, r.fixture_id desc) as n
+        from {{ ref('team_results') }} r
+        join changed c on c.team_id = r.team_id
+        where r.fixture_datetime < c.since
+    ) before_since
+    where n < {{ form_window }}
+),
+{% else %}
+previous as (
+    select null::bigint as team_id, null::text as streak_result, null::bigint as streak_length, null::bigint as matches_played
+    where false
+),
+
+recomputed as (
+    select * from {{ ref('team_results') }}
+),
+
+context as (
+    select fixture_id, team_id, fixture_datetime, result, points, goals_for, goals_against
+    from recomputed
+    where false
+),
+{% endif %}
+
+rolling as (
+    select
+        fixture_id,
+        team_id,
+        is_recomputed,
+        string_agg(result, '') over last_matches as form,
+        sum(points) over last_matches as form_points,
+        sum(goals_for) over last_matches as form_goals_for,
+        sum(goals_against) over last_matches as form_goals_against
+    from (
+        select fixture_id, team_id, fixture_datetime, result, points, goals_for, goals_against, true as is_recomputed
+        from recomputed
+        union all
+        select fixture_id, team_id, fixture_datetime, result, points, goals_for, goals_against, false
+        from context
+    ) results
+    window last_matches as (
+        partition by team_id
+        order by fixture_datetime, fixture_id
+        rows between {{ form_window - 1 }} preceding and current row
+    )
+),
+
+-- Streaks: runs of the same result, numbered from the first recomputed row
+changes as (
+    select
+        r.*,
+        case when r.result = lag(r.result) over team_matches then 0 else 1 end as is_new_run,
+        row_number() over team_matches as n
+    from recomputed r
+    window team_matches as (partition by r.team_id order by r.fixture_datetime, r.fixture_id)
+),
+
+runs as (
+    select
+        *,
+        sum(is_new_run) over (partition by team_id order by fixture_datetime, fixture_id) as run_number
+    from changes
+),
+
+final as (
+    select
+        r.team_id,
+        r.fixture_id,
+        r.fixture_datetime,
+        r.league_id,
+        r.season,
+        r.opponent_id,
+        r.is_home,
+        r.goals_for,
+        r.goals_against,
+        r.result,
+        r.points,
+        r.n + coalesce(p.matches_played, 0) as matches_played,
+
+        -- Last {{ form_window }} results, oldest first (e.g. 'WWDLW')
+        w.form,
+        w.form_points,
+        w.form_goals_for,
+        w.form_goals_against,
+
+        -- Current run of the same result, continued from the last row built
+        r.result as streak_result,
+        row_number() over (partition by r.team_id, r.run_number order by r.fixture_datetime, r.fixture_id)
+            + case when r.run_number = 1 and p.streak_result = r.result then p.streak_length else 0 end as streak_length,
+
+        r.source_load_id,
+        current_timestamp as dbt_updated_at
+    from runs r
+    join rolling w on w.team_id = r.team_id and w.fixture_id = r.fixture_id and w.is_recomputed
+    left join previous p on p.team_id = r.team_id
+)
+
+select * from final
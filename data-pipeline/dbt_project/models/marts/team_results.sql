@@ -0,0 +1,88 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key=['fixture_id', 'team_id'],
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['fixture_id', 'team_id'], 'unique': True},
+            {'columns': ['team_id', 'fixture_datetime']},
+            {'columns': ['league_id', 'season']},
+            {'columns': ['source_load_id']}
+        ],
+        pre_hook=[
+            "{{ record_load_watermark(this, upstream=['fixtures']) }}"
+        ],
+        post_hook=[
+            "{{ ensure_constraint(this, this.name ~ '_pkey', 'PRIMARY KEY (fixture_id, team_id)') }}"
+        ]
+    )
+}}
+
+-- One row per team and finished fixture, from the team's point of view:
+-- the input of the standings and form models
+
+with fixtures as (
+    select * from {{ ref('fixtures') }}
+    where status in ('FT', 'AET', 'PEN')
+      and goals_home is not null
+      and goals_away is not null
+    {% if is_incremental() %}
+      -- Only fixtures of the loads the fixtures mart processed since the last build
+      -- (see macros/load_watermarks.sql)
+      and source_load_id >= {{ first_unprocessed_load_id(this) }}
+    {% endif %}
+),
+
+sides as (
+    select
+        fixture_id, fixture_datetime, league_id, season, league_round,
+        home_team_id as team_id, away_team_id as opponent_id, true as is_home,
+        goals_home as goals_for, goals_away as goals_against, source_load_id
+    from fixtures
+
+    union all
+
+    select
+        fixture_id, fixture_datetime, league_id, season, league_round,
+        away_team_id as team_id, home_team_id as opponent_id, false as is_home,
+        goals_away as goals_for, goals_home as goals_against, source_load_id
+    from fixtures
+),
+
+final as (
+    select
+        fixture_id,
+        team_id,
+        opponent_id,
+        is_home,
+        fixture_datetime,
+        league_id,
+        season,
+        league_round,
+
+        -- Matchday of league rounds ("Regular Season - 12"), null for cup rounds
+        case
+            when league_round ~ '^Regular Season - [0-9]+$'
+            then substring(league_round from '[0-9]+$')::integer
+        end as round_number,
+
+        goals_for,
+        goals_against,
+        case
+            when goals_for > goals_against then 'W'
+            when goals_for = goals_against then 'D'
+            else 'L'
+        end as result,
+        case
+            when goals_for > goals_against then 3
+            when goals_for = goals_against then 1
+            else 0
+        end as points,
+
+        source_load_id,
+        current_timestamp as dbt_updated_at
+    from sides
+)
+
+select * from final
@@ -1,15 +1,21 @@
 {{
     config(
-        materialized='table',
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key='team_id',
+        on_schema_change='append_new_columns',
         indexes=[
             {'columns': ['team_id'], 'unique': True},
             {'columns': ['team_name']},
             {'columns': ['team_country']},
             {'columns': ['venue_id']}
         ],
+        pre_hook=[
+            "{{ record_load_watermark(this) }}"
+        ],
         post_hook=[
-            "ALTER TABLE {{ this }} ADD CONSTRAINT {{ this.name }}_pkey PRIMARY KEY (team_id)",
-            "ALTER TABLE {{ this }} ADD CONSTRAINT check_{{ this.name }}_founded CHECK (team_founded IS NULL OR (team_founded >= 1850 AND team_founded <= EXTRACT(YEAR FROM CURRENT_DATE)))",
+            "{{ ensure_constraint(this, this.name ~ '_pkey', 'PRIMARY KEY (team_id)') }}",
+            "{{ ensure_constraint(this, 'check_' ~ this.name ~ '_founded', 'CHECK (team_founded IS NULL OR (team_founded >= 1850 AND team_founded <= EXTRACT(YEAR FROM CURRENT_DATE)))') }}",
             "ALTER TABLE {{ this }} ALTER COLUMN team_id SET NOT NULL",
             "ALTER TABLE {{ this }} ALTER COLUMN team_name SET NOT NULL"
         ]
@@ -43,6 +49,7 @@ final as (
         v.surface as venue_surface,
         
         -- Metadata
+        greatest(t._dlt_load_id, v._dlt_load_id) as source_load_id,
         current_timestamp as dbt_updated_at
         
     from teams t
@@ -50,3 +57,9 @@ final as (
 )
 
 select * from final
+
+{% if is_incremental() %}
+-- Only teams whose raw rows (or their venue's row) were loaded since the last build
+-- (see macros/load_watermarks.sql)
+where source_load_id >= {{ first_unprocessed_load_id(this) }}
+{% endif %}
@@ -1,11 +1,27 @@
 {{
     config(
-        materialized='view'
+        materialized=var('staging_materialized', 'view'),
+        incremental_strategy='merge',
+        pre_hook=(
+            ["{{ record_load_watermark(this) }}"] if var('staging_materialized', 'view') == 'incremental' else []
+        ),
+        unique_key='fixture_id',
+        indexes=[
+            {'columns': ['fixture_id'], 'unique': True},
+            {'columns': ['home_team_id']},
+            {'columns': ['away_team_id']},
+            {'columns': ['venue_id']},
+            {'columns': ['league_id', 'season']}
+        ]
     )
 }}
 
 with source as (
     select * from {{ source('raw', 'raw_fixtures') }}
+    {% if is_incremental() %}
+    -- Only rows of the loads completed since the last build (macros/load_watermarks.sql)
+    where _dlt_load_id >= {{ first_unprocessed_load_id(this) }}
+    {% endif %}
 ),
 
 parsed as (
@@ -74,6 +90,7 @@ parsed as (
         (data->'score'->'penalty'->>'away')::int as penalty_away,
         
         -- Metadata
+        _dlt_load_id,
         current_timestamp as dbt_loaded_at
         
     from source
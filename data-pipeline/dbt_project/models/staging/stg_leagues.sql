@@ -1,38 +1,57 @@
 {{
     config(
-        materialized='view'
+        materialized=var('staging_materialized', 'view'),
+        incremental_strategy='merge',
+        pre_hook=(
+            ["{{ record_load_watermark(this) }}"] if var('staging_materialized', 'view') == 'incremental' else []
+        ),
+        unique_key=['league_id', 'season'],
+        indexes=[
+            {'columns': ['league_id', 'season'], 'unique': True}
+        ]
     )
 }}
 
-with source as (
+with leagues as (
     select * from {{ source('raw', 'raw_leagues') }}
 ),
 
+seasons as (
+    select * from {{ source('raw', 'raw_league_seasons') }}
+),
+
 parsed as (
     select
-        league_id,
-        league_name,
-        country_name,
-        season,
+        l.league_id,
+        l.league_name,
+        l.country_name,
+        s.season,
         
         -- Parse league details from JSON
-        (data->'league'->>'type')::text as league_type,
-        (data->'league'->>'logo')::text as league_logo,
+        (l.data->'league'->>'type')::text as league_type,
+        (l.data->'league'->>'logo')::text as league_logo,
         
         -- Parse country details
-        (data->'country'->>'code')::text as country_code,
-        (data->'country'->>'flag')::text as country_flag,
+        (l.data->'country'->>'code')::text as country_code,
+        (l.data->'country'->>'flag')::text as country_flag,
         
-        -- Parse season info from the seasons array
-        -- Note: Each row already has a specific season extracted
-        (data->'seasons'->0->>'start')::date as season_start,
-        (data->'seasons'->0->>'end')::date as season_end,
-        (data->'seasons'->0->>'current')::boolean as is_current_season,
+        -- Season info (one row per league season)
+        s.season_start::date as season_start,
+        s.season_end::date as season_end,
+        s.is_current as is_current_season,
         
         -- Metadata
+        greatest(l._dlt_load_id, s._dlt_load_id) as _dlt_load_id,
         current_timestamp as dbt_loaded_at
         
-    from source
+    from leagues l
+    inner join seasons s on l.league_id = s.league_id
 )
 
 select * from parsed
+
+{% if is_incremental() %}
+-- Only league seasons whose league or season row was loaded by a load
+-- completed since the last build (macros/load_watermarks.sql)
+where _dlt_load_id >= {{ first_unprocessed_load_id(this) }}
+{% endif %}
@@ -1,11 +1,24 @@
 {{
     config(
-        materialized='view'
+        materialized=var('staging_materialized', 'view'),
+        incremental_strategy='merge',
+        pre_hook=(
+            ["{{ record_load_watermark(this) }}"] if var('staging_materialized', 'view') == 'incremental' else []
+        ),
+        unique_key='team_id',
+        indexes=[
+            {'columns': ['team_id'], 'unique': True},
+            {'columns': ['venue_id']}
+        ]
     )
 }}
 
 with source as (
     select * from {{ source('raw', 'raw_team_info') }}
+    {% if is_incremental() %}
+    -- Only rows of the loads completed since the last build (macros/load_watermarks.sql)
+    where _dlt_load_id >= {{ first_unprocessed_load_id(this) }}
+    {% endif %}
 ),
 
 parsed as (
@@ -30,6 +43,7 @@ parsed as (
         (data->'venue'->>'image')::text as venue_image,
         
         -- Metadata
+        _dlt_load_id,
         current_timestamp as dbt_loaded_at
         
     from source
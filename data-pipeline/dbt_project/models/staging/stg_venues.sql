@@ -1,11 +1,24 @@
 {{
     config(
-        materialized='view'
+        materialized=var('staging_materialized', 'view'),
+        incremental_strategy='merge',
+        pre_hook=(
+            ["{{ record_load_watermark(this) }}"] if var('staging_materialized', 'view') == 'incremental' else []
+        ),
+        unique_key=['venue_id', 'team_id'],
+        indexes=[
+            {'columns': ['venue_id', 'team_id'], 'unique': True},
+            {'columns': ['venue_id']}
+        ]
     )
 }}
 
 with source as (
     select * from {{ source('raw', 'raw_venues') }}
+    {% if is_incremental() %}
+    -- Only rows of the loads completed since the last build (macros/load_watermarks.sql)
+    where _dlt_load_id >= {{ first_unprocessed_load_id(this) }}
+    {% endif %}
 ),
 
 parsed as (
@@ -22,6 +35,7 @@ parsed as (
         (data->>'image')::text as image_url,
         
         -- Metadata
+        _dlt_load_id,
         current_timestamp as dbt_loaded_at
         
     from source
@@ -1,25 +1,31 @@
 """
 Main Dagster definitions module.
+
+Importing the package only imports Dagster: assets, sensors and resources
+are loaded when Dagster asks for the definitions (``defs``), and dlt sources,
+pipelines and API clients are only built when an asset runs.
 """
-import os
-from pathlib import Path
-from dagster import Definitions, load_assets_from_modules
-from dagster_embedded_elt.dlt import DagsterDltResource
-from dagster_dbt import DbtCliResource
+from dagster import Definitions, definitions
 
-from . import assets
 
-# Load all assets
-all_assets = load_assets_from_modules([assets])
+@definitions
+def defs() -> Definitions:
+    """Build the code location's definitions."""
+    import os
+    from dagster import load_asset_checks_from_modules, load_assets_from_modules
+    from dagster_embedded_elt.dlt import DagsterDltResource
+    from dagster_dbt import DbtCliResource
 
-# dbt project path
-DBT_PROJECT_DIR = Path(__file__).parent.parent / "dbt_project"
+    from . import assets
+    from .assets.dbt import DBT_PROJECT_DIR
+    from .sensors import api_football_partitions_sensor
 
-# Define Dagster definitions
-defs = Definitions(
-    assets=all_assets,
-    resources={
-        "dlt_pipeline_resource": DagsterDltResource(),
-        "dbt": DbtCliResource(project_dir=os.fspath(DBT_PROJECT_DIR)),
-    }
-)
+    return Definitions(
+        assets=load_assets_from_modules([assets]),
+        asset_checks=load_asset_checks_from_modules([assets]),
+        sensors=[api_football_partitions_sensor],
+        resources={
+            "dlt_pipeline_resource": DagsterDltResource(),
+            "dbt": DbtCliResource(project_dir=os.fspath(DBT_PROJECT_DIR)),
+        },
+    )
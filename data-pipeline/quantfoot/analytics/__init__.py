@@ -0,0 +1,32 @@
+"""
+Team strength and match probability models on ``marts.fixtures``.
+
+Fixtures are loaded into NumPy arrays (``Matches``) and every model works on
+whole arrays of matches:
+- Elo with time decay, applied one match day at a time (``update_elo``)
+- Dixon-Coles attack/defence Poisson model, fitted with batched likelihood
+  evaluations (``fit_dixon_coles``, ``outcome_probabilities``)
+
+``update_ratings`` keeps ``analytics.team_ratings`` and
+``analytics.fixture_probabilities`` up to date incrementally.
+"""
+from .dixon_coles import DixonColesFit, DixonColesParameters, fit_dixon_coles, outcome_probabilities
+from .elo import EloParameters, EloState, expectancy, ratings_at, update_elo
+from .matches import Matches, load_matches
+from .ratings import RatingsUpdate, update_ratings
+
+__all__ = [
+    "DixonColesFit",
+    "DixonColesParameters",
+    "EloParameters",
+    "EloState",
+    "Matches",
+    "RatingsUpdate",
+    "expectancy",
+    "fit_dixon_coles",
+    "load_matches",
+    "outcome_probabilities",
+    "ratings_at",
+    "update_elo",
+    "update_ratings",
+]
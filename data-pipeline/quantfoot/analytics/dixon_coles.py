@@ -0,0 +1,267 @@
+"""
+Dixon-Coles model: Poisson goals from attack and defence strengths, with a
+correction of the low scores and time-weighted matches.
+
+The expected goals of a match are::
+
+    home: exp(intercept + home_advantage + attack[home] + defence[away])
+    away: exp(intercept + attack[away] + defence[home])
+
+and the probabilities of 0-0, 1-0, 0-1 and 1-1 are corrected by ``rho``
+(Dixon & Coles, 1997). The weight of a match halves every ``half_life_days``.
+"""
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .matches import Matches
+
+
+@dataclass(frozen=True)
+class DixonColesParameters:
+    """Fitting parameters of the Dixon-Coles model."""
+
+    # Days after which a match counts half as much
+    half_life_days: float = float(os.getenv("DIXON_COLES_HALF_LIFE_DAYS", "180"))
+    # Matches older than this are left out (their weight is below 1/8 with the default half-life)
+    window_days: float = float(os.getenv("DIXON_COLES_WINDOW_DAYS", "540"))
+    # Stop when no log-strength moves by more than this
+    tolerance: float = 1e-6
+    max_iterations: int = 500
+    # Goals per team considered when summing score probabilities
+    max_goals: int = 10
+
+
+@dataclass
+class DixonColesFit:
+    """Fitted Dixon-Coles model."""
+
+    attack: np.ndarray  # by team index, 0 for teams without a match in the window
+    defence: np.ndarray
+    intercept: float
+    home_advantage: float
+    rho: float
+    log_likelihood: float
+    iterations: int
+    matches: int
+
+    def expected_goals(self, home: np.ndarray, away: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Expected goals of the home and away teams of each match."""
+        return (
+            np.exp(self.intercept + self.home_advantage + self.attack[home] + self.defence[away]),
+            np.exp(self.intercept + self.attack[away] + self.defence[home]),
+        )
+
+
+def match_weights(days: np.ndarray, reference_day: float, half_life_days: float) -> np.ndarray:
+    """Time weights of matches played on ``days``, 1 on ``reference_day``."""
+    return np.exp(-np.log(2.0) / half_life_days * np.maximum(reference_day - days, 0.0))
+
+
+def fit_dixon_coles(
+    matches: Matches,
+    reference_day: float,
+    parameters: DixonColesParameters = DixonColesParameters(),
+    initial: Optional[tuple[np.ndarray, np.ndarray]] = None,
+) -> DixonColesFit:
+    """
+    Fit attack and defence strengths, home advantage and ``rho`` on played matches.
+
+    The Poisson part is fitted by cyclic maximization: given the other
+    parameters, the weighted likelihood of each block (intercept, home
+    advantage, attacks, defences) has a closed-form maximum, computed for
+    all teams at once with ``np.bincount`` over the matches. ``rho`` is then
+    fitted on the Poisson rates by evaluating the likelihood of the low
+    scores for a whole grid of candidate values in one batch, twice refined.
+
+    Args:
+        matches: Played matches
+        reference_day: Day the weights are computed from (e.g. today)
+        parameters: Fitting parameters
+        initial: Attack and defence strengths to start from (e.g. the stored
+            ones, by team index)
+
+    Returns:
+        Fitted model
+    """
+    n_teams = matches.n_teams
+    in_window = matches.day >= reference_day - parameters.window_days
+    home, away = matches.home[in_window], matches.away[in_window]
+    goals_home = matches.goals_home[in_window].astype(np.float64)
+    goals_away = matches.goals_away[in_window].astype(np.float64)
+    weight = match_weights(matches.day[in_window], reference_day, parameters.half_life_days)
+
+    attack = np.zeros(n_teams)
+    defence = np.zeros(n_teams)
+    if initial is not None:
+        known = min(len(initial[0]), n_teams)
+        attack[:known], defence[:known] = initial[0][:known], initial[1][:known]
+    if not len(home):
+        return DixonColesFit(attack, defence, 0.0, 0.0, 0.0, 0.0, 0, 0)
+
+    # Weighted goals scored and conceded by each team: the numerators of the updates
+    scored = np.bincount(home, weight * goals_home, n_teams) + np.bincount(away, weight * goals_away, n_teams)
+    conceded = np.bincount(away, weight * goals_home, n_teams) + np.bincount(home, weight * goals_away, n_teams)
+    played = np.bincount(home, weight, n_teams) + np.bincount(away, weight, n_teams) > 0
+    total_home, total_away = np.dot(weight, goals_home), np.dot(weight, goals_away)
+
+    intercept = np.log(max(total_home + total_away, 1e-9) / (2 * weight.sum()))
+    home_advantage = np.log(max(total_home, 1e-9) / max(total_away, 1e-9))
+
+    iterations = 0
+    for iterations in range(1, parameters.max_iterations + 1):
+        previous = np.concatenate([attack, defence, [intercept, home_advantage]])
+
+        # Attack: goals scored / goals expected with attack 0
+        base_home = weight * np.exp(intercept + home_advantage + defence[away])
+        base_away = weight * np.exp(intercept + defence[home])
+        expected = np.bincount(home, base_home, n_teams) + np.bincount(away, base_away, n_teams)
+        attack = np.where(played, np.log(np.maximum(scored, 1e-9) / np.maximum(expected, 1e-300)), 0.0)
+
+        # Defence: goals conceded / goals expected with defence 0
+        base_home = weight * np.exp(intercept + home_advantage + attack[home])
+        base_away = weight * np.exp(intercept + attack[away])
+        expected = np.bincount(away, base_home, n_teams) + np.bincount(home, base_away, n_teams)
+        defence = np.where(played, np.log(np.maximum(conceded, 1e-9) / np.maximum(expected, 1e-300)), 0.0)
+
+        # Strengths are relative: centre them on the teams that played and move the level to the intercept
+        intercept += attack[played].mean() + defence[played].mean()
+        attack[played] -= attack[played].mean()
+        defence[played] -= defence[played].mean()
+
+        rate_home = np.exp(attack[home] + defence[away])
+        rate_away = np.exp(attack[away] + defence[home])
+        home_advantage = np.log(max(total_home, 1e-9) / np.dot(weight, rate_home)) - intercept
+        intercept = np.log(
+            max(total_home + total_away, 1e-9)
+            / (np.exp(home_advantage) * np.dot(weight, rate_home) + np.dot(weight, rate_away))
+        )
+
+        change = np.abs(np.concatenate([attack, defence, [intercept, home_advantage]]) - previous).max()
+        if change < parameters.tolerance:
+            break
+
+    fit = DixonColesFit(attack, defence, float(intercept), float(home_advantage), 0.0, 0.0, iterations, len(home))
+    lambda_home, lambda_away = fit.expected_goals(home, away)
+    fit.rho = _fit_rho(goals_home, goals_away, lambda_home, lambda_away, weight)
+    fit.log_likelihood = float(
+        np.dot(weight, _poisson_log_pmf(goals_home, lambda_home) + _poisson_log_pmf(goals_away, lambda_away))
+        + _rho_log_likelihood(np.array([fit.rho]), goals_home, goals_away, lambda_home, lambda_away, weight)[0]
+    )
+    return fit
+
+
+def _poisson_log_pmf(goals: np.ndarray, rate: np.ndarray) -> np.ndarray:
+    log_factorial = np.cumsum(np.r_[0.0, np.log(np.arange(1, int(goals.max(initial=0)) + 1))])
+    return goals * np.log(rate) - rate - log_factorial[goals.astype(np.int64)]
+
+
+def _tau(
+    rho: np.ndarray,
+    goals_home: np.ndarray,
+    goals_away: np.ndarray,
+    lambda_home: np.ndarray,
+    lambda_away: np.ndarray,
+) -> np.ndarray:
+    """Dixon-Coles low-score correction, for every rho (rows) and match (columns)."""
+    rho = rho[:, None]
+    tau = np.ones((len(rho), len(goals_home)))
+    for score_home, score_away, factor in (
+        (0, 0, 1 - lambda_home * lambda_away * rho),
+        (1, 0, 1 + lambda_away * rho),
+        (0, 1, 1 + lambda_home * rho),
+        (1, 1, 1 - rho),
+    ):
+        mask = (goals_home == score_home) & (goals_away == score_away)
+        tau = np.where(mask, factor, tau)
+    return tau
+
+
+def _rho_log_likelihood(
+    rho: np.ndarray,
+    goals_home: np.ndarray,
+    goals_away: np.ndarray,
+    lambda_home: np.ndarray,
+    lambda_away: np.ndarray,
+    weight: np.ndarray,
+) -> np.ndarray:
+    """Weighted log-likelihood of the low-score correction, for each candidate rho."""
+    low = (goals_home <= 1) & (goals_away <= 1)
+    tau = _tau(rho, goals_home[low], goals_away[low], lambda_home[low], lambda_away[low])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_tau = np.where(tau > 0, np.log(np.maximum(tau, 1e-300)), -np.inf)
+    return log_tau @ weight[low]
+
+
+def _fit_rho(
+    goals_home: np.ndarray,
+    goals_away: np.ndarray,
+    lambda_home: np.ndarray,
+    lambda_away: np.ndarray,
+    weight: np.ndarray,
+    grid_size: int = 41,
+    refinements: int = 2,
+) -> float:
+    """Maximize the low-score likelihood over a grid of rho, refined around the best value."""
+    low, high = -0.3, 0.3
+    best = 0.0
+    for _ in range(refinements + 1):
+        candidates = np.linspace(low, high, grid_size)
+        likelihood = _rho_log_likelihood(candidates, goals_home, goals_away, lambda_home, lambda_away, weight)
+        best = float(candidates[np.argmax(likelihood)])
+        step = (high - low) / (grid_size - 1)
+        low, high = best - step, best + step
+    return best
+
+
+def outcome_probabilities(
+    lambda_home: np.ndarray,
+    lambda_away: np.ndarray,
+    rho: float,
+    max_goals: int = 10,
+    chunk_size: int = 100_000,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Home win, draw and away win probabilities of matches.
+
+    The score matrix of every match (goals 0..max_goals for each team) is
+    built as a batch of outer products, corrected for the low scores and
+    summed below, on and above its diagonal.
+
+    Args:
+        lambda_home: Expected home goals of each match
+        lambda_away: Expected away goals of each match
+        rho: Low-score correction
+        max_goals: Highest number of goals per team in the score matrices
+        chunk_size: Matches per batch (each takes (max_goals + 1)^2 floats)
+
+    Returns:
+        Probabilities of a home win, a draw and an away win
+    """
+    goals = np.arange(max_goals + 1)
+    log_factorial = np.cumsum(np.r_[0.0, np.log(np.arange(1, max_goals + 1))])
+    home_wins = np.tril(np.ones((max_goals + 1, max_goals + 1)), -1)
+    draws = np.eye(max_goals + 1)
+
+    p_home, p_draw, p_away = (np.empty(len(lambda_home)) for _ in range(3))
+    for start in range(0, len(lambda_home), chunk_size):
+        rates_home = lambda_home[start:start + chunk_size, None]
+        rates_away = lambda_away[start:start + chunk_size, None]
+        pmf_home = np.exp(goals * np.log(rates_home) - rates_home - log_factorial)
+        pmf_away = np.exp(goals * np.log(rates_away) - rates_away - log_factorial)
+        scores = pmf_home[:, :, None] * pmf_away[:, None, :]
+
+        rates_home, rates_away = rates_home[:, 0], rates_away[:, 0]
+        scores[:, 0, 0] *= 1 - rates_home * rates_away * rho
+        scores[:, 1, 0] *= 1 + rates_away * rho
+        scores[:, 0, 1] *= 1 + rates_home * rho
+        scores[:, 1, 1] *= 1 - rho
+        total = scores.sum(axis=(1, 2))
+
+        batch = slice(start, start + chunk_size)
+        p_home[batch] = np.einsum("nij,ij->n", scores, home_wins) / total
+        p_draw[batch] = np.einsum("nij,ij->n", scores, draws) / total
+        p_away[batch] = 1 - p_home[batch] - p_draw[batch]
+    return p_home, p_draw, p_away
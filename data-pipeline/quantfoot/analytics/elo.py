@@ -0,0 +1,127 @@
+"""
+Elo ratings with time decay, updated one match day at a time.
+"""
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from .matches import Matches
+
+
+@dataclass(frozen=True)
+class EloParameters:
+    """Parameters of the Elo model."""
+
+    # Rating of a team never seen, and mean the ratings decay towards
+    initial: float = 1500.0
+    # Points exchanged by a one-goal result against an equal opponent
+    k: float = float(os.getenv("ELO_K", "20"))
+    # Rating points of playing at home
+    home_advantage: float = float(os.getenv("ELO_HOME_ADVANTAGE", "60"))
+    # Days without a match after which half the gap to ``initial`` is lost
+    half_life_days: float = float(os.getenv("ELO_HALF_LIFE_DAYS", "730"))
+
+
+@dataclass
+class EloState:
+    """Ratings of every team, and the day each team last played (NaN when it never did)."""
+
+    ratings: np.ndarray
+    last_day: np.ndarray
+    matches_played: np.ndarray
+
+    @classmethod
+    def initial(cls, n_teams: int, parameters: EloParameters) -> "EloState":
+        return cls(
+            ratings=np.full(n_teams, parameters.initial),
+            last_day=np.full(n_teams, np.nan),
+            matches_played=np.zeros(n_teams, dtype=np.int64),
+        )
+
+    def extended(self, n_teams: int, parameters: EloParameters) -> "EloState":
+        """Same state with initial ratings for the teams numbered after the known ones."""
+        missing = n_teams - len(self.ratings)
+        if missing <= 0:
+            return self
+        fresh = EloState.initial(missing, parameters)
+        return EloState(
+            ratings=np.concatenate([self.ratings, fresh.ratings]),
+            last_day=np.concatenate([self.last_day, fresh.last_day]),
+            matches_played=np.concatenate([self.matches_played, fresh.matches_played]),
+        )
+
+
+def expectancy(rating_home: np.ndarray, rating_away: np.ndarray, parameters: EloParameters) -> np.ndarray:
+    """Expected score of the home team (win 1, draw 0.5), for arrays of ratings."""
+    return 1.0 / (1.0 + 10.0 ** (-(rating_home + parameters.home_advantage - rating_away) / 400.0))
+
+
+def goal_difference_multiplier(goal_difference: np.ndarray) -> np.ndarray:
+    """World Football Elo margin multiplier: 1, 1.5 for two goals, (11 + n) / 8 above."""
+    margin = np.abs(goal_difference)
+    return np.where(margin <= 1, 1.0, np.where(margin == 2, 1.5, (11.0 + margin) / 8.0))
+
+
+def update_elo(state: EloState, matches: Matches, parameters: EloParameters) -> tuple[EloState, np.ndarray, np.ndarray]:
+    """
+    Apply played matches to the ratings, in date order.
+
+    A team plays at most once a day, so all the matches of a day are applied
+    together: one gather of the ratings, one vectorized expectancy and one
+    scatter of the rating changes per day, instead of a Python step per
+    match. Before its first match of a day, the rating of a team decays
+    towards ``initial`` by half every ``half_life_days`` since its last match
+    (not at all for a result dated before it, arriving late).
+
+    Args:
+        state: Ratings before the matches (updated in place)
+        matches: Played matches, sorted by day
+        parameters: Elo parameters
+
+    Returns:
+        The updated state, and the ratings of the home and away teams before
+        each match (pre-match ratings, aligned with ``matches``)
+    """
+    ratings, last_day = state.ratings, state.last_day
+    home_before = np.empty(len(matches))
+    away_before = np.empty(len(matches))
+    if not len(matches):
+        return state, home_before, away_before
+
+    days = np.floor(matches.day)
+    result = np.sign(matches.goals_home - matches.goals_away) * 0.5 + 0.5
+    weight = parameters.k * goal_difference_multiplier(matches.goals_home - matches.goals_away)
+    decay_rate = np.log(2.0) / parameters.half_life_days
+
+    # One slice of matches per day
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    ends = np.r_[starts[1:], len(matches)]
+
+    for start, end in zip(starts, ends):
+        day = days[start]
+        home, away = matches.home[start:end], matches.away[start:end]
+        teams = np.concatenate([home, away])
+
+        # A result older than the team's last match is applied without decay
+        idle = np.maximum(day - last_day[teams], 0.0)
+        decay = np.where(np.isnan(idle), 1.0, np.exp(-decay_rate * np.nan_to_num(idle)))
+        ratings[teams] = parameters.initial + (ratings[teams] - parameters.initial) * decay
+
+        rating_home, rating_away = ratings[home], ratings[away]
+        home_before[start:end], away_before[start:end] = rating_home, rating_away
+        change = weight[start:end] * (result[start:end] - expectancy(rating_home, rating_away, parameters))
+        np.add.at(ratings, home, change)
+        np.add.at(ratings, away, -change)
+        last_day[teams] = np.fmax(last_day[teams], day)
+
+    np.add.at(state.matches_played, matches.home, 1)
+    np.add.at(state.matches_played, matches.away, 1)
+    return state, home_before, away_before
+
+
+def ratings_at(state: EloState, teams: np.ndarray, days: np.ndarray, parameters: EloParameters) -> np.ndarray:
+    """Ratings of ``teams`` decayed to ``days`` (e.g. today, or kickoffs), without changing the state."""
+    idle = np.maximum(days - state.last_day[teams], 0.0)
+    decay = np.where(np.isnan(idle), 1.0, np.exp(-np.log(2.0) / parameters.half_life_days * np.nan_to_num(idle)))
+    return parameters.initial + (state.ratings[teams] - parameters.initial) * decay
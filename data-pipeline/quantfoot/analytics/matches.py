@@ -0,0 +1,156 @@
+"""
+Fixtures of ``marts.fixtures`` as NumPy arrays.
+"""
+import io
+from dataclasses import dataclass, fields
+from typing import Optional
+
+import numpy as np
+import psycopg2.extensions
+
+# Statuses of a fixture whose score is final
+PLAYED_STATUSES = ("FT", "AET", "PEN")
+
+# Statuses of a fixture that has not kicked off yet
+UPCOMING_STATUSES = ("TBD", "NS")
+
+SECONDS_PER_DAY = 86400.0
+
+
+@dataclass
+class Matches:
+    """Fixtures as parallel arrays, one element per fixture.
+
+    Teams are numbered ``0 .. n_teams - 1`` (``home``/``away``), so ratings
+    are plain arrays indexed by team and every model update is a gather
+    (``ratings[home]``) or a scatter (``np.add.at``, ``np.bincount``).
+    Goals of fixtures that were not played are -1.
+    """
+
+    fixture_id: np.ndarray  # int64
+    day: np.ndarray  # float64, days since the Unix epoch
+    home: np.ndarray  # int64 team index
+    away: np.ndarray  # int64 team index
+    goals_home: np.ndarray  # int64
+    goals_away: np.ndarray  # int64
+    team_ids: np.ndarray  # int64 team_id of each team index
+
+    @classmethod
+    def from_columns(
+        cls,
+        fixture_id: np.ndarray,
+        day: np.ndarray,
+        home_team_id: np.ndarray,
+        away_team_id: np.ndarray,
+        goals_home: np.ndarray,
+        goals_away: np.ndarray,
+        team_ids: Optional[np.ndarray] = None,
+    ) -> "Matches":
+        """
+        Build matches from team ids, numbering the teams.
+
+        Args:
+            fixture_id, day, home_team_id, away_team_id, goals_home, goals_away: Columns
+                (goals -1 when not played)
+            team_ids: Teams to number first, in this order (e.g. the teams of
+                stored ratings); teams not in it are numbered after them
+
+        Returns:
+            Matches sorted by day
+        """
+        known = np.asarray(team_ids if team_ids is not None else [], dtype=np.int64)
+        playing = np.unique(np.concatenate([home_team_id, away_team_id]).astype(np.int64))
+        all_ids = np.concatenate([known, np.setdiff1d(playing, known, assume_unique=True)])
+
+        # Team id -> index through a sorted lookup
+        order = np.argsort(all_ids, kind="stable")
+        sorted_ids = all_ids[order]
+
+        def index(ids: np.ndarray) -> np.ndarray:
+            return order[np.searchsorted(sorted_ids, np.asarray(ids, dtype=np.int64))]
+
+        by_day = np.argsort(day, kind="stable")
+        return cls(
+            fixture_id=np.asarray(fixture_id, dtype=np.int64)[by_day],
+            day=np.asarray(day, dtype=np.float64)[by_day],
+            home=index(home_team_id)[by_day],
+            away=index(away_team_id)[by_day],
+            goals_home=np.asarray(goals_home, dtype=np.int64)[by_day],
+            goals_away=np.asarray(goals_away, dtype=np.int64)[by_day],
+            team_ids=all_ids,
+        )
+
+    def __len__(self) -> int:
+        return len(self.fixture_id)
+
+    @property
+    def n_teams(self) -> int:
+        return len(self.team_ids)
+
+    def take(self, mask: np.ndarray) -> "Matches":
+        """Matches selected by a boolean mask or index array (same team numbering)."""
+        return Matches(**{
+            field.name: getattr(self, field.name) if field.name == "team_ids" else getattr(self, field.name)[mask]
+            for field in fields(self)
+        })
+
+
+def load_matches(
+    connection: psycopg2.extensions.connection,
+    team_ids: Optional[np.ndarray] = None,
+) -> tuple[Matches, np.ndarray, np.ndarray]:
+    """
+    Read the played and upcoming fixtures of ``marts.fixtures``.
+
+    The columns are streamed with ``COPY ... TO STDOUT`` and parsed by NumPy,
+    without building a Python object per fixture.
+
+    Args:
+        connection: Connection to the data database
+        team_ids: Teams to number first (see ``Matches.from_columns``)
+
+    Returns:
+        The matches, a mask of the played ones and a mask of the upcoming ones
+    """
+    buffer = io.StringIO()
+    with connection.cursor() as cursor:
+        query = cursor.mogrify(
+            """
+            select fixture_id,
+                   extract(epoch from fixture_datetime)::float8 / %s,
+                   home_team_id,
+                   away_team_id,
+                   case when status = any(%s) then goals_home else -1 end,
+                   case when status = any(%s) then goals_away else -1 end
+            from marts.fixtures
+            where fixture_datetime is not null
+              and ((status = any(%s) and goals_home is not null and goals_away is not null)
+                   or status = any(%s))
+            """,
+            (
+                SECONDS_PER_DAY,
+                list(PLAYED_STATUSES),
+                list(PLAYED_STATUSES),
+                list(PLAYED_STATUSES),
+                list(UPCOMING_STATUSES),
+            ),
+        ).decode()
+        cursor.copy_expert(f"copy ({query}) to stdout with (format csv)", buffer)
+
+    if buffer.tell():
+        buffer.seek(0)
+        columns = np.loadtxt(buffer, delimiter=",", dtype=np.float64, ndmin=2).T
+    else:
+        columns = np.empty((6, 0))
+    matches = Matches.from_columns(
+        fixture_id=columns[0],
+        day=columns[1],
+        home_team_id=columns[2],
+        away_team_id=columns[3],
+        goals_home=columns[4],
+        goals_away=columns[5],
+        team_ids=team_ids,
+    )
+    # Upcoming fixtures are the ones whose goals were not read
+    played = matches.goals_home >= 0
+    return matches, played, ~played
@@ -0,0 +1,323 @@
+"""
+Incremental update of the team ratings and fixture probabilities stored in Postgres.
+
+Tables (schema "analytics"):
+- team_ratings: Elo rating (now, and after the team's last match), matches
+  rated, and Dixon-Coles attack and defence of every team
+- fixture_probabilities: pre-match Elo ratings and home win expectancy of
+  every played fixture, Dixon-Coles expected goals and outcome probabilities
+  of every upcoming fixture (kept as the last pre-match forecast once played)
+"""
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import psycopg2.extensions
+from psycopg2.extras import execute_values
+
+from .dixon_coles import DixonColesFit, DixonColesParameters, fit_dixon_coles, outcome_probabilities
+from .elo import EloParameters, EloState, expectancy, ratings_at, update_elo
+from .matches import SECONDS_PER_DAY, Matches, load_matches
+
+SCHEMA = "analytics"
+
+DDL = f"""
+create schema if not exists {SCHEMA};
+
+create table if not exists {SCHEMA}.team_ratings (
+    team_id bigint primary key,
+    elo double precision not null,
+    elo_after_last_match double precision not null,
+    elo_last_match_at timestamptz,
+    elo_matches integer not null,
+    attack double precision,
+    defence double precision,
+    updated_at timestamptz not null default now()
+);
+
+create table if not exists {SCHEMA}.fixture_probabilities (
+    fixture_id bigint primary key,
+    fixture_datetime timestamptz not null,
+    home_team_id bigint not null,
+    away_team_id bigint not null,
+    home_elo double precision,
+    away_elo double precision,
+    elo_home_expectancy double precision,
+    expected_goals_home double precision,
+    expected_goals_away double precision,
+    p_home double precision,
+    p_draw double precision,
+    p_away double precision,
+    elo_applied boolean not null default false,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists fixture_probabilities_home_team_id_idx on {SCHEMA}.fixture_probabilities (home_team_id);
+create index if not exists fixture_probabilities_away_team_id_idx on {SCHEMA}.fixture_probabilities (away_team_id);
+"""
+
+
+@dataclass
+class RatingsUpdate:
+    """What an update did, for the asset metadata."""
+
+    teams: int = 0
+    fixtures_rated: int = 0
+    fixtures_forecast: int = 0
+    load_seconds: float = 0.0
+    elo_seconds: float = 0.0
+    fit_seconds: float = 0.0
+    write_seconds: float = 0.0
+    fit: Optional[DixonColesFit] = None
+
+
+def update_ratings(
+    connection: psycopg2.extensions.connection,
+    full_refresh: bool = False,
+    elo_parameters: EloParameters = EloParameters(),
+    dixon_coles_parameters: DixonColesParameters = DixonColesParameters(),
+    now: Optional[float] = None,
+) -> RatingsUpdate:
+    """
+    Bring the stored ratings and probabilities up to date with ``marts.fixtures``.
+
+    Elo ratings continue from the stored ones: only the played fixtures that
+    were never rated are applied (in date order; a result arriving late is
+    applied after the ones already rated). The Dixon-Coles model is refitted
+    on the recent matches, starting from the stored strengths, and every
+    upcoming fixture gets new probabilities. Everything is written in one
+    transaction, so ratings and rated fixtures never disagree.
+
+    Args:
+        connection: Connection to the data database
+        full_refresh: Drop the stored ratings and rate every played fixture again
+            (e.g. after changing the Elo parameters)
+        elo_parameters: Elo parameters
+        dixon_coles_parameters: Dixon-Coles fitting parameters
+        now: Unix time of the update (default: now)
+
+    Returns:
+        Summary of the update
+    """
+    today = (now if now is not None else time.time()) / SECONDS_PER_DAY
+    update = RatingsUpdate()
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(DDL)
+            if full_refresh:
+                cursor.execute(f"truncate {SCHEMA}.team_ratings, {SCHEMA}.fixture_probabilities")
+
+            team_ids, state, attack, defence = _stored_ratings(cursor, elo_parameters)
+            cursor.execute(f"select fixture_id from {SCHEMA}.fixture_probabilities where elo_applied")
+            rated_ids = np.array([fixture_id for (fixture_id,) in cursor.fetchall()], dtype=np.int64)
+
+        started = time.perf_counter()
+        matches, played, upcoming = load_matches(connection, team_ids)
+        state = state.extended(matches.n_teams, elo_parameters)
+        update.load_seconds = time.perf_counter() - started
+
+        # Elo: played fixtures not rated yet, from the stored ratings
+        started = time.perf_counter()
+        to_rate = matches.take(played & ~np.isin(matches.fixture_id, rated_ids))
+        state, home_before, away_before = update_elo(state, to_rate, elo_parameters)
+        update.elo_seconds = time.perf_counter() - started
+
+        # Dixon-Coles: refit on the recent played matches, from the stored strengths
+        started = time.perf_counter()
+        fit = fit_dixon_coles(matches.take(played), today, dixon_coles_parameters, initial=(attack, defence))
+        update.fit_seconds = time.perf_counter() - started
+
+        forecast = matches.take(upcoming)
+        lambda_home, lambda_away = fit.expected_goals(forecast.home, forecast.away)
+        p_home, p_draw, p_away = outcome_probabilities(
+            lambda_home, lambda_away, fit.rho, dixon_coles_parameters.max_goals
+        )
+        # Elo of the upcoming fixtures: current ratings, decayed to the kickoff
+        elo_home = ratings_at(state, forecast.home, forecast.day, elo_parameters)
+        elo_away = ratings_at(state, forecast.away, forecast.day, elo_parameters)
+
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            _write_team_ratings(cursor, matches.team_ids, state, fit, today, elo_parameters)
+            _write_rated_fixtures(cursor, to_rate, home_before, away_before, elo_parameters)
+            _write_forecasts(
+                cursor, forecast, elo_home, elo_away, lambda_home, lambda_away, p_home, p_draw, p_away, elo_parameters
+            )
+        connection.commit()
+        update.write_seconds = time.perf_counter() - started
+    except Exception:
+        connection.rollback()
+        raise
+
+    update.teams = matches.n_teams
+    update.fixtures_rated = len(to_rate)
+    update.fixtures_forecast = len(forecast)
+    update.fit = fit
+    return update
+
+
+def _stored_ratings(
+    cursor: psycopg2.extensions.cursor,
+    parameters: EloParameters,
+) -> tuple[np.ndarray, EloState, np.ndarray, np.ndarray]:
+    """Team ids, Elo state and Dixon-Coles strengths of the stored ratings, in the same team order."""
+    cursor.execute(
+        f"""
+        select team_id, elo_after_last_match, extract(epoch from elo_last_match_at)::float8 / %s,
+               elo_matches, coalesce(attack, 0), coalesce(defence, 0)
+        from {SCHEMA}.team_ratings
+        order by team_id
+        """,
+        (SECONDS_PER_DAY,),
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return np.empty(0, dtype=np.int64), EloState.initial(0, parameters), np.empty(0), np.empty(0)
+
+    # NULL (never played) -> NaN
+    columns = np.array(rows, dtype=np.float64).T
+    state = EloState(ratings=columns[1], last_day=columns[2], matches_played=columns[3].astype(np.int64))
+    return columns[0].astype(np.int64), state, columns[4], columns[5]
+
+
+def _timestamp(day: float) -> Optional[float]:
+    return None if np.isnan(day) else float(day) * SECONDS_PER_DAY
+
+
+def _write_team_ratings(
+    cursor: psycopg2.extensions.cursor,
+    team_ids: np.ndarray,
+    state: EloState,
+    fit: DixonColesFit,
+    today: float,
+    parameters: EloParameters,
+) -> None:
+    elo_now = ratings_at(state, np.arange(len(team_ids)), np.full(len(team_ids), today), parameters)
+    execute_values(
+        cursor,
+        f"""
+        insert into {SCHEMA}.team_ratings
+            (team_id, elo, elo_after_last_match, elo_last_match_at, elo_matches, attack, defence, updated_at)
+        values %s
+        on conflict (team_id) do update set
+            elo = excluded.elo,
+            elo_after_last_match = excluded.elo_after_last_match,
+            elo_last_match_at = excluded.elo_last_match_at,
+            elo_matches = excluded.elo_matches,
+            attack = excluded.attack,
+            defence = excluded.defence,
+            updated_at = excluded.updated_at
+        """,
+        list(zip(
+            team_ids.tolist(),
+            elo_now.tolist(),
+            state.ratings.tolist(),
+            [_timestamp(day) for day in state.last_day],
+            state.matches_played.tolist(),
+            fit.attack.tolist(),
+            fit.defence.tolist(),
+        )),
+        template="(%s, %s, %s, to_timestamp(%s), %s, %s, %s, now())",
+        page_size=1000,
+    )
+
+
+def _write_rated_fixtures(
+    cursor: psycopg2.extensions.cursor,
+    matches: Matches,
+    home_before: np.ndarray,
+    away_before: np.ndarray,
+    parameters: EloParameters,
+) -> None:
+    """Pre-match Elo of the fixtures just rated (their last forecast, if any, is kept)."""
+    if not len(matches):
+        return
+    execute_values(
+        cursor,
+        f"""
+        insert into {SCHEMA}.fixture_probabilities
+            (fixture_id, fixture_datetime, home_team_id, away_team_id,
+             home_elo, away_elo, elo_home_expectancy, elo_applied, updated_at)
+        values %s
+        on conflict (fixture_id) do update set
+            fixture_datetime = excluded.fixture_datetime,
+            home_elo = excluded.home_elo,
+            away_elo = excluded.away_elo,
+            elo_home_expectancy = excluded.elo_home_expectancy,
+            elo_applied = true,
+            updated_at = excluded.updated_at
+        """,
+        list(zip(
+            matches.fixture_id.tolist(),
+            (matches.day * SECONDS_PER_DAY).tolist(),
+            matches.team_ids[matches.home].tolist(),
+            matches.team_ids[matches.away].tolist(),
+            home_before.tolist(),
+            away_before.tolist(),
+            expectancy(home_before, away_before, parameters).tolist(),
+        )),
+        template="(%s, to_timestamp(%s), %s, %s, %s, %s, %s, true, now())",
+        page_size=1000,
+    )
+
+
+def _write_forecasts(
+    cursor: psycopg2.extensions.cursor,
+    matches: Matches,
+    elo_home: np.ndarray,
+    elo_away: np.ndarray,
+    lambda_home: np.ndarray,
+    lambda_away: np.ndarray,
+    p_home: np.ndarray,
+    p_draw: np.ndarray,
+    p_away: np.ndarray,
+    parameters: EloParameters,
+) -> None:
+    """Replace the forecasts of the fixtures not played yet."""
+    # Forecasts of fixtures that are no longer upcoming nor played (postponed, cancelled)
+    cursor.execute(
+        f"delete from {SCHEMA}.fixture_probabilities where not elo_applied and fixture_id <> all(%s)",
+        (matches.fixture_id.tolist(),),
+    )
+    if not len(matches):
+        return
+    execute_values(
+        cursor,
+        f"""
+        insert into {SCHEMA}.fixture_probabilities
+            (fixture_id, fixture_datetime, home_team_id, away_team_id, home_elo, away_elo, elo_home_expectancy,
+             expected_goals_home, expected_goals_away, p_home, p_draw, p_away, elo_applied, updated_at)
+        values %s
+        on conflict (fixture_id) do update set
+            fixture_datetime = excluded.fixture_datetime,
+            home_team_id = excluded.home_team_id,
+            away_team_id = excluded.away_team_id,
+            home_elo = excluded.home_elo,
+            away_elo = excluded.away_elo,
+            elo_home_expectancy = excluded.elo_home_expectancy,
+            expected_goals_home = excluded.expected_goals_home,
+            expected_goals_away = excluded.expected_goals_away,
+            p_home = excluded.p_home,
+            p_draw = excluded.p_draw,
+            p_away = excluded.p_away,
+            updated_at = excluded.updated_at
+        """,
+        list(zip(
+            matches.fixture_id.tolist(),
+            (matches.day * SECONDS_PER_DAY).tolist(),
+            matches.team_ids[matches.home].tolist(),
+            matches.team_ids[matches.away].tolist(),
+            elo_home.tolist(),
+            elo_away.tolist(),
+            expectancy(elo_home, elo_away, parameters).tolist(),
+            lambda_home.tolist(),
+            lambda_away.tolist(),
+            p_home.tolist(),
+            p_draw.tolist(),
+            p_away.tolist(),
+        )),
+        template="(%s, to_timestamp(%s), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, false, now())",
+        page_size=1000,
+    )
@@ -1,11 +1,24 @@
 """
 Export all assets for Dagster.
 """
-from .leagues import api_football_raw_assets
+from .leagues import (
+    api_football_reference_assets,
+    api_football_team_assets,
+    api_football_fixtures_assets,
+    api_football_fixture_details_assets,
+)
 from .dbt import quantfoot_dbt_assets
+from .analytics import analytics_ratings_assets
+from .documents import documents_export_assets
+from .validation import validation_checks
 
 __all__ = [
-    "api_football_raw_assets",
+    "api_football_reference_assets",
+    "api_football_team_assets",
+    "api_football_fixtures_assets",
+    "api_football_fixture_details_assets",
     "quantfoot_dbt_assets",
+    "analytics_ratings_assets",
+    "documents_export_assets",
+    "validation_checks",
 ]
-
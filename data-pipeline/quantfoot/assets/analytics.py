@@ -0,0 +1,85 @@
+"""
+Dagster assets of the team ratings and match probabilities (see ``quantfoot.analytics``).
+"""
+from dagster import AssetExecutionContext, AssetKey, AssetSpec, Config, MaterializeResult, multi_asset
+from dagster_dbt import get_asset_key_for_model
+
+from ..analytics import update_ratings
+from ..postgres import connect
+from .dbt import quantfoot_dbt_assets
+
+TEAM_RATINGS_KEY = AssetKey(["analytics", "team_ratings"])
+FIXTURE_PROBABILITIES_KEY = AssetKey(["analytics", "fixture_probabilities"])
+
+
+class RatingsConfig(Config):
+    """Run configuration of the ratings update."""
+
+    # Rate every played fixture again instead of continuing from the stored ratings
+    full_refresh: bool = False
+
+
+@multi_asset(
+    specs=[
+        AssetSpec(
+            key=TEAM_RATINGS_KEY,
+            deps=[get_asset_key_for_model([quantfoot_dbt_assets], "fixtures")],
+            description="Elo rating and Dixon-Coles attack/defence of every team",
+            kinds={"numpy", "postgres"},
+        ),
+        AssetSpec(
+            key=FIXTURE_PROBABILITIES_KEY,
+            deps=[TEAM_RATINGS_KEY],
+            description="Pre-match Elo and outcome probabilities of every fixture",
+            kinds={"numpy", "postgres"},
+        ),
+    ],
+    name="analytics_ratings",
+    group_name="analytics",
+)
+def analytics_ratings_assets(context: AssetExecutionContext, config: RatingsConfig):
+    """
+    Update the team ratings and fixture probabilities from ``marts.fixtures``.
+
+    Elo ratings continue from the stored ones with the fixtures played since
+    the last update; the Dixon-Coles model is refitted on the recent matches
+    from the stored strengths and forecasts every upcoming fixture.
+
+    Set `full_refresh: true` in the run config to rate every fixture again.
+    """
+    connection = connect("quantfoot-analytics")
+    try:
+        update = update_ratings(connection, full_refresh=config.full_refresh)
+    finally:
+        connection.close()
+
+    fit = update.fit
+    context.log.info(
+        f"Rated {update.fixtures_rated} fixtures in {update.elo_seconds:.3f}s, "
+        f"fitted Dixon-Coles on {fit.matches} matches in {update.fit_seconds:.3f}s "
+        f"({fit.iterations} iterations), forecast {update.fixtures_forecast} fixtures"
+    )
+
+    yield MaterializeResult(
+        asset_key=TEAM_RATINGS_KEY,
+        metadata={
+            "teams": update.teams,
+            "fixtures_rated": update.fixtures_rated,
+            "elo_s": round(update.elo_seconds, 3),
+            "dixon_coles_matches": fit.matches,
+            "dixon_coles_iterations": fit.iterations,
+            "dixon_coles_fit_s": round(update.fit_seconds, 3),
+            "dixon_coles_log_likelihood": round(fit.log_likelihood, 3),
+            "home_advantage": round(fit.home_advantage, 4),
+            "rho": round(fit.rho, 4),
+            "load_s": round(update.load_seconds, 3),
+        },
+    )
+    yield MaterializeResult(
+        asset_key=FIXTURE_PROBABILITIES_KEY,
+        metadata={
+            "fixtures_rated": update.fixtures_rated,
+            "fixtures_forecast": update.fixtures_forecast,
+            "write_s": round(update.write_seconds, 3),
+        },
+    )
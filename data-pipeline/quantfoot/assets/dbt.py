@@ -1,23 +1,125 @@
 """
 dbt assets for transforming raw data to staging.
 """
+import functools
+import hashlib
+import json
 import os
 from pathlib import Path
-from dagster import AssetExecutionContext
-from dagster_dbt import DbtCliResource, dbt_assets, DbtProject
+from typing import Any, Mapping
+from dagster import AssetExecutionContext, AssetKey, Config, get_dagster_logger
+from dagster_dbt import DagsterDbtTranslator, DbtCliResource, dbt_assets, DbtProject
+
+from ..instrumentation import instrument_dbt_run
+from ..publish import BLUE_GREEN, SHADOW_SCHEMA, publish_shadow_schema, reset_shadow_schema
+from ..seasons import freeze_closed_seasons
+from .dbt_state import (
+    DbtState,
+    changes_report,
+    completed_loads,
+    raw_changes,
+    raw_tables,
+    selected_nodes,
+    unselected_node_names,
+)
+from .leagues import SOURCE_NAME
 
 # Point to the dbt project
 DBT_PROJECT_DIR = Path(__file__).parent.parent.parent / "dbt_project"
 
+# Manifest and raw loads of the last successful build (see DbtState)
+DBT_STATE_DIR = Path(os.getenv("DBT_STATE_DIR") or DBT_PROJECT_DIR / "state")
+
 dbt_project = DbtProject(
     project_dir=DBT_PROJECT_DIR,
 )
 
+# Project files the manifest is generated from
+MANIFEST_SOURCES = ["dbt_project.yml", "packages.yml", "models", "macros", "seeds", "snapshots", "tests", "dbt_packages"]
+
+# Fingerprint of the project files the manifest on disk was generated from
+MANIFEST_FINGERPRINT_FILE = "manifest.fingerprint"
+
+
+@functools.cache
+def load_manifest() -> dict[str, Any]:
+    """
+    Parsed manifest of the dbt project, read once per process.
+
+    The manifest is only regenerated (``dbt parse``) when it is missing or
+    was generated from other project files than the current ones, so
+    reloading the code location reuses the one on disk.
+
+    Returns:
+        Contents of target/manifest.json
+    """
+    manifest_path = Path(dbt_project.manifest_path)
+    fingerprint_path = manifest_path.with_name(MANIFEST_FINGERPRINT_FILE)
+    fingerprint = _project_fingerprint()
+    stored = fingerprint_path.read_text() if fingerprint_path.exists() else None
+    if not manifest_path.exists() or stored != fingerprint:
+        try:
+            dbt_project.preparer.prepare(dbt_project)
+            fingerprint_path.write_text(fingerprint)
+        except Exception as exc:
+            if not manifest_path.exists():
+                raise
+            get_dagster_logger().warning(f"dbt parse failed, using the existing manifest: {exc}")
+    return json.loads(manifest_path.read_bytes())
+
+
+def _project_fingerprint() -> str:
+    """
+    Hash of the paths and contents of the project files the manifest depends on.
+
+    Contents rather than modification times: a checkout or a copy into an
+    image gives every file a new mtime, and an old manifest could look newer
+    than the models it was generated from.
+    """
+    digest = hashlib.sha256()
+    for name in MANIFEST_SOURCES:
+        path = DBT_PROJECT_DIR / name
+        files = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for file in files:
+            if file.is_file():
+                digest.update(os.fsencode(file.relative_to(DBT_PROJECT_DIR)))
+                digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+class QuantfootDbtTranslator(DagsterDbtTranslator):
+    """Maps the raw dbt sources to the dlt assets loading them.
+
+    ``source('raw', 'raw_fixtures')`` is the ``dlt_api_football_raw_fixtures``
+    asset, so the dbt models depend on the dlt loads in the asset graph and a
+    load can be materialized together with only its downstream models.
+    """
+
+    def get_asset_key(self, dbt_resource_props: Mapping[str, Any]) -> AssetKey:
+        if dbt_resource_props["resource_type"] == "source" and dbt_resource_props["source_name"] == "raw":
+            return AssetKey(f"dlt_{SOURCE_NAME}_{dbt_resource_props['name']}")
+        return super().get_asset_key(dbt_resource_props)
+
+
+class DbtBuildConfig(Config):
+    """Run configuration for the dbt build."""
+
+    # Rebuild incremental marts from scratch instead of merging changed rows
+    full_refresh: bool = False
+    # Only build what is downstream of raw tables loaded since the last
+    # successful build, or of models whose code changed
+    only_changed: bool = True
+    # Build every mart into a shadow schema, validate it and swap it with the
+    # live marts (see quantfoot.publish), instead of updating the live marts in place
+    blue_green: bool = BLUE_GREEN
+
+
 @dbt_assets(
-    manifest=DBT_PROJECT_DIR / "target" / "manifest.json",
+    manifest=load_manifest(),
     project=dbt_project,
+    dagster_dbt_translator=QuantfootDbtTranslator(),
 )
-def quantfoot_dbt_assets(context: AssetExecutionContext, dbt: DbtCliResource):
+def quantfoot_dbt_assets(context: AssetExecutionContext, dbt: DbtCliResource, config: DbtBuildConfig):
     """
     dbt models for transforming raw data from API Football into staging views.
     
@@ -28,10 +130,91 @@ def quantfoot_dbt_assets(context: AssetExecutionContext, dbt: DbtCliResource):
     - stg_venues: Venue/stadium details
     - stg_leagues: League and season information
     
-    And marts tables:
+    And incremental marts tables (merged on their primary key, only rows of
+    the loads completed since the last build are touched):
     - fixtures: Final fixtures table
     - players: Final players table
     - teams: Final teams table
+    - documents: JSON team pages, player and fixture cards read by the APIs
+    
+    Only the models and tests downstream of the raw tables that received rows
+    since the last successful build (``source:raw.<table>+``), or of models
+    whose code changed (``state:modified+`` against that build's manifest),
+    are built: a fixtures load does not rebuild the players and teams marts.
+    The first build, runs selecting a subset of the models and runs with
+    `only_changed: false` build everything selected.
+    
+    Set `full_refresh: true` in the run config to rebuild the marts from scratch.
+
+    With `blue_green: true` (DBT_BLUE_GREEN), the live marts are not touched
+    during the build: every mart is built into the ``marts_shadow`` schema,
+    validated with the ``validate_constraints`` macro and swapped in with
+    one schema rename transaction, the replaced marts being kept as
+    ``marts_previous`` for a rollback. The models are reported as
+    materialized once the swap has committed. Runs selecting a subset of the
+    models update the live marts in place.
+
+    The fixtures mart is partitioned by season. After a full build, the
+    seasons that closed (see ``quantfoot.seasons``) are frozen: their
+    partitions are no longer loaded nor merged.
+
+    Every model gets its compile/execute times from run_results.json in an
+    observation, and the slowest models are reported in the run logs.
     """
-    # Build all models (staging + marts) in the correct order
-    yield from dbt.cli(["build", "--select", "staging.*+ marts.*"], context=context).stream()
+    args = ["build", "--select", "staging.*+ marts.*"]
+    if config.full_refresh:
+        args.append("--full-refresh")
+
+    manifest = load_manifest()
+    state = DbtState(DBT_STATE_DIR)
+    new_load_ids, loads = completed_loads(state.loads())
+    changes = raw_changes(raw_tables(manifest), new_load_ids)
+    context.log.info(changes_report(changes))
+
+    is_subset = context.selected_asset_keys != context.assets_def.keys
+    if config.only_changed and not config.full_refresh and not is_subset and state.exists:
+        select = " ".join([*(f"source:raw.{table}+" for table in sorted(changes)), "state:modified+"])
+        selected = selected_nodes(dbt, manifest, select, state)
+        if not selected:
+            context.log.info("Nothing changed since the last dbt build, skipping it")
+            return
+        context.log.info(f"Building {len(selected)} dbt nodes selected by '{select}'")
+        args = ["build", "--select", select, "--state", os.fspath(state.path), "--defer"]
+        # Dagster adds its own --select of every model, so what is not
+        # selected is excluded
+        unselected = unselected_node_names(manifest, selected)
+        if unselected:
+            args += ["--exclude", *unselected]
+
+    # A subset of the marts cannot replace the live schema
+    blue_green = config.blue_green and not is_subset
+    if blue_green:
+        # The shadow schema starts empty, so every mart is built in full
+        reset_shadow_schema()
+        args = ["build", "--select", "staging.*+ marts.*", "--vars", json.dumps({"marts_schema": SHADOW_SCHEMA})]
+        context.log.info(f"Building every mart into {SHADOW_SCHEMA} (blue/green)")
+
+    # Build the selected models (staging + marts) in the correct order
+    invocation = dbt.cli(args, context=context)
+    events = instrument_dbt_run(context, invocation)
+    if not blue_green:
+        yield from events
+    else:
+        # The live marts only change when the shadow schema is swapped in:
+        # nothing is materialized before, nor at all when validation fails
+        events = list(events)
+        validate_args = json.dumps({"schema_name": SHADOW_SCHEMA, "fail_on_error": True})
+        dbt.cli(["run-operation", "validate_constraints", "--args", validate_args], manifest=manifest).wait()
+        publish_shadow_schema()
+        context.log.info(f"Published {SHADOW_SCHEMA} as the live marts")
+        yield from events
+
+    if not is_subset:
+        # The state keeps the manifest of the live schemas: the build's own
+        # manifest points the marts to the shadow schema in blue/green builds
+        state.save(Path(dbt_project.manifest_path).parent if blue_green else Path(invocation.target_path), loads)
+
+        # The marts now hold the last fixtures of the seasons that closed
+        frozen = freeze_closed_seasons()
+        if frozen:
+            context.log.info(f"Froze the closed seasons {', '.join(map(str, frozen))}")
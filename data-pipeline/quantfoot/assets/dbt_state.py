@@ -0,0 +1,195 @@
+"""
+State of the last successful dbt build, and the raw rows loaded since.
+
+The dbt asset only builds what changed since its last successful build:
+- models and tests downstream of the raw tables that received rows since
+  then (from a dlt load or the live poller): ``source:raw.<table>+``
+- models whose code changed, compared with that build's manifest: ``state:modified+``
+
+New rows are those of the loads completed since the last build
+(``raw._dlt_loads``, see ``quantfoot.loads``).
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import psycopg2.errors
+from dagster_dbt import DbtCliResource
+from psycopg2 import sql
+
+from ..loads import completed_loads as completed_raw_loads
+from ..postgres import connect
+
+# Files kept from the last successful build
+MANIFEST_FILE = "manifest.json"
+LOADS_FILE = "raw_loads.json"
+
+# dbt nodes a build runs (sources, exposures, ... are not built)
+BUILT_RESOURCE_TYPES = {"model", "test", "seed", "snapshot"}
+
+
+class DbtState:
+    """Artifacts of the last successful dbt build, kept in ``path``.
+
+    - manifest.json: the build's manifest, passed with ``--state`` to select
+      modified models and to ``--defer`` unselected refs
+    - raw_loads.json: the loads built (see ``completed_loads``)
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @property
+    def exists(self) -> bool:
+        return (self.path / MANIFEST_FILE).exists() and (self.path / LOADS_FILE).exists()
+
+    def loads(self) -> dict[str, Any]:
+        """Loads built by the last successful build (see ``completed_loads``)."""
+        if not self.exists:
+            return {}
+        return json.loads((self.path / LOADS_FILE).read_text())
+
+    def save(self, target_path: Path, loads: dict[str, Any]) -> None:
+        """
+        Keep the manifest and loads of a successful build.
+
+        Files are replaced atomically, so a crash never leaves a manifest
+        next to the loads of another build.
+
+        Args:
+            target_path: dbt target directory of the build
+            loads: Loads completed when the build started (see ``completed_loads``)
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=self.path) as staging:
+            shutil.copy(target_path / MANIFEST_FILE, Path(staging) / MANIFEST_FILE)
+            (Path(staging) / LOADS_FILE).write_text(json.dumps(loads, indent=2, sort_keys=True))
+            os.replace(Path(staging) / MANIFEST_FILE, self.path / MANIFEST_FILE)
+            os.replace(Path(staging) / LOADS_FILE, self.path / LOADS_FILE)
+
+
+def raw_tables(manifest: dict[str, Any]) -> dict[str, tuple[str, str]]:
+    """
+    Tables of the "raw" dbt source.
+
+    Args:
+        manifest: Parsed dbt manifest
+
+    Returns:
+        (schema, table) of each source table, by source table name
+    """
+    return {
+        source["name"]: (source["schema"], source.get("identifier") or source["name"])
+        for source in manifest["sources"].values()
+        if source["source_name"] == "raw"
+    }
+
+
+def completed_loads(since: dict[str, Any]) -> tuple[list[str], dict[str, Any]]:
+    """
+    Loads completed (``raw._dlt_loads``) since the last build (see ``quantfoot.loads``).
+
+    Args:
+        since: State of the last build (see ``DbtState.loads``), empty
+            when every load is new
+
+    Returns:
+        Ids of the new loads, and the state to save once they are built
+    """
+    connection = connect("quantfoot-dbt")
+    try:
+        with connection.cursor() as cursor:
+            new, state = completed_raw_loads(cursor, since)
+        connection.rollback()
+    finally:
+        connection.close()
+    return new, state
+
+
+def raw_changes(tables: dict[str, tuple[str, str]], load_ids: list[str]) -> dict[str, dict[str, int]]:
+    """
+    Rows of the given loads in each raw table.
+
+    Args:
+        tables: (schema, table) by source table name (see ``raw_tables``)
+        load_ids: New loads (see ``completed_loads``)
+
+    Returns:
+        Rows per new load id, by source table name, for the tables that changed
+    """
+    changes: dict[str, dict[str, int]] = {}
+    if not load_ids:
+        return changes
+    connection = connect("quantfoot-dbt")
+    try:
+        with connection.cursor() as cursor:
+            for name, (schema, table) in tables.items():
+                try:
+                    cursor.execute(
+                        sql.SQL(
+                            "select _dlt_load_id, count(*) from {} where _dlt_load_id = any(%s) group by 1 order by 1"
+                        ).format(sql.Identifier(schema, table)),
+                        (load_ids,),
+                    )
+                except psycopg2.errors.UndefinedTable:
+                    # Not loaded yet
+                    connection.rollback()
+                    continue
+                rows = dict(cursor.fetchall())
+                if rows:
+                    changes[name] = rows
+    finally:
+        connection.close()
+    return changes
+
+
+def selected_nodes(dbt: DbtCliResource, manifest: dict[str, Any], select: str, state: DbtState) -> set[str]:
+    """
+    Resolve a dbt selection against the project and the saved state.
+
+    Args:
+        dbt: dbt CLI resource
+        manifest: Parsed dbt manifest
+        select: dbt selection (may use ``state:`` methods)
+        state: State of the last successful build
+
+    Returns:
+        unique_ids of the models, tests, seeds and snapshots selected
+    """
+    invocation = dbt.cli(
+        ["ls", "--select", select, "--state", os.fspath(state.path), "--output", "json", "--output-keys", "unique_id"],
+        manifest=manifest,
+    )
+    selected = set()
+    for event in invocation.stream_raw_events():
+        if event.raw_event["info"]["name"] != "PrintEvent":
+            continue
+        unique_id = json.loads(event.raw_event["info"]["msg"])["unique_id"]
+        if unique_id.split(".")[0] in BUILT_RESOURCE_TYPES:
+            selected.add(unique_id)
+    return selected
+
+
+def unselected_node_names(manifest: dict[str, Any], selected: set[str]) -> list[str]:
+    """Names of the built nodes of the project that are not in ``selected``."""
+    return sorted(
+        node["name"]
+        for unique_id, node in manifest["nodes"].items()
+        if node["resource_type"] in BUILT_RESOURCE_TYPES and unique_id not in selected
+    )
+
+
+def changes_report(changes: dict[str, dict[str, int]]) -> str:
+    """Plain text summary of the rows loaded per raw table and load id."""
+    if not changes:
+        return "No raw rows loaded since the last dbt build"
+    lines = ["Raw rows loaded since the last dbt build:"]
+    for table, loads in sorted(changes.items()):
+        lines.append(
+            f"  {table:<24} {sum(loads.values()):>7} rows in {len(loads)} loads"
+            f" ({min(loads)} .. {max(loads)})"
+        )
+    return "\n".join(lines)
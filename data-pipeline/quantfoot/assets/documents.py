@@ -0,0 +1,61 @@
+"""
+Dagster asset of the static export of the read-model documents (see ``quantfoot.documents``).
+"""
+from dagster import AssetExecutionContext, AssetKey, AssetSpec, Config, MaterializeResult, multi_asset
+from dagster_dbt import get_asset_key_for_model
+
+from ..documents import EXPORT_DIR, export_documents
+from .dbt import quantfoot_dbt_assets
+
+DOCUMENTS_EXPORT_KEY = AssetKey(["documents", "static_export"])
+
+
+class DocumentsExportConfig(Config):
+    """Run configuration of the documents export."""
+
+    # Write every document again instead of the ones generated since the last
+    # export, and remove every file without a document
+    full: bool = False
+
+
+@multi_asset(
+    specs=[
+        AssetSpec(
+            key=DOCUMENTS_EXPORT_KEY,
+            deps=[get_asset_key_for_model([quantfoot_dbt_assets], "documents")],
+            description="Team pages, player and fixture cards as pre-compressed JSON files",
+            kinds={"json", "postgres"},
+            # Nothing is exported without DOCUMENTS_EXPORT_DIR
+            skippable=True,
+        ),
+    ],
+    name="documents_export",
+    group_name="documents",
+)
+def documents_export_assets(context: AssetExecutionContext, config: DocumentsExportConfig):
+    """
+    Write the documents of ``marts.documents`` changed since the last export
+    to DOCUMENTS_EXPORT_DIR as ``<doc_type>/<doc_key>.json.gz``, and remove
+    the files of the documents deleted since then.
+
+    Set `full: true` in the run config to write every document again (and
+    remove every file without a document).
+    """
+    if not EXPORT_DIR:
+        context.log.info("DOCUMENTS_EXPORT_DIR is not set, the documents are not exported")
+        return
+
+    export = export_documents(EXPORT_DIR, full=config.full)
+    context.log.info(
+        f"Exported {export.documents} documents ({export.bytes_written} bytes) to {EXPORT_DIR}, "
+        f"removed {export.removed}"
+    )
+    yield MaterializeResult(
+        asset_key=DOCUMENTS_EXPORT_KEY,
+        metadata={
+            "documents": export.documents,
+            "bytes_written": export.bytes_written,
+            "removed": export.removed,
+            "directory": EXPORT_DIR,
+        },
+    )
@@ -1,52 +1,329 @@
 """
 Dagster assets using dlt for loading raw data from API Football.
+
+The source is split in four assets:
+- api_football_reference: countries, leagues and league seasons (not partitioned)
+- api_football_teams: team info, seasons, venues and squads, one partition per team
+- api_football_fixtures: fixtures, one partition per team and season
+- api_football_fixture_details: events, lineups and statistics of the stored
+  fixtures, one partition per team and season
+
+In league crawl mode (LEAGUE_IDS), "team" partitions are competitions: a
+partition loads the fixtures of a whole competition in one call, and the
+teams found in it (see ``api_football_source``).
+
+Fixtures are written to the season's partition of ``raw_fixtures`` and
+partitions of frozen seasons are skipped (see ``quantfoot.seasons``).
+
+Every partition runs its own dlt pipeline (own state and staging schema), so
+partitions load concurrently, up to the limit of the "api_football" pool.
+
+API request timings, items per resource and dlt stage durations are added to
+the materializations' metadata (see ``quantfoot.instrumentation``).
+
+The asset specs are built from resource names only: the dlt sources, API
+clients and pipelines (with their credentials) are created when an asset runs,
+not when the code location is loaded.
 """
 import os
+from typing import Iterator, Optional
 import dlt
-from dagster import AssetExecutionContext
-from dagster_embedded_elt.dlt import DagsterDltResource, dlt_assets
+from dagster import AssetExecutionContext, AssetKey, AssetSpec, BackfillPolicy, multi_asset
+from dagster_embedded_elt.dlt import DagsterDltResource, DagsterDltTranslator
+from dlt.extract.source import DltSource
 
+from .. import destination
+from ..instrumentation import instrument_dlt_run
+from ..seasons import ensure_raw_fixtures_partition, frozen_seasons
 from ..sources import api_football_source
+from ..sources.api_football.metrics import RequestMetrics
+from .partitions import SCOPE, SEASONS, TEAM_IDS, partition_scope, team_partitions, team_season_partitions
+
+# Name of the dlt source, part of the asset keys
+SOURCE_NAME = "api_football"
+
+# Concurrency pool shared by all API Football loads (limit set in dagster.yaml)
+API_FOOTBALL_POOL = "api_football"
 
+REFERENCE_RESOURCES = ["raw_countries", "raw_leagues", "raw_league_seasons"]
+TEAM_RESOURCES = ["raw_team_info", "raw_team_seasons", "raw_venues", "raw_players"]
+FIXTURE_RESOURCES = ["raw_fixtures"]
+FIXTURE_DETAIL_RESOURCES = [
+    "raw_fixture_events",
+    "raw_fixture_lineups",
+    "raw_fixture_statistics",
+    "raw_fixture_players",
+]
 
-@dlt_assets(
-    dlt_source=api_football_source(
+# "csv" bulk loads the normalized files with COPY ... FROM STDIN,
+# "insert_values" sends them as multi-row INSERT statements (dlt's default).
+# Batch size and file rotation are dlt settings: DATA_WRITER__BUFFER_MAX_ITEMS,
+# DATA_WRITER__FILE_MAX_ITEMS / DATA_WRITER__FILE_MAX_BYTES.
+LOADER_FILE_FORMAT = os.getenv("DLT_LOADER_FILE_FORMAT", "csv")
+
+
+def _source(
+    team_ids: list[int],
+    season: int,
+    resources: list[str],
+    metrics: Optional[RequestMetrics] = None,
+    league_ids: Optional[list[int]] = None,
+    table_names: Optional[dict[str, str]] = None,
+) -> DltSource:
+    """API Football source restricted to ``resources``, loading into ``table_names`` (by resource) if given."""
+    source = api_football_source(
         api_key=os.getenv("API_FOOTBALL_KEY", "6f3db45add8cadeeca80b5641e4c5ee8"),
         api_host=os.getenv("API_FOOTBALL_HOST", "v3.football.api-sports.io"),
-        season=int(os.getenv("SEASON", "2025")),
-        team_ids=[int(x) for x in os.getenv("TEAM_IDS", "2184,6654").split(",")],
-    ),
-    dlt_pipeline=dlt.pipeline(
-        pipeline_name="api_football_raw",
+        base_url=os.getenv("API_FOOTBALL_BASE_URL"),
+        season=season,
+        team_ids=team_ids,
+        league_ids=league_ids,
+        max_workers=int(os.getenv("API_FOOTBALL_MAX_WORKERS", "4")),
+        requests_per_minute=int(os.getenv("API_FOOTBALL_REQUESTS_PER_MINUTE", "10")),
+        cache_dir=os.getenv("API_FOOTBALL_CACHE_DIR"),
+        offline=os.getenv("API_FOOTBALL_OFFLINE", "false").lower() == "true",
+        fixtures_backfill=os.getenv("FIXTURES_BACKFILL", "false").lower() == "true",
+        skip_unchanged=os.getenv("SKIP_UNCHANGED_ROWS", "true").lower() == "true",
+        metrics=metrics,
+    )
+    source = source.with_resources(*resources)
+    for resource, table_name in (table_names or {}).items():
+        source.resources[resource].apply_hints(table_name=table_name)
+    return source
+
+
+def _pipeline(pipeline_name: str, partition: str | None = None) -> dlt.Pipeline:
+    """
+    dlt pipeline loading into the "raw" dataset.
+
+    Partitioned pipelines merge through their own staging schema
+    (e.g. raw_staging_team_2184), so concurrent loads do not overwrite each
+    other's staging tables, and their merges into the same table run one at
+    a time (see ``quantfoot.destination``).
+    """
+    destination_options = {}
+    if partition is not None:
+        destination_options["staging_dataset_name_layout"] = f"%s_staging_{partition}"
+
+    return dlt.pipeline(
+        pipeline_name=pipeline_name,
         dataset_name="raw",
-        destination=dlt.destinations.postgres(
+        destination=destination.postgres(
             credentials={
                 "database": os.getenv("POSTGRES_DB", "football_data"),
                 "username": os.getenv("POSTGRES_USER", "dagster"),
                 "password": os.getenv("POSTGRES_PASSWORD", "dagster_password"),
                 "host": os.getenv("POSTGRES_HOST", "postgres"),
                 "port": int(os.getenv("POSTGRES_PORT", "5432")),
-            }
+            },
+            **destination_options,
         ),
         progress="log"
-    ),
-    name="api_football_raw",
-    group_name="api_football"
+    )
+
+
+def _scope_name(scope_id: str) -> str:
+    """Pipeline name part of a team-scoped partition: the team id, or "league_<id>"."""
+    return scope_id if SCOPE == "team" else f"{SCOPE}_{scope_id}"
+
+
+def _asset_specs(
+    resources: list[str],
+    upstream: Optional[list[str]] = None,
+    skippable: bool = False,
+) -> list[AssetSpec]:
+    """
+    Specs of the assets loaded by ``resources``.
+
+    Keys and deps follow dagster-dlt's default translator
+    (dlt_<source>_<resource>, depending on <source>_<resource>), which names
+    the materializations at run time.
+
+    Args:
+        resources: dlt resource names
+        upstream: Resources whose loaded tables ``resources`` read, instead of
+            the source's own <source>_<resource> deps
+        skippable: A run may load nothing (partitions of frozen seasons)
+    """
+    upstream_keys = [AssetKey(f"dlt_{SOURCE_NAME}_{name}") for name in upstream or []]
+    return [
+        AssetSpec(
+            key=AssetKey(f"dlt_{SOURCE_NAME}_{resource}"),
+            deps=upstream_keys or [AssetKey(f"{SOURCE_NAME}_{resource}")],
+            kinds={"dlt", "postgres"},
+            skippable=skippable,
+        )
+        for resource in resources
+    ]
+
+
+def _run(
+    context: AssetExecutionContext,
+    dlt_pipeline_resource: DagsterDltResource,
+    team_ids: list[int],
+    season: int,
+    resources: list[str],
+    pipeline: dlt.Pipeline,
+    league_ids: Optional[list[int]] = None,
+    table_names: Optional[dict[str, str]] = None,
+) -> Iterator:
+    """Run a fresh source into ``pipeline`` and yield its instrumented materializations."""
+    metrics = RequestMetrics()
+    source = _source(team_ids, season, resources, metrics, league_ids, table_names)
+    results = dlt_pipeline_resource.run(
+        context=context,
+        dlt_source=source,
+        dlt_pipeline=pipeline,
+        dagster_dlt_translator=DagsterDltTranslator(),
+        loader_file_format=LOADER_FILE_FORMAT,
+    )
+    yield from instrument_dlt_run(context, results, pipeline, metrics)
+
+
+@multi_asset(
+    specs=_asset_specs(REFERENCE_RESOURCES),
+    name="api_football_reference",
+    group_name="api_football",
+    can_subset=True,
+    pool=API_FOOTBALL_POOL,
 )
-def api_football_raw_assets(context: AssetExecutionContext, dlt_pipeline_resource: DagsterDltResource):  # type: ignore
+def api_football_reference_assets(context: AssetExecutionContext, dlt_pipeline_resource: DagsterDltResource):  # type: ignore
     """
-    Load raw data from API Football into PostgreSQL as JSON.
-    
+    Load API Football reference data into PostgreSQL as JSON.
+
     This asset loads:
     - raw_countries: All countries
-    - raw_leagues: All leagues and seasons
-    - raw_team_info: Servette FC and Étoile Carouge information
-    - raw_team_seasons: Teams seasons
-    - raw_venues: Teams venues
-    - raw_fixtures: All teams fixtures for 2025
-    - raw_players: Teams squads
-    
-    All data is stored as JSONB for flexibility and future transformation with dbt.
+    - raw_leagues: All leagues (one row per league)
+    - raw_league_seasons: Seasons of every league (dates, current flag, coverage)
     """
-    yield from dlt_pipeline_resource.run(context=context)  # type: ignore
+    yield from _run(
+        context,
+        dlt_pipeline_resource,
+        TEAM_IDS,
+        max(SEASONS),
+        REFERENCE_RESOURCES,
+        _pipeline("api_football_reference"),
+    )
 
+
+@multi_asset(
+    specs=_asset_specs(TEAM_RESOURCES),
+    name="api_football_teams",
+    group_name="api_football",
+    can_subset=True,
+    partitions_def=team_partitions,
+    backfill_policy=BackfillPolicy.multi_run(),
+    pool=API_FOOTBALL_POOL,
+)
+def api_football_team_assets(context: AssetExecutionContext, dlt_pipeline_resource: DagsterDltResource):  # type: ignore
+    """
+    Load the data of one team (partition) into PostgreSQL as JSON.
+
+    This asset loads:
+    - raw_team_info: Team information
+    - raw_team_seasons: Team seasons
+    - raw_venues: Team venue
+    - raw_players: Team squad
+
+    Rows are merged per team, so loading a team leaves the other teams untouched.
+    In league crawl mode, the partition is a competition and loads every team
+    playing it in the latest season.
+    """
+    team_ids, league_ids = partition_scope(context.partition_key)
+    name = _scope_name(context.partition_key)
+
+    yield from _run(
+        context,
+        dlt_pipeline_resource,
+        team_ids,
+        max(SEASONS),
+        TEAM_RESOURCES,
+        _pipeline(f"api_football_team_{name}", partition=f"team_{name}"),
+        league_ids,
+    )
+
+
+@multi_asset(
+    specs=_asset_specs(FIXTURE_RESOURCES, skippable=True),
+    name="api_football_fixtures",
+    group_name="api_football",
+    can_subset=True,
+    partitions_def=team_season_partitions,
+    backfill_policy=BackfillPolicy.multi_run(),
+    pool=API_FOOTBALL_POOL,
+)
+def api_football_fixtures_assets(context: AssetExecutionContext, dlt_pipeline_resource: DagsterDltResource):  # type: ignore
+    """
+    Load the fixtures of one team and season (partition) into PostgreSQL as JSON.
+
+    This asset loads:
+    - raw_fixtures: Team fixtures (full season on first load or FIXTURES_BACKFILL=true, then only open/recent fixtures)
+
+    The incremental state (open fixtures, loaded seasons) is kept by the
+    partition's own pipeline. In league crawl mode, the partition is a
+    competition, loaded with one ``fixtures?league=&season=`` call.
+
+    Fixtures are merged into the season's partition of ``raw_fixtures``
+    (e.g. ``raw_fixtures_2025``) only. Frozen seasons are not loaded.
+    """
+    keys = context.partition_key.keys_by_dimension  # type: ignore[attr-defined]
+    team_ids, league_ids = partition_scope(keys[SCOPE])
+    name, season = _scope_name(keys[SCOPE]), int(keys["season"])
+    if season in frozen_seasons():
+        context.log.info(f"Season {season} is frozen, its fixtures are not loaded again")
+        return
+
+    yield from _run(
+        context,
+        dlt_pipeline_resource,
+        team_ids,
+        season,
+        FIXTURE_RESOURCES,
+        _pipeline(f"api_football_fixtures_{name}_{season}", partition=f"fixtures_{name}_{season}"),
+        league_ids,
+        table_names={"raw_fixtures": ensure_raw_fixtures_partition(season)},
+    )
+
+
+@multi_asset(
+    specs=_asset_specs(FIXTURE_DETAIL_RESOURCES, upstream=FIXTURE_RESOURCES, skippable=True),
+    name="api_football_fixture_details",
+    group_name="api_football",
+    can_subset=True,
+    partitions_def=team_season_partitions,
+    backfill_policy=BackfillPolicy.multi_run(),
+    pool=API_FOOTBALL_POOL,
+)
+def api_football_fixture_details_assets(context: AssetExecutionContext, dlt_pipeline_resource: DagsterDltResource):  # type: ignore
+    """
+    Load the details of the stored fixtures of one team and season (partition) into PostgreSQL as JSON.
+
+    This asset loads:
+    - raw_fixture_events: Events of each fixture
+    - raw_fixture_lineups: Lineups of each fixture, one row per team
+    - raw_fixture_statistics: Team statistics of each fixture, one row per team
+    - raw_fixture_players: Player statistics of each fixture, one row per player
+
+    Fixture ids are read from raw_fixtures and fetched 20 at a time
+    (``fixtures?ids=``); fixtures whose settled final details are stored are
+    not fetched again, and frozen seasons are not loaded.
+    """
+    keys = context.partition_key.keys_by_dimension  # type: ignore[attr-defined]
+    team_ids, league_ids = partition_scope(keys[SCOPE])
+    name, season = _scope_name(keys[SCOPE]), int(keys["season"])
+    if season in frozen_seasons():
+        context.log.info(f"Season {season} is frozen, its fixture details are not loaded again")
+        return
+
+    yield from _run(
+        context,
+        dlt_pipeline_resource,
+        team_ids,
+        season,
+        FIXTURE_DETAIL_RESOURCES,
+        _pipeline(
+            f"api_football_fixture_details_{name}_{season}",
+            partition=f"fixture_details_{name}_{season}",
+        ),
+        league_ids,
+    )
@@ -0,0 +1,62 @@
+"""
+Partitions of the API Football assets.
+
+Team-scoped data is partitioned by team, fixtures by team and season, so each
+partition is loaded by its own dlt pipeline and can run (and fail, and be
+retried) independently of the others.
+
+In league crawl mode (LEAGUE_IDS set), the same assets are partitioned by
+competition instead ("league" dimension): a partition loads every team of
+its competition.
+"""
+import os
+from dagster import MultiPartitionKey, MultiPartitionsDefinition, StaticPartitionsDefinition
+
+# Teams and seasons covered by the partitions
+TEAM_IDS = [int(x) for x in os.getenv("TEAM_IDS", "2184,6654").split(",")]
+SEASONS = [int(x) for x in os.getenv("SEASONS", os.getenv("SEASON", "2025")).split(",")]
+# Competitions crawled instead of TEAM_IDS (league crawl mode), empty: follow TEAM_IDS
+LEAGUE_IDS = [int(x) for x in os.getenv("LEAGUE_IDS", "").split(",") if x]
+
+# Dimension of the team-scoped partitions: "team", or "league" in league crawl mode
+SCOPE = "league" if LEAGUE_IDS else "team"
+
+team_partitions = StaticPartitionsDefinition([str(scope_id) for scope_id in LEAGUE_IDS or TEAM_IDS])
+
+season_partitions = StaticPartitionsDefinition([str(season) for season in SEASONS])
+
+team_season_partitions = MultiPartitionsDefinition(
+    {
+        SCOPE: team_partitions,
+        "season": season_partitions,
+    }
+)
+
+
+def team_season_key(team_id: int, season: int) -> MultiPartitionKey:
+    """
+    Build the partition key of a team's (or, in league crawl mode, a competition's) season.
+
+    Args:
+        team_id: Team ID, or league ID in league crawl mode
+        season: Season year
+
+    Returns:
+        Partition key of team_season_partitions
+    """
+    return MultiPartitionKey({SCOPE: str(team_id), "season": str(season)})
+
+
+def partition_scope(scope_id: str) -> tuple[list[int], list[int] | None]:
+    """
+    Source arguments of a team-scoped partition.
+
+    Args:
+        scope_id: Team ID, or league ID in league crawl mode, of the partition
+
+    Returns:
+        ``team_ids`` and ``league_ids`` of ``api_football_source``
+    """
+    if SCOPE == "league":
+        return [], [int(scope_id)]
+    return [int(scope_id)], None
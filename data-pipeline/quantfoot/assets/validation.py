@@ -0,0 +1,106 @@
+"""
+Dagster asset checks of the single-pass data-quality validation (see ``quantfoot.validation``).
+
+Every validated table gets one multi-asset check: its rules are the checks of
+the table's asset (the dlt asset of a raw table, the dbt asset of a mart) and
+are evaluated by one query. Each result carries the violation count and
+sample rows of its rule.
+"""
+from dataclasses import replace
+
+from dagster import (
+    AssetCheckExecutionContext,
+    AssetCheckResult,
+    AssetCheckSeverity,
+    AssetCheckSpec,
+    AssetChecksDefinition,
+    AssetKey,
+    Config,
+    MetadataValue,
+    multi_asset_check,
+)
+from dagster_dbt import get_asset_key_for_model
+
+from ..postgres import connect
+from ..publish import MARTS_SCHEMA
+from ..validation import NEW_LOADS_ONLY, TableRules, table_rules, validate_table
+from .dbt import quantfoot_dbt_assets
+from .leagues import SOURCE_NAME
+
+
+class ValidationConfig(Config):
+    """Run configuration of the validation checks."""
+
+    # Only validate the rows of the loads completed since the table's last
+    # check (VALIDATION_NEW_LOADS_ONLY)
+    new_loads_only: bool = NEW_LOADS_ONLY
+
+
+def _asset_key(table: TableRules) -> AssetKey:
+    """Asset of a validated table: the dbt model of a mart, the dlt resource of a raw table."""
+    if table.schema == MARTS_SCHEMA:
+        return get_asset_key_for_model([quantfoot_dbt_assets], table.table)
+    return AssetKey(f"dlt_{SOURCE_NAME}_{table.table}")
+
+
+def _validation_checks(table: TableRules) -> AssetChecksDefinition:
+    """Checks of every rule of ``table``, evaluated in one scan."""
+    asset_key = _asset_key(table)
+
+    @multi_asset_check(
+        specs=[AssetCheckSpec(rule.name, asset=asset_key, description=rule.description) for rule in table.rules],
+        name=f"validate_{table.schema}_{table.table}",
+        can_subset=True,
+    )
+    def _checks(context: AssetCheckExecutionContext, config: ValidationConfig):
+        # Only the selected rules are compiled into the scan
+        selected = {key.name for key in context.selected_asset_check_keys}
+        rules = replace(table, rules=tuple(rule for rule in table.rules if rule.name in selected))
+        connection = connect("quantfoot-validation")
+        try:
+            # The loads validated are only recorded when every rule saw them
+            validation = validate_table(
+                connection,
+                rules,
+                new_loads_only=config.new_loads_only,
+                record_loads=len(rules.rules) == len(table.rules),
+            )
+        finally:
+            connection.close()
+
+        if validation is None:
+            for rule in rules.rules:
+                yield AssetCheckResult(
+                    asset_key=asset_key,
+                    check_name=rule.name,
+                    passed=False,
+                    description=f"{table.name} does not exist",
+                )
+            return
+
+        scope = f"{len(validation.load_ids)} new loads" if validation.new_loads_only else "all rows"
+        failed = [result.rule.name for result in validation.results if not result.passed]
+        context.log.info(
+            f"Validated {validation.rows} rows of {table.name} ({scope}) against {len(rules.rules)} rules "
+            f"in {validation.seconds:.3f}s" + (f", failed: {', '.join(failed)}" if failed else "")
+        )
+        for result in validation.results:
+            yield AssetCheckResult(
+                asset_key=asset_key,
+                check_name=result.rule.name,
+                passed=result.passed,
+                severity=AssetCheckSeverity.ERROR,
+                metadata={
+                    "violations": result.violations,
+                    "rows_validated": validation.rows,
+                    "new_loads_only": validation.new_loads_only,
+                    "load_ids": MetadataValue.json(validation.load_ids),
+                    "samples": MetadataValue.json(result.samples),
+                    "scan_s": round(validation.seconds, 3),
+                },
+            )
+
+    return _checks
+
+
+validation_checks = [_validation_checks(table) for table in table_rules()]
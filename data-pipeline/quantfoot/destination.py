@@ -0,0 +1,55 @@
+"""
+dlt Postgres destination serialising the merges into each table.
+
+dlt's delete-insert merge deletes the destination rows found in the staging
+table, then inserts the staging rows, in one transaction. Two loads merging
+the same rows concurrently (e.g. a fixture played by two teams whose
+team/season partitions run at the same time) both delete nothing and both
+insert the row: the fixture is stored twice. The merges of this destination
+take a transaction-level advisory lock on their destination table (or
+season partition, e.g. ``raw.raw_fixtures_2025``) first, so the second merge
+waits for the first one to commit and then deletes the rows it inserted.
+
+Only the merge transactions are serialised: extraction, normalization and
+the copies into each pipeline's own staging schema still run concurrently.
+"""
+from typing import Any, List, Sequence, Type
+
+import dlt
+from dlt.common.destination.client import FollowupJobRequest
+from dlt.common.destination.typing import PreparedTableSchema
+from dlt.destinations.impl.postgres.postgres import PostgresClient
+from dlt.destinations.sql_client import SqlClientBase
+from dlt.destinations.sql_jobs import SqlMergeFollowupJob
+
+
+class SerializedMergeJob(SqlMergeFollowupJob):
+    """Merge locking its destination table for the rest of the merge transaction."""
+
+    @classmethod
+    def _gen_table_setup_clauses(
+        cls, table_chain: Sequence[PreparedTableSchema], sql_client: SqlClientBase[Any]
+    ) -> List[str]:
+        # Same key as the other locks of the raw tables (see quantfoot.seasons)
+        table = f"{sql_client.dataset_name}.{table_chain[0]['name']}"
+        return [f"select pg_advisory_xact_lock(hashtext('{table}'));"]
+
+
+class SerializedMergePostgresClient(PostgresClient):
+    """Postgres job client running its merges with ``SerializedMergeJob``."""
+
+    def _create_merge_followup_jobs(self, table_chain: Sequence[PreparedTableSchema]) -> List[FollowupJobRequest]:
+        return [SerializedMergeJob.from_table_chain(table_chain, self.sql_client)]
+
+
+class postgres(dlt.destinations.postgres):
+    """The dlt Postgres destination, with serialised merges."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        # Keep the name (configuration sections, pipeline state) of the built-in destination
+        kwargs.setdefault("destination_name", "postgres")
+        super().__init__(*args, **kwargs)
+
+    @property
+    def client_class(self) -> Type[PostgresClient]:
+        return SerializedMergePostgresClient
@@ -0,0 +1,187 @@
+"""
+Static export of the read-model documents (``marts.documents``).
+
+The ``documents`` mart holds one JSON document per team page, player card
+and fixture card, shaped like the API responses. They can also be served as
+static files, pre-compressed so the web server sends them as is (e.g. nginx
+``gzip_static``):
+
+    <DOCUMENTS_EXPORT_DIR>/<doc_type>/<doc_key>.json.gz
+
+Only the documents whose content changed since the last export
+(``generated_at``, kept in ``.generated_at`` in the directory) are written.
+Files are replaced atomically, so a reader never gets a partial document.
+The files of the documents deleted since then (entities deleted from their
+mart, recorded in ``marts.documents_deleted``) are removed; a full export
+removes every file that has no document.
+
+Usage:
+    python -m quantfoot.documents export
+    python -m quantfoot.documents export --directory /srv/documents --full
+"""
+import argparse
+import gzip
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from psycopg2 import sql
+
+from .postgres import connect
+from .publish import MARTS_SCHEMA
+
+DOCUMENTS_TABLE = "documents"
+
+# Documents deleted from DOCUMENTS_TABLE (dbt_project/macros/deleted_documents.sql)
+DELETED_DOCUMENTS_TABLE = "documents_deleted"
+
+# Directory of the static files, no export when unset
+EXPORT_DIR = os.getenv("DOCUMENTS_EXPORT_DIR") or None
+
+# generated_at of the newest document exported so far
+WATERMARK_FILE = ".generated_at"
+
+# Rows fetched from the server per round trip
+FETCH_SIZE = 2000
+
+
+@dataclass
+class DocumentsExport:
+    """Result of an export."""
+
+    documents: int
+    bytes_written: int
+    generated_at: Optional[datetime]
+    removed: int = 0
+
+
+def export_documents(directory: str | os.PathLike, full: bool = False) -> DocumentsExport:
+    """
+    Write the documents generated since the last export as gzipped JSON
+    files, and remove the files of the documents deleted since then.
+
+    Args:
+        directory: Export directory, created if needed
+        full: Write every document again, and remove the files of every
+            document that no longer exists
+
+    Returns:
+        Number of documents and compressed bytes written, newest generated_at
+        (or deleted_at), number of files removed
+    """
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    watermark_path = root / WATERMARK_FILE
+    since = None if full or not watermark_path.exists() else watermark_path.read_text().strip()
+
+    query = sql.SQL("select doc_type, doc_key, doc::text, generated_at from {}.{}").format(
+        sql.Identifier(MARTS_SCHEMA), sql.Identifier(DOCUMENTS_TABLE)
+    )
+    if since:
+        query += sql.SQL(" where generated_at > %s::timestamptz")
+
+    result = DocumentsExport(documents=0, bytes_written=0, generated_at=None)
+    connection = connect("quantfoot-documents-export")
+    try:
+        # Named cursor: rows are streamed instead of loaded at once
+        with connection.cursor(name="documents_export") as cursor:
+            cursor.itersize = FETCH_SIZE
+            cursor.execute(query, (since,) if since else None)
+            directories: set[str] = set()
+            exported: set[Path] = set()
+            for doc_type, doc_key, doc, generated_at in cursor:
+                if doc_type not in directories:
+                    (root / doc_type).mkdir(exist_ok=True)
+                    directories.add(doc_type)
+                path = root / doc_type / f"{doc_key}.json.gz"
+                result.bytes_written += _write(path, doc)
+                result.documents += 1
+                if full:
+                    exported.add(path)
+                if result.generated_at is None or generated_at > result.generated_at:
+                    result.generated_at = generated_at
+        connection.commit()
+
+        if full:
+            # Every document was written: any other file is a deleted document
+            for path in root.glob("*/*.json.gz"):
+                if path not in exported:
+                    path.unlink()
+                    result.removed += 1
+        elif since:
+            with connection.cursor() as cursor:
+                for path, deleted_at in _deleted_since(cursor, root, since):
+                    if path.exists():
+                        path.unlink()
+                        result.removed += 1
+                    if result.generated_at is None or deleted_at > result.generated_at:
+                        result.generated_at = deleted_at
+            connection.commit()
+    finally:
+        connection.close()
+
+    if result.generated_at is not None:
+        watermark_path.write_text(result.generated_at.isoformat())
+    return result
+
+
+def _deleted_since(cursor, root: Path, since: str) -> list[tuple[Path, datetime]]:
+    """Files of the documents deleted after ``since`` (and not generated again), with their deletion time."""
+    cursor.execute("select to_regclass(%s) is not null", (f"{MARTS_SCHEMA}.{DELETED_DOCUMENTS_TABLE}",))
+    if not cursor.fetchone()[0]:
+        # No document deleted yet
+        return []
+    cursor.execute(
+        sql.SQL(
+            """
+            select r.doc_type, r.doc_key, r.deleted_at
+            from {deleted} r
+            where r.deleted_at > %s::timestamptz
+                and not exists (
+                    select 1 from {documents} d where d.doc_type = r.doc_type and d.doc_key = r.doc_key
+                )
+            """
+        ).format(
+            deleted=sql.Identifier(MARTS_SCHEMA, DELETED_DOCUMENTS_TABLE),
+            documents=sql.Identifier(MARTS_SCHEMA, DOCUMENTS_TABLE),
+        ),
+        (since,),
+    )
+    return [(root / doc_type / f"{doc_key}.json.gz", deleted_at) for doc_type, doc_key, deleted_at in cursor]
+
+
+def _write(path: Path, doc: str) -> int:
+    """Compress a document to ``path`` through a temporary file, returning the bytes written."""
+    # mtime=0: the same document always compresses to the same bytes
+    data = gzip.compress(doc.encode(), compresslevel=9, mtime=0)
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+    return len(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser(
+        "export", help="Write the changed documents as .json.gz files, remove the deleted ones"
+    )
+    export.add_argument("--directory", default=EXPORT_DIR, help="Export directory (DOCUMENTS_EXPORT_DIR)")
+    export.add_argument(
+        "--full", action="store_true", help="Write every document again, remove every file without a document"
+    )
+    args = parser.parse_args()
+
+    if not args.directory:
+        parser.error("--directory or DOCUMENTS_EXPORT_DIR is required")
+    result = export_documents(args.directory, full=args.full)
+    print(
+        f"Exported {result.documents} documents ({result.bytes_written} bytes) to {args.directory}, "
+        f"removed {result.removed}"
+    )
+
+
+if __name__ == "__main__":
+    main()
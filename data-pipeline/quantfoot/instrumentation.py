@@ -0,0 +1,363 @@
+"""
+Instrumentation of the dlt and dbt runs.
+
+Timings collected while the assets run are attached to their materializations
+as metadata (to observations of the dbt models, once dbt has exited),
+summarized in a report in the run logs (slowest API endpoints and dbt
+models), and optionally exported as OpenTelemetry spans:
+
+- API: latency, status and bytes of every request (``RequestMetrics``)
+- dlt: items and yield rate of every resource, rows changed or skipped as
+  unchanged, extract/normalize/load durations
+- dbt: compile/execute time and rows affected of every model (run_results.json)
+
+Spans are exported when OTEL_EXPORTER_OTLP_ENDPOINT is set (e.g.
+http://otel-collector:4318) and the "otel" extra is installed.
+"""
+import functools
+import os
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional
+
+import dlt
+from dagster import (
+    AssetExecutionContext,
+    AssetKey,
+    AssetMaterialization,
+    AssetObservation,
+    MaterializeResult,
+    MetadataValue,
+    Output,
+    get_dagster_logger,
+)
+from dagster_dbt import DbtCliInvocation
+
+from .sources.api_football.metrics import RequestMetrics
+
+# Number of endpoints / models listed in the run report
+REPORT_TOP_N = int(os.getenv("INSTRUMENTATION_TOP_N", "5"))
+
+DLT_STAGES = ["extract", "normalize", "load"]
+
+
+def instrument_dlt_run(
+    context: AssetExecutionContext,
+    results: Iterable[Any],
+    dlt_pipeline: dlt.Pipeline,
+    metrics: RequestMetrics,
+) -> Iterator[Any]:
+    """
+    Add the run's API and dlt timings to the results of ``DagsterDltResource.run``.
+
+    Every materialization gets the items, yield rate, changed and skipped rows
+    and API requests of its resource, and the stage durations and slowest endpoints of the whole run.
+    ``rows_loaded`` is replaced by the resource's item count: dlt's normalize
+    counters count values rather than rows with the csv loader file format.
+
+    Args:
+        context: Asset execution context
+        results: Events yielded by ``DagsterDltResource.run``
+        dlt_pipeline: Pipeline running it
+        metrics: Request metrics of the source's client
+
+    Yields:
+        The results, with the instrumentation metadata added
+    """
+    reported = False
+
+    for result in results:
+        # dlt has completed the whole run before the first result is yielded
+        if not reported:
+            stages = dlt_stages(dlt_pipeline)
+            endpoints = metrics.endpoints()
+            resources = metrics.resources()
+            run_metadata: dict[str, Any] = {
+                f"dlt_{stage}_s": MetadataValue.float(round(seconds, 3)) for stage, (_, _, seconds) in stages.items()
+            }
+            run_metadata["slowest_endpoints"] = MetadataValue.md(_endpoints_table(endpoints))
+            context.log.info(dlt_report(dlt_pipeline.pipeline_name, stages, endpoints, resources))
+            export_dlt_spans(dlt_pipeline.pipeline_name, stages, endpoints, resources)
+            reported = True
+
+        resource = _resource_stats(result.asset_key, resources)
+        metadata = dict(run_metadata)
+        if resource:
+            metadata.update(
+                {
+                    "rows_loaded": MetadataValue.int(resource["items"]),
+                    "items": resource["items"],
+                    "items_per_s": resource["items_per_s"],
+                    "rows_changed": MetadataValue.int(resource["rows_changed"]),
+                    "rows_skipped": MetadataValue.int(resource["rows_skipped"]),
+                    "api_requests": resource["requests"],
+                    "api_coalesced_requests": resource["coalesced_requests"],
+                    "api_cache_hits": resource["cache_hits"],
+                }
+            )
+        yield _with_metadata(result, metadata)
+
+
+def instrument_dbt_run(context: AssetExecutionContext, invocation: DbtCliInvocation) -> Iterator[Any]:
+    """
+    Stream a dbt invocation, then add the timings of run_results.json to every model.
+
+    The events are yielded as dbt streams them. run_results.json is only
+    written when dbt exits, so the timings of each model follow as an
+    observation of its asset, after the report and spans of the whole
+    invocation. They are added when dbt fails too, before the error is raised.
+
+    Args:
+        context: Asset execution context
+        invocation: dbt CLI invocation (``dbt.cli(...)``)
+
+    Yields:
+        The invocation's Dagster events, then per-model timing observations
+    """
+    # Asset of every node streamed
+    asset_keys: dict[str, AssetKey] = {}
+    error: Optional[Exception] = None
+    try:
+        for event in invocation.stream():
+            unique_id = (getattr(event, "metadata", None) or {}).get("unique_id")
+            asset_key = _event_asset_key(context, event)
+            if unique_id is not None and asset_key is not None:
+                asset_keys[getattr(unique_id, "text", unique_id)] = asset_key
+            yield event
+    except Exception as exc:
+        error = exc
+
+    try:
+        results = {result["unique_id"]: result for result in invocation.get_artifact("run_results.json")["results"]}
+    except FileNotFoundError:
+        results = {}
+
+    if results:
+        context.log.info(dbt_report(results))
+        export_dbt_spans(results)
+
+    for unique_id, asset_key in asset_keys.items():
+        if unique_id in results:
+            yield AssetObservation(asset_key=asset_key, metadata=dbt_node_metadata(results[unique_id]))
+
+    if error is not None:
+        raise error
+
+
+def dlt_stages(pipeline: dlt.Pipeline) -> dict[str, tuple[datetime, datetime, float]]:
+    """Start, end and duration in seconds of the extract, normalize and load steps of the last run."""
+    trace = pipeline.last_trace
+    if trace is None:
+        return {}
+    return {
+        step.step: (step.started_at, step.finished_at, (step.finished_at - step.started_at).total_seconds())
+        for step in trace.steps
+        if step.step in DLT_STAGES and step.finished_at is not None
+    }
+
+
+def dbt_node_metadata(result: dict[str, Any]) -> dict[str, Any]:
+    """Timing metadata of a node from its run_results.json entry."""
+    metadata: dict[str, Any] = {"dbt_execution_s": MetadataValue.float(round(result.get("execution_time") or 0, 3))}
+    for timing in result.get("timing", []):
+        if timing.get("started_at") and timing.get("completed_at"):
+            seconds = (_parse_time(timing["completed_at"]) - _parse_time(timing["started_at"])).total_seconds()
+            metadata[f"dbt_{timing['name']}_s"] = MetadataValue.float(round(seconds, 3))
+    rows_affected = (result.get("adapter_response") or {}).get("rows_affected")
+    # -1 when the adapter does not know (e.g. views)
+    if rows_affected is not None and rows_affected >= 0:
+        metadata["dbt_rows_affected"] = MetadataValue.int(int(rows_affected))
+    return metadata
+
+
+def dlt_report(
+    pipeline_name: str,
+    stages: dict[str, tuple[datetime, datetime, float]],
+    endpoints: dict[str, dict[str, Any]],
+    resources: dict[str, dict[str, Any]],
+) -> str:
+    """Plain text report of a dlt run: stage durations, slowest endpoints, items per resource."""
+    lines = [f"dlt run of {pipeline_name}: " + ", ".join(f"{stage} {seconds:.3f}s" for stage, (_, _, seconds) in stages.items())]
+    lines.append(f"Slowest API endpoints (top {REPORT_TOP_N} by total time):")
+    for endpoint, stats in list(endpoints.items())[:REPORT_TOP_N]:
+        lines.append(
+            f"  {endpoint:<24} {stats['requests']:>5} requests {stats['total_s']:>8.3f}s"
+            f"  p95 {stats['p95_ms']} ms  max {stats['max_ms']} ms  {stats['bytes']} bytes  statuses {stats['statuses']}"
+        )
+    lines.append("Items per resource:")
+    for resource, stats in resources.items():
+        lines.append(
+            f"  {resource:<24} {stats['items']:>7} items  {stats['items_per_s']} items/s"
+            f"  {stats['rows_changed']} changed, {stats['rows_skipped']} unchanged skipped"
+            f"  {stats['requests']} requests, {stats['coalesced_requests']} coalesced, {stats['cache_hits']} from cache"
+        )
+    return "\n".join(lines)
+
+
+def dbt_report(results: dict[str, dict[str, Any]]) -> str:
+    """Plain text report of the slowest dbt models and tests of a run."""
+    slowest = sorted(results.values(), key=lambda result: result.get("execution_time") or 0, reverse=True)
+    models = [result for result in slowest if result["unique_id"].startswith("model.")]
+    tests = [result for result in slowest if result["unique_id"].startswith("test.")]
+
+    lines = [f"Slowest dbt models (top {REPORT_TOP_N}):"]
+    lines.extend(
+        f"  {result['unique_id']:<48} {result.get('execution_time') or 0:>8.3f}s  {result['status']}"
+        for result in models[:REPORT_TOP_N]
+    )
+    lines.append(f"dbt tests: {len(tests)} in {sum(result.get('execution_time') or 0 for result in tests):.3f}s")
+    return "\n".join(lines)
+
+
+def export_dlt_spans(
+    pipeline_name: str,
+    stages: dict[str, tuple[datetime, datetime, float]],
+    endpoints: dict[str, dict[str, Any]],
+    resources: dict[str, dict[str, Any]],
+) -> None:
+    """Export a dlt run as a span with one child span per stage, if OpenTelemetry is enabled."""
+    tracer = _tracer()
+    if tracer is None or not stages:
+        return
+
+    started = min(start for start, _, _ in stages.values())
+    finished = max(end for _, end, _ in stages.values())
+    children = []
+    for stage, (start, end, _) in stages.items():
+        attributes: dict[str, Any] = {}
+        if stage == "extract":
+            for endpoint, stats in endpoints.items():
+                attributes.update(
+                    {
+                        f"api.{endpoint}.requests": stats["requests"],
+                        f"api.{endpoint}.total_s": stats["total_s"],
+                        f"api.{endpoint}.bytes": stats["bytes"],
+                    }
+                )
+            for resource, stats in resources.items():
+                attributes[f"dlt.{resource}.items"] = stats["items"]
+                attributes[f"dlt.{resource}.rows_changed"] = stats["rows_changed"]
+                attributes[f"dlt.{resource}.rows_skipped"] = stats["rows_skipped"]
+        children.append((f"dlt.{stage}", start, end, attributes))
+
+    _export(tracer, f"dlt.run {pipeline_name}", started, finished, {"dlt.pipeline": pipeline_name}, children)
+
+
+def export_dbt_spans(results: dict[str, dict[str, Any]]) -> None:
+    """Export a dbt invocation as a span with one child span per node, if OpenTelemetry is enabled."""
+    tracer = _tracer()
+    if tracer is None:
+        return
+
+    children = []
+    for unique_id, result in results.items():
+        timings = [timing for timing in result.get("timing", []) if timing.get("started_at") and timing.get("completed_at")]
+        if not timings:
+            continue
+        attributes = {"dbt.status": result["status"], "dbt.execution_s": result.get("execution_time") or 0}
+        children.append(
+            (unique_id, _parse_time(timings[0]["started_at"]), _parse_time(timings[-1]["completed_at"]), attributes)
+        )
+    if children:
+        started = min(start for _, start, _, _ in children)
+        finished = max(end for _, _, end, _ in children)
+        _export(tracer, "dbt.build", started, finished, {}, children)
+
+
+def _tracer() -> Any:
+    """OpenTelemetry tracer exporting to OTEL_EXPORTER_OTLP_ENDPOINT, or None when disabled."""
+    provider = _tracer_provider()
+    return provider.get_tracer("quantfoot") if provider is not None else None
+
+
+@functools.cache
+def _tracer_provider() -> Any:
+    """OpenTelemetry tracer provider with an OTLP exporter, created on first use."""
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return None
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        get_dagster_logger().warning(
+            "OTEL_EXPORTER_OTLP_ENDPOINT is set but OpenTelemetry is not installed (pip install quantfoot[otel])"
+        )
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "quantfoot")}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    return provider
+
+
+def _export(
+    tracer: Any,
+    name: str,
+    started: datetime,
+    finished: datetime,
+    attributes: dict[str, Any],
+    children: list[tuple[str, datetime, datetime, dict[str, Any]]],
+) -> None:
+    """Export a span and its children from recorded start/end times, then flush them."""
+    from opentelemetry import trace
+
+    parent = tracer.start_span(name, start_time=_nanoseconds(started), attributes=attributes)
+    parent_context = trace.set_span_in_context(parent)
+    for child_name, child_started, child_finished, child_attributes in children:
+        child = tracer.start_span(
+            child_name, context=parent_context, start_time=_nanoseconds(child_started), attributes=child_attributes
+        )
+        child.end(end_time=_nanoseconds(child_finished))
+    parent.end(end_time=_nanoseconds(finished))
+    # Run workers exit right after the step, do not wait for the batch interval
+    _tracer_provider().force_flush()
+
+
+def _resource_stats(asset_key: AssetKey, resources: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """Stats of the resource behind a dlt asset (keys are named dlt_<source>_<resource>)."""
+    name = asset_key.path[-1]
+    for resource, stats in resources.items():
+        if name == resource or name.endswith(f"_{resource}"):
+            return stats
+    return {}
+
+
+def _event_asset_key(context: AssetExecutionContext, event: Any) -> Optional[AssetKey]:
+    """Asset of a materialization yielded by dbt (an Output of an asset definition, or an AssetMaterialization)."""
+    if isinstance(event, Output):
+        return context.asset_key_for_output(event.output_name)
+    if isinstance(event, AssetMaterialization):
+        return event.asset_key
+    return None
+
+
+def _with_metadata(result: Any, metadata: dict[str, Any]) -> Any:
+    """
+    Copy of a result with extra metadata.
+
+    Every other field is kept: the check results, data version and tags of a
+    MaterializeResult, the value and output name of an Output.
+    """
+    if isinstance(result, MaterializeResult):
+        return result._replace(metadata={**(result.metadata or {}), **metadata})
+    return result.with_metadata({**(result.metadata or {}), **metadata})
+
+
+def _endpoints_table(endpoints: dict[str, dict[str, Any]]) -> str:
+    """Markdown table of the slowest endpoints."""
+    lines = ["| endpoint | requests | total (s) | p95 (ms) | max (ms) | bytes | statuses |", "|---|---|---|---|---|---|---|"]
+    for endpoint, stats in list(endpoints.items())[:REPORT_TOP_N]:
+        statuses = ", ".join(f"{status}: {count}" for status, count in stats["statuses"].items())
+        lines.append(
+            f"| {endpoint} | {stats['requests']} | {stats['total_s']} | {stats['p95_ms']} | {stats['max_ms']} | {stats['bytes']} | {statuses} |"
+        )
+    return "\n".join(lines)
+
+
+def _parse_time(value: str) -> datetime:
+    """Parse a run_results.json timestamp (ISO 8601, "Z" suffix)."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _nanoseconds(value: datetime) -> int:
+    return int(value.timestamp() * 1_000_000_000)
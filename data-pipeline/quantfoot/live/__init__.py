@@ -0,0 +1,20 @@
+"""
+Live-match poller, run next to Dagster as its own process.
+
+Polls the live fixtures at an adaptive interval, upserts the fixtures that
+changed into ``raw.raw_fixtures`` and publishes one ``NOTIFY`` per change, so
+score updates reach ``LISTEN``ers (the web app) within seconds instead of
+waiting for the next pipeline run:
+
+    python -m quantfoot.live
+"""
+from .diff import fixture_change
+from .poller import LivePoller
+from .store import NOTIFY_CHANNEL, FixtureStore
+
+__all__ = [
+    "LivePoller",
+    "FixtureStore",
+    "NOTIFY_CHANNEL",
+    "fixture_change",
+]
@@ -0,0 +1,55 @@
+"""
+Run the live poller: ``python -m quantfoot.live``.
+
+Configured with the pipeline's API Football and POSTGRES_* variables, plus:
+- LIVE_POLL_MODE: "ids" (fixtures of raw_fixtures about to be or being played)
+  or "all" (``fixtures?live=all``, restricted to TEAM_IDS when set)
+- LIVE_POLL_INTERVAL_SECONDS: interval while a fixture is in play
+- LIVE_IDLE_INTERVAL_SECONDS: longest interval when nothing is live
+- LIVE_KICKOFF_LEAD_MINUTES: how long before kickoff polling speeds up
+- LIVE_NOTIFY_CHANNEL: channel of the change events
+"""
+import asyncio
+import logging
+import os
+import signal
+
+from ..sources.api_football.client import APIFootballClient
+from .poller import LivePoller
+from .store import FixtureStore
+
+
+async def main() -> None:
+    # Every cycle must reach the API: a coalescer would keep serving the first payload
+    client = APIFootballClient(
+        api_key=os.getenv("API_FOOTBALL_KEY", "6f3db45add8cadeeca80b5641e4c5ee8"),
+        api_host=os.getenv("API_FOOTBALL_HOST", "v3.football.api-sports.io"),
+        base_url=os.getenv("API_FOOTBALL_BASE_URL"),
+        requests_per_minute=int(os.getenv("API_FOOTBALL_REQUESTS_PER_MINUTE", "10")),
+        coalesce=False,
+    )
+    store = FixtureStore()
+    poller = LivePoller(
+        client,
+        store,
+        team_ids=[int(x) for x in os.getenv("TEAM_IDS", "").split(",") if x],
+        mode=os.getenv("LIVE_POLL_MODE", "ids"),
+        live_interval=float(os.getenv("LIVE_POLL_INTERVAL_SECONDS", "15")),
+        idle_interval=float(os.getenv("LIVE_IDLE_INTERVAL_SECONDS", "600")),
+        kickoff_lead_minutes=int(os.getenv("LIVE_KICKOFF_LEAD_MINUTES", "15")),
+    )
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, poller.stop)
+
+    try:
+        await poller.run()
+    finally:
+        client.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
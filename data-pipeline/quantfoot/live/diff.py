@@ -0,0 +1,48 @@
+"""
+Diffing of live fixture payloads against the last known state.
+"""
+from typing import Any, Callable, Optional
+
+# Fields of a fixture payload whose changes are named in the change events
+TRACKED_FIELDS: dict[str, Callable[[dict[str, Any]], Any]] = {
+    "status": lambda item: item.get("fixture", {}).get("status", {}).get("short"),
+    "elapsed": lambda item: item.get("fixture", {}).get("status", {}).get("elapsed"),
+    "goals": lambda item: item.get("goals"),
+    "score": lambda item: item.get("score"),
+    "events": lambda item: len(item.get("events") or []),
+}
+
+
+def fixture_change(previous: Optional[dict[str, Any]], current: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """
+    Change event between two payloads of the same fixture.
+
+    Args:
+        previous: Last known payload (None when the fixture was never seen)
+        current: Payload just returned by the API
+
+    Returns:
+        None when nothing changed, otherwise the fixture_id, teams, status,
+        elapsed minutes and goals, the list of changed fields ("new" for an
+        unknown fixture, "data" when only untracked fields changed) and the
+        new payload under "data"
+    """
+    if previous == current:
+        return None
+
+    if previous is None:
+        changed = ["new"]
+    else:
+        changed = [name for name, read in TRACKED_FIELDS.items() if read(previous) != read(current)] or ["data"]
+
+    teams = current.get("teams", {})
+    return {
+        "fixture_id": current.get("fixture", {}).get("id"),
+        "home_team_id": teams.get("home", {}).get("id"),
+        "away_team_id": teams.get("away", {}).get("id"),
+        "status": TRACKED_FIELDS["status"](current),
+        "elapsed": TRACKED_FIELDS["elapsed"](current),
+        "goals": current.get("goals"),
+        "changed": changed,
+        "data": current,
+    }
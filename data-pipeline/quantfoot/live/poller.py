@@ -0,0 +1,182 @@
+"""
+Long-running asyncio poller pushing live fixture changes to Postgres.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+from ..sources.api_football.client import APIFootballClient, APIRequest
+from ..sources.api_football.rate_limit import QuotaExhaustedError
+from ..sources.api_football.raw_fixtures import FINAL_STATUSES, MAX_IDS_PER_REQUEST
+from .diff import TRACKED_FIELDS, fixture_change
+from .store import FixtureStore
+
+logger = logging.getLogger(__name__)
+
+# Name the poller's requests are recorded under in the client metrics
+RESOURCE_NAME = "live_fixtures"
+
+# Statuses of a fixture being played, and of a pause within the match
+IN_PLAY_STATUSES = {"1H", "2H", "ET", "P", "LIVE"}
+BREAK_STATUSES = {"HT", "BT", "INT", "SUSP"}
+
+
+class LivePoller:
+    """Polls live fixtures at an adaptive interval and publishes their changes.
+
+    Each cycle fetches the fixtures that may be live, either by id (fixtures
+    of ``raw_fixtures`` playing or about to kick off, ``fixtures?ids=``) or
+    with ``fixtures?live=all`` restricted to ``team_ids``. Every payload is
+    diffed against the last known one, kept in memory and seeded from
+    ``raw_fixtures``, and only the fixtures that changed are upserted and
+    announced with ``NOTIFY`` (see ``FixtureStore.publish``).
+
+    The next cycle runs after ``live_interval`` seconds while a fixture is in
+    play, four times slower during breaks (half time, before extra time) and,
+    when nothing is live, at the next kickoff minus ``kickoff_lead_minutes``,
+    but at least every ``idle_interval`` seconds.
+
+    API calls and database queries are blocking and run in worker threads,
+    so the event loop only schedules the cycles and handles shutdown.
+
+    The client should be built with ``coalesce=False``; when it coalesces,
+    its completed results are dropped before every cycle, so each poll gets
+    fresh payloads.
+    """
+
+    def __init__(
+        self,
+        client: APIFootballClient,
+        store: FixtureStore,
+        team_ids: Optional[list[int]] = None,
+        mode: str = "ids",
+        live_interval: float = 15,
+        idle_interval: float = 600,
+        kickoff_lead_minutes: int = 15,
+    ):
+        if mode not in ("ids", "all"):
+            raise ValueError(f"Unknown live poll mode {mode!r}, expected 'ids' or 'all'")
+        self.client = client
+        self.store = store
+        self.team_ids = team_ids or []
+        self.mode = mode
+        self.live_interval = live_interval
+        self.idle_interval = max(idle_interval, live_interval)
+        self.kickoff_lead_minutes = kickoff_lead_minutes
+        # fixture_id -> last payload published (or read from raw_fixtures)
+        self.known: dict[int, dict[str, Any]] = {}
+        self._stopped = asyncio.Event()
+
+    async def run(self) -> None:
+        """Poll until ``stop`` is called."""
+        logger.info(
+            f"Live poller started (mode={self.mode}, live every {self.live_interval:g}s, "
+            f"idle every {self.idle_interval:g}s)"
+        )
+        while not self._stopped.is_set():
+            try:
+                interval = await self.poll_once()
+            except QuotaExhaustedError as exc:
+                logger.error(f"Daily quota exhausted, polling paused: {exc}")
+                interval = self.idle_interval
+            except Exception:
+                logger.exception("Live poll failed")
+                interval = min(4 * self.live_interval, self.idle_interval)
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+        logger.info("Live poller stopped")
+
+    def stop(self) -> None:
+        """Stop after the current cycle."""
+        self._stopped.set()
+
+    async def poll_once(self) -> float:
+        """
+        Run one cycle: fetch, diff, upsert and notify.
+
+        Returns:
+            Seconds to wait before the next cycle
+        """
+        watched = await asyncio.to_thread(self.store.watched_fixtures, self.kickoff_lead_minutes)
+        for fixture_id, data in watched.items():
+            self.known.setdefault(fixture_id, data)
+
+        items = await asyncio.to_thread(self._fetch, list(watched))
+
+        changes = [change for item in items if (change := fixture_change(self._known(item), item))]
+        await asyncio.to_thread(self.store.publish, changes, self.team_ids)
+        for change in changes:
+            self.known[change["fixture_id"]] = change["data"]
+        if changes:
+            logger.info(
+                "Published "
+                + ", ".join(f"{change['fixture_id']} ({'/'.join(change['changed'])})" for change in changes)
+            )
+
+        # Final fixtures never change again
+        for item in items:
+            if TRACKED_FIELDS["status"](item) in FINAL_STATUSES:
+                self.known.pop(item.get("fixture", {}).get("id"), None)
+
+        return await self._next_interval(items)
+
+    def _fetch(self, watched_ids: list[int]) -> list[dict[str, Any]]:
+        """Current payloads of the fixtures that may be live."""
+        # The same requests are sent every cycle: never reuse a previous cycle's payloads
+        if self.client.coalescer is not None:
+            self.client.coalescer.clear()
+
+        # Fixtures seen in play that are not final yet, e.g. a match that just
+        # ended and dropped out of "live=all"
+        open_ids = {
+            fixture_id for fixture_id, item in self.known.items()
+            if TRACKED_FIELDS["status"](item) in IN_PLAY_STATUSES | BREAK_STATUSES
+        }
+
+        items: list[dict[str, Any]] = []
+        if self.mode == "all":
+            for item in self.client.get("fixtures", {"live": "all"}, resource=RESOURCE_NAME):
+                teams = item.get("teams", {})
+                followed = {teams.get("home", {}).get("id"), teams.get("away", {}).get("id")}
+                if not self.team_ids or followed & set(self.team_ids):
+                    items.append(item)
+            open_ids -= {item.get("fixture", {}).get("id") for item in items}
+        else:
+            open_ids |= set(watched_ids)
+
+        ids = [str(fixture_id) for fixture_id in sorted(open_ids)]
+        requests: list[APIRequest] = [
+            ("fixtures", {"ids": "-".join(ids[i:i + MAX_IDS_PER_REQUEST])})
+            for i in range(0, len(ids), MAX_IDS_PER_REQUEST)
+        ]
+        for endpoint, params in requests:
+            items.extend(self.client.get(endpoint, params, resource=RESOURCE_NAME))
+        return items
+
+    def _known(self, item: dict[str, Any]) -> Optional[dict[str, Any]]:
+        return self.known.get(item.get("fixture", {}).get("id"))
+
+    async def _next_interval(self, items: list[dict[str, Any]]) -> float:
+        """Seconds until the next cycle, from the statuses just fetched."""
+        statuses = {TRACKED_FIELDS["status"](item) for item in items}
+        if statuses & IN_PLAY_STATUSES:
+            return self.live_interval
+        if statuses & BREAK_STATUSES:
+            return min(4 * self.live_interval, self.idle_interval)
+
+        # Nothing live: wake up for the next kickoff
+        kickoffs = [
+            item["fixture"]["timestamp"] for item in items
+            if TRACKED_FIELDS["status"](item) not in FINAL_STATUSES and item.get("fixture", {}).get("timestamp")
+        ]
+        if kickoffs:
+            until_kickoff = min(kickoffs) - time.time()
+        else:
+            next_kickoff = await asyncio.to_thread(self.store.next_kickoff)
+            if next_kickoff is None:
+                return self.idle_interval
+            until_kickoff = next_kickoff.timestamp() - time.time() - 60 * self.kickoff_lead_minutes
+        return min(max(until_kickoff, self.live_interval), self.idle_interval)
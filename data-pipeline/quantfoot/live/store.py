@@ -0,0 +1,201 @@
+"""
+Postgres side of the live poller: watched fixtures, upserts and notifications.
+"""
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+import psycopg2.extensions
+from dlt.common.utils import uniq_id_base64
+from psycopg2.extras import Json
+
+from ..postgres import connect
+from ..seasons import RAW_FIXTURES, RAW_SCHEMA, ensure_raw_fixtures_partition, frozen_seasons, partition_name
+from ..sources.api_football.changes import content_hash
+from ..sources.api_football.raw_fixtures import FINAL_STATUSES
+
+# Channel the change events are published on (LISTEN fixture_changes)
+NOTIFY_CHANNEL = os.getenv("LIVE_NOTIFY_CHANNEL", "fixture_changes")
+
+# schema_name of the poller's loads in raw._dlt_loads
+LOADS_SCHEMA_NAME = "live_poller"
+
+# Hours after kickoff a fixture that is not final is still considered playing
+# (extra time, penalties, interruptions)
+MATCH_WINDOW_HOURS = 4
+
+
+class FixtureStore:
+    """Reads and writes ``raw.raw_fixtures`` for the live poller.
+
+    Rows written here look like rows loaded by dlt: every upsert gets a new
+    ``_dlt_load_id``, recorded as a completed load in ``raw._dlt_loads``, so
+    the next incremental dbt build picks the fixture up, and the next
+    pipeline run merges over it on ``fixture_id``.
+    """
+
+    def __init__(self, connection: Optional[psycopg2.extensions.connection] = None):
+        self._connection = connection
+        # Seasons whose raw_fixtures partition exists
+        self._partitions: set[int] = set()
+
+    @property
+    def connection(self) -> psycopg2.extensions.connection:
+        """Open connection, reconnecting after the previous one was lost."""
+        if self._connection is None or self._connection.closed:
+            self._connection = connect("quantfoot-live")
+        return self._connection
+
+    def watched_fixtures(self, lead_minutes: int) -> dict[int, dict[str, Any]]:
+        """
+        Stored fixtures that are playing or kick off within ``lead_minutes``.
+
+        Args:
+            lead_minutes: How long before kickoff a fixture starts being polled
+
+        Returns:
+            Raw API payload of each fixture, by fixture_id
+        """
+        rows = self._query(
+            """
+            select fixture_id, data
+            from raw.raw_fixtures
+            where status <> all(%s)
+              and fixture_date between now() - make_interval(hours => %s)
+                                   and now() + make_interval(mins => %s)
+            """,
+            (list(FINAL_STATUSES), MATCH_WINDOW_HOURS, lead_minutes),
+        )
+        return {fixture_id: data for fixture_id, data in rows}
+
+    def next_kickoff(self) -> Optional[datetime]:
+        """Kickoff of the next stored fixture that has not started yet."""
+        rows = self._query(
+            "select min(fixture_date) from raw.raw_fixtures where fixture_date > now() and status <> all(%s)",
+            (list(FINAL_STATUSES),),
+        )
+        return rows[0][0] if rows else None
+
+    def publish(self, changes: list[dict[str, Any]], team_ids: list[int]) -> None:
+        """
+        Upsert changed fixtures and notify listeners, in one transaction.
+
+        ``raw_fixtures`` has no unique constraint on ``fixture_id`` (dlt merges
+        through a staging table), so the row is updated and only inserted when
+        it does not exist yet. The season restricts the update to the
+        fixture's partition, created first when needed, and the lock dlt's
+        merges take on that partition (see ``quantfoot.destination``) is held
+        until the commit, so a merge inserting the same new fixture waits and
+        replaces it instead of adding a copy. Fixtures of frozen seasons are
+        not written. Notifications are delivered on commit, after the rows
+        are visible.
+
+        Args:
+            changes: Change events (see ``quantfoot.live.diff.fixture_change``),
+                with the new payload under "data"
+            team_ids: Teams followed by the pipeline, to fill ``team_id`` on inserts
+        """
+        frozen = frozen_seasons() if changes else set()
+        changes = [change for change in changes if _season(change) is not None and _season(change) not in frozen]
+        if not changes:
+            return
+        seasons = sorted({_season(change) for change in changes})
+        for season in seasons:
+            if season not in self._partitions:
+                ensure_raw_fixtures_partition(season)
+                self._partitions.add(season)
+
+        load_id = str(time.time())
+        connection = self.connection
+        try:
+            with connection.cursor() as cursor:
+                # Lock of the merges into the partitions (quantfoot.destination), in season
+                # order so that concurrent publishes cannot deadlock
+                for season in seasons:
+                    cursor.execute(
+                        "select pg_advisory_xact_lock(hashtext(%s))",
+                        (f"{RAW_SCHEMA}.{partition_name(RAW_FIXTURES, season)}",),
+                    )
+                for change in changes:
+                    item = change["data"]
+                    fixture = item.get("fixture", {})
+                    cursor.execute(
+                        """
+                        update raw.raw_fixtures
+                        set fixture_date = %s, status = %s, data = %s, data_hash = %s, _dlt_load_id = %s
+                        where fixture_id = %s and season = %s
+                        """,
+                        (
+                            fixture.get("date"),
+                            change["status"],
+                            Json(item),
+                            content_hash(item),
+                            load_id,
+                            change["fixture_id"],
+                            _season(change),
+                        ),
+                    )
+                    if cursor.rowcount == 0:
+                        cursor.execute(
+                            """
+                            insert into raw.raw_fixtures
+                                (fixture_id, fixture_date, team_id, season, status, data, data_hash, _dlt_load_id, _dlt_id)
+                            values (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                            """,
+                            (
+                                change["fixture_id"],
+                                fixture.get("date"),
+                                _followed_team(item, team_ids),
+                                _season(change),
+                                change["status"],
+                                Json(item),
+                                content_hash(item),
+                                load_id,
+                                uniq_id_base64(),
+                            ),
+                        )
+                    event = {key: value for key, value in change.items() if key != "data"}
+                    cursor.execute("select pg_notify(%s, %s)", (NOTIFY_CHANNEL, json.dumps(event)))
+                # Completed load, committed with its rows: incremental marts select
+                # the rows of the loads completed since their last build
+                cursor.execute(
+                    "insert into raw._dlt_loads (load_id, schema_name, status, inserted_at) values (%s, %s, 0, now())",
+                    (load_id, LOADS_SCHEMA_NAME),
+                )
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+
+    def close(self) -> None:
+        if self._connection is not None and not self._connection.closed:
+            self._connection.close()
+
+    def _query(self, sql: str, params: tuple) -> list[tuple]:
+        """Run a read-only query and end its transaction."""
+        connection = self.connection
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        finally:
+            if not connection.closed:
+                connection.rollback()
+
+
+def _season(change: dict[str, Any]) -> Optional[int]:
+    """Season of a changed fixture (its raw_fixtures partition)."""
+    return change["data"].get("league", {}).get("season")
+
+
+def _followed_team(item: dict[str, Any], team_ids: list[int]) -> Optional[int]:
+    """Team of the fixture followed by the pipeline (home team first)."""
+    teams = item.get("teams", {})
+    for side in ("home", "away"):
+        team_id = teams.get(side, {}).get("id")
+        if team_id in team_ids:
+            return team_id
+    return teams.get("home", {}).get("id")
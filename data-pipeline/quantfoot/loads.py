@@ -0,0 +1,63 @@
+"""
+Loads completed in the raw dataset since a consumer last processed it.
+
+Consumers of the raw tables (the dbt build, the validation checks) process
+the rows of the loads completed since their last run (``raw._dlt_loads``,
+written once a dlt load or a live poller update is committed). Load ids are
+the times loads started, not the order they were committed in: a long
+partition run commits after faster, later loads, with a lower load id than
+rows already processed, so a "greater load id" high-water mark would skip it.
+"""
+from datetime import datetime, timedelta
+from typing import Any
+
+import psycopg2.extensions
+from psycopg2 import sql
+
+from .seasons import RAW_SCHEMA
+
+# Loads completed this long before the newest one processed are tracked by
+# id: their inserted_at may be taken before a run and committed after it (as
+# the load_lookback_minutes dbt var of the incremental marts)
+LOAD_LOOKBACK = timedelta(minutes=10)
+
+
+def completed_loads(cursor: psycopg2.extensions.cursor, since: dict[str, Any]) -> tuple[list[str], dict[str, Any]]:
+    """
+    Loads completed (``raw._dlt_loads``) since the last run of a consumer.
+
+    The state of a run is the newest ``inserted_at`` it saw, and the ids of
+    the loads completed within ``LOAD_LOOKBACK`` before it: every other load
+    completed before that time was processed.
+
+    Args:
+        cursor: Cursor on the data database
+        since: State of the last run, empty when every load is new
+
+    Returns:
+        Ids of the new loads, and the state to save once they are processed
+    """
+    previous = datetime.fromisoformat(since["inserted_at"]) if since.get("inserted_at") else None
+    cursor.execute("select to_regclass(%s) is not null", (f"{RAW_SCHEMA}._dlt_loads",))
+    if cursor.fetchone()[0]:
+        query = sql.SQL("select load_id, inserted_at from {} where status = 0").format(
+            sql.Identifier(RAW_SCHEMA, "_dlt_loads")
+        )
+        if previous is not None:
+            query += sql.SQL(" and inserted_at > %s")
+        cursor.execute(query, (previous - LOAD_LOOKBACK,) if previous is not None else None)
+        loads = cursor.fetchall()
+    else:
+        # Nothing loaded yet
+        loads = []
+
+    processed = set(since.get("load_ids", []))
+    new = sorted(load_id for load_id, _ in loads if load_id not in processed)
+    newest = max((inserted_at for _, inserted_at in loads), default=previous)
+    state = {
+        "inserted_at": newest.isoformat() if newest is not None else None,
+        "load_ids": sorted(
+            load_id for load_id, inserted_at in loads if inserted_at > newest - LOAD_LOOKBACK
+        ),
+    }
+    return new, state
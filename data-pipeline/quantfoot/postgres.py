@@ -0,0 +1,27 @@
+"""
+Connections to the data database, configured like the dlt destination and the dbt profile.
+"""
+import os
+
+import psycopg2
+import psycopg2.extensions
+
+
+def connect(application_name: str = "quantfoot") -> psycopg2.extensions.connection:
+    """
+    Open a connection to the data database (POSTGRES_* variables).
+
+    Args:
+        application_name: Name shown in pg_stat_activity
+
+    Returns:
+        psycopg2 connection
+    """
+    return psycopg2.connect(
+        dbname=os.getenv("POSTGRES_DB", "football_data"),
+        user=os.getenv("POSTGRES_USER", "dagster"),
+        password=os.getenv("POSTGRES_PASSWORD", "dagster_password"),
+        host=os.getenv("POSTGRES_HOST", "postgres"),
+        port=int(os.getenv("POSTGRES_PORT", "5432")),
+        application_name=application_name,
+    )
@@ -0,0 +1,125 @@
+"""
+Blue/green publishing of the marts schema.
+
+Instead of rebuilding the live marts in place, a blue/green build:
+1. builds every mart (tables, indexes, constraints) into the empty shadow
+   schema ``marts_shadow`` (dbt var ``marts_schema``)
+2. validates it with the ``validate_constraints`` macro
+3. swaps it with the live schema by renaming both in one transaction: the
+   live marts become ``marts_previous``, the shadow schema becomes ``marts``
+
+Readers keep querying the live tables, without lock waits, until the swap
+commits; schema renames do not wait for running queries, and statements
+prepared on the old tables are planned again on the new ones. The previous
+version is kept until the next publish, so ``rollback`` swaps it back
+instantly.
+
+Usage:
+    python -m quantfoot.publish rollback
+"""
+import argparse
+import os
+
+import psycopg2.extensions
+from psycopg2 import sql
+
+from .postgres import connect
+
+# Schemas of the live, shadow (being built) and previous marts
+MARTS_SCHEMA = "marts"
+SHADOW_SCHEMA = f"{MARTS_SCHEMA}_shadow"
+PREVIOUS_SCHEMA = f"{MARTS_SCHEMA}_previous"
+
+# Build the marts into the shadow schema and swap them in (see DbtBuildConfig.blue_green)
+BLUE_GREEN = os.getenv("DBT_BLUE_GREEN", "false").lower() == "true"
+
+# Longest wait for a lock on the schemas before a swap gives up
+SWAP_LOCK_TIMEOUT = os.getenv("DBT_SWAP_LOCK_TIMEOUT", "5s")
+
+
+def reset_shadow_schema() -> None:
+    """Drop what a failed build may have left in the shadow schema, so every mart is built from scratch."""
+    connection = connect("quantfoot-dbt-publish")
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql.SQL("drop schema if exists {} cascade").format(sql.Identifier(SHADOW_SCHEMA)))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def publish_shadow_schema() -> None:
+    """
+    Swap the validated shadow schema in as the live marts.
+
+    The live marts become the previous version (replacing the one kept so
+    far); on the first publish there are no live marts to keep.
+    """
+    connection = connect("quantfoot-dbt-publish")
+    try:
+        with connection.cursor() as cursor:
+            _lock_timeout(cursor)
+            cursor.execute(sql.SQL("drop schema if exists {} cascade").format(sql.Identifier(PREVIOUS_SCHEMA)))
+            if _schema_exists(cursor, MARTS_SCHEMA):
+                _rename(cursor, MARTS_SCHEMA, PREVIOUS_SCHEMA)
+            _rename(cursor, SHADOW_SCHEMA, MARTS_SCHEMA)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def rollback_marts() -> None:
+    """
+    Swap the previous marts back in, keeping the current ones as the previous version.
+
+    Rolling back twice publishes the current marts again.
+
+    Raises:
+        RuntimeError: No previous version is kept
+    """
+    connection = connect("quantfoot-dbt-publish")
+    try:
+        with connection.cursor() as cursor:
+            _lock_timeout(cursor)
+            if not _schema_exists(cursor, PREVIOUS_SCHEMA):
+                raise RuntimeError(f"No previous marts to roll back to (schema {PREVIOUS_SCHEMA} does not exist)")
+            cursor.execute(sql.SQL("drop schema if exists {} cascade").format(sql.Identifier(SHADOW_SCHEMA)))
+            _rename(cursor, MARTS_SCHEMA, SHADOW_SCHEMA)
+            _rename(cursor, PREVIOUS_SCHEMA, MARTS_SCHEMA)
+            _rename(cursor, SHADOW_SCHEMA, PREVIOUS_SCHEMA)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def _lock_timeout(cursor: psycopg2.extensions.cursor) -> None:
+    cursor.execute("select set_config('lock_timeout', %s, true)", (SWAP_LOCK_TIMEOUT,))
+
+
+def _schema_exists(cursor: psycopg2.extensions.cursor, schema: str) -> bool:
+    cursor.execute("select 1 from pg_namespace where nspname = %s", (schema,))
+    return cursor.fetchone() is not None
+
+
+def _rename(cursor: psycopg2.extensions.cursor, schema: str, new_name: str) -> None:
+    cursor.execute(
+        sql.SQL("alter schema {} rename to {}").format(sql.Identifier(schema), sql.Identifier(new_name))
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["rollback"])
+    parser.parse_args()
+    rollback_marts()
+    print(f"Previous marts published as {MARTS_SCHEMA}, replaced ones kept as {PREVIOUS_SCHEMA}")
+
+
+if __name__ == "__main__":
+    main()
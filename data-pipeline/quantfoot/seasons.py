@@ -0,0 +1,402 @@
+"""
+Season partitions of the fixture tables.
+
+``raw.raw_fixtures`` and ``marts.fixtures`` are partitioned by season (one
+list partition per season, e.g. ``raw.raw_fixtures_2025``):
+- a fixtures load writes to the partition of its season directly, so dlt's
+  delete-insert merge only reads and writes that partition
+- the ``fixtures`` mart merges into the partitions of the seasons it
+  rebuilds only (``partition_by`` config, see macros/list_partitions.sql)
+- ``fixture_date`` has a BRIN index on both tables: fixtures are loaded
+  roughly in date order, and a BRIN index stays a few pages per season
+- the B-tree on ``raw_fixtures.fixture_id``, only used to merge loads and
+  live updates, exists on the partitions that still change, like the JSON
+  expression indexes of the dbt on-run-start hook
+  (macros/create_raw_json_indexes.sql)
+
+Closed seasons (every fixture final, the last one played more than
+FREEZE_SEASONS_AFTER_DAYS ago) are frozen: they are recorded in
+``raw.frozen_seasons``, their partitions are vacuumed with FREEZE once, and
+they are never rewritten: their fixtures are no longer loaded, and the
+incremental ``fixtures`` mart skips them. Rebuilding the marts from scratch
+(full refresh, blue/green build) still rebuilds every season.
+
+Usage:
+    python -m quantfoot.seasons freeze              # freeze the closed seasons
+    python -m quantfoot.seasons freeze --season 2023
+    python -m quantfoot.seasons unfreeze 2023
+"""
+import argparse
+import os
+from typing import Optional
+
+import psycopg2.extensions
+from psycopg2 import sql
+
+from .postgres import connect
+from .publish import MARTS_SCHEMA
+from .sources.api_football.raw_fixtures import FINAL_STATUSES
+
+RAW_SCHEMA = "raw"
+RAW_FIXTURES = "raw_fixtures"
+MART_FIXTURES = "fixtures"
+
+# Seasons whose partitions are never written again
+FROZEN_SEASONS_TABLE = "frozen_seasons"
+
+# Days after the last fixture of a season (all final) before it is frozen, 0: never
+FREEZE_AFTER_DAYS = int(os.getenv("FREEZE_SEASONS_AFTER_DAYS", "90"))
+
+# Columns of the dlt raw_fixtures resource
+RAW_FIXTURES_COLUMNS = """
+    fixture_id bigint not null,
+    fixture_date timestamp with time zone,
+    team_id bigint,
+    season bigint not null,
+    status varchar,
+    data jsonb,
+    data_hash varchar,
+    _dlt_load_id varchar not null,
+    _dlt_id varchar not null
+"""
+
+
+def partition_name(table: str, season: int) -> str:
+    """Name of the partition of ``table`` holding ``season`` (e.g. raw_fixtures_2025)."""
+    return f"{table}_{season}"
+
+
+def ensure_raw_fixtures_partition(season: int) -> str:
+    """
+    Create the partition of ``raw.raw_fixtures`` a fixtures load of ``season`` writes to.
+
+    The partitioned table is created on the first call, or converted from
+    the plain table dlt created before: rows are copied into their season's
+    partition and the views reading the table are pointed to the new one.
+
+    Args:
+        season: Season year
+
+    Returns:
+        Name of the partition table (in the raw schema)
+    """
+    connection = connect("quantfoot-seasons")
+    try:
+        with connection.cursor() as cursor:
+            # Concurrent loads create their partitions one at a time
+            cursor.execute("select pg_advisory_xact_lock(hashtext(%s))", (f"{RAW_SCHEMA}.{RAW_FIXTURES}",))
+            kind = _relkind(cursor, RAW_SCHEMA, RAW_FIXTURES)
+            if kind is None:
+                _create_raw_fixtures(cursor)
+            elif kind == "r":
+                _partition_raw_fixtures(cursor)
+            _create_raw_partition(cursor, season, frozen=season in _frozen_seasons(cursor))
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    return partition_name(RAW_FIXTURES, season)
+
+
+def frozen_seasons() -> set[int]:
+    """Seasons that are frozen."""
+    connection = connect("quantfoot-seasons")
+    try:
+        with connection.cursor() as cursor:
+            return _frozen_seasons(cursor)
+    finally:
+        connection.close()
+
+
+def closed_seasons(after_days: int = FREEZE_AFTER_DAYS) -> list[int]:
+    """
+    Seasons not frozen yet whose fixtures are all final, the last one played more than ``after_days`` ago.
+
+    Args:
+        after_days: Days since the last fixture of the season
+
+    Returns:
+        Season years
+    """
+    connection = connect("quantfoot-seasons")
+    try:
+        with connection.cursor() as cursor:
+            if _relkind(cursor, RAW_SCHEMA, RAW_FIXTURES) is None:
+                return []
+            cursor.execute(
+                sql.SQL(
+                    """
+                    select season
+                    from {}
+                    where season <> all(%s::bigint[])
+                    group by season
+                    having bool_and(status = any(%s))
+                       and max(fixture_date) < now() - make_interval(days => %s)
+                    order by season
+                    """
+                ).format(sql.Identifier(RAW_SCHEMA, RAW_FIXTURES)),
+                (sorted(_frozen_seasons(cursor)), list(FINAL_STATUSES), after_days),
+            )
+            return [season for (season,) in cursor.fetchall()]
+    finally:
+        connection.close()
+
+
+def freeze_seasons(seasons: list[int]) -> None:
+    """
+    Freeze ``seasons``: record them, drop their merge indexes and vacuum their partitions with FREEZE.
+
+    Frozen tuples are never rewritten by anti-wraparound vacuums, and the
+    planner statistics of the partitions are final.
+
+    Args:
+        seasons: Season years
+    """
+    if not seasons:
+        return
+    connection = connect("quantfoot-seasons")
+    try:
+        with connection.cursor() as cursor:
+            _create_frozen_seasons_table(cursor)
+            for season in seasons:
+                cursor.execute(
+                    sql.SQL("insert into {} (season) values (%s) on conflict do nothing").format(
+                        sql.Identifier(RAW_SCHEMA, FROZEN_SEASONS_TABLE)
+                    ),
+                    (season,),
+                )
+                _drop_merge_indexes(cursor, season)
+        connection.commit()
+
+        # VACUUM cannot run in a transaction
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            for season in seasons:
+                for schema, table in [(RAW_SCHEMA, RAW_FIXTURES), (MARTS_SCHEMA, MART_FIXTURES)]:
+                    partition = partition_name(table, season)
+                    if _relkind(cursor, schema, partition) == "r":
+                        cursor.execute(
+                            sql.SQL("vacuum (freeze, analyze) {}").format(sql.Identifier(schema, partition))
+                        )
+    except Exception:
+        if not connection.autocommit:
+            connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def freeze_closed_seasons(after_days: int = FREEZE_AFTER_DAYS) -> list[int]:
+    """
+    Freeze the seasons that closed (see ``closed_seasons``).
+
+    Args:
+        after_days: Days since the last fixture of a season, 0 never freezes
+
+    Returns:
+        Seasons frozen
+    """
+    if after_days <= 0:
+        return []
+    seasons = closed_seasons(after_days)
+    freeze_seasons(seasons)
+    return seasons
+
+
+def unfreeze_season(season: int) -> None:
+    """
+    Let ``season`` be loaded and merged again (e.g. to reload a corrected season).
+
+    Args:
+        season: Season year
+    """
+    connection = connect("quantfoot-seasons")
+    try:
+        with connection.cursor() as cursor:
+            _create_frozen_seasons_table(cursor)
+            cursor.execute(
+                sql.SQL("delete from {} where season = %s").format(sql.Identifier(RAW_SCHEMA, FROZEN_SEASONS_TABLE)),
+                (season,),
+            )
+            if _relkind(cursor, RAW_SCHEMA, partition_name(RAW_FIXTURES, season)) == "r":
+                _create_raw_partition(cursor, season, frozen=False)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def _relkind(cursor: psycopg2.extensions.cursor, schema: str, table: str) -> Optional[str]:
+    """Kind of a relation ("r": table, "p": partitioned table, ...), None when it does not exist."""
+    cursor.execute(
+        """
+        select c.relkind
+        from pg_class c
+        join pg_namespace n on n.oid = c.relnamespace
+        where n.nspname = %s and c.relname = %s
+        """,
+        (schema, table),
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _frozen_seasons(cursor: psycopg2.extensions.cursor) -> set[int]:
+    if _relkind(cursor, RAW_SCHEMA, FROZEN_SEASONS_TABLE) is None:
+        return set()
+    cursor.execute(sql.SQL("select season from {}").format(sql.Identifier(RAW_SCHEMA, FROZEN_SEASONS_TABLE)))
+    return {season for (season,) in cursor.fetchall()}
+
+
+def _create_frozen_seasons_table(cursor: psycopg2.extensions.cursor) -> None:
+    cursor.execute(sql.SQL("create schema if not exists {}").format(sql.Identifier(RAW_SCHEMA)))
+    cursor.execute(
+        sql.SQL(
+            "create table if not exists {} (season bigint primary key, frozen_at timestamptz not null default now())"
+        ).format(sql.Identifier(RAW_SCHEMA, FROZEN_SEASONS_TABLE))
+    )
+
+
+def _drop_merge_indexes(cursor: psycopg2.extensions.cursor, season: int) -> None:
+    """
+    Drop the indexes of the partition of ``season`` that only serve its loads.
+
+    That is every index of the partition but the unique ``_dlt_id`` and
+    those of the partitioned table: the ``fixture_id`` merge index and the
+    JSON expression indexes of the dbt hook.
+    """
+    cursor.execute(
+        """
+        select format('%%I.%%I', n.nspname, i.relname)
+        from pg_index x
+        join pg_class i on i.oid = x.indexrelid
+        join pg_namespace n on n.oid = i.relnamespace
+        where x.indrelid = to_regclass(%s)
+          and not x.indisunique
+          and not exists (select 1 from pg_inherits h where h.inhrelid = x.indexrelid)
+        """,
+        (f"{RAW_SCHEMA}.{partition_name(RAW_FIXTURES, season)}",),
+    )
+    for (index,) in cursor.fetchall():
+        cursor.execute(sql.SQL("drop index {}").format(sql.SQL(index)))
+
+
+def _fixture_id_index(season: int) -> str:
+    return f"{partition_name(RAW_FIXTURES, season)}_fixture_id"
+
+
+def _create_raw_fixtures(cursor: psycopg2.extensions.cursor, like: Optional[str] = None) -> None:
+    """Create the partitioned ``raw_fixtures``, with the columns of dlt's resource or those of table ``like``."""
+    if like:
+        columns = sql.SQL("like {} including defaults").format(sql.Identifier(RAW_SCHEMA, like))
+    else:
+        columns = sql.SQL(RAW_FIXTURES_COLUMNS)
+    cursor.execute(sql.SQL("create schema if not exists {}").format(sql.Identifier(RAW_SCHEMA)))
+    cursor.execute(
+        sql.SQL("create table {} ({}) partition by list (season)").format(
+            sql.Identifier(RAW_SCHEMA, RAW_FIXTURES), columns
+        )
+    )
+    cursor.execute(
+        sql.SQL("create index {} on {} using brin (fixture_date)").format(
+            sql.Identifier(f"{RAW_FIXTURES}_fixture_date_brin"), sql.Identifier(RAW_SCHEMA, RAW_FIXTURES)
+        )
+    )
+
+
+def _create_raw_partition(cursor: psycopg2.extensions.cursor, season: int, frozen: bool) -> None:
+    """
+    Create the partition of ``season`` and its own indexes, if missing.
+
+    Every partition has dlt's unique ``_dlt_id`` (a unique index of the
+    partitioned table would have to include the season); the merge index on
+    ``fixture_id`` is only kept while the season is not frozen.
+    """
+    partition = partition_name(RAW_FIXTURES, season)
+    cursor.execute(
+        sql.SQL("create table if not exists {} partition of {} for values in ({})").format(
+            sql.Identifier(RAW_SCHEMA, partition), sql.Identifier(RAW_SCHEMA, RAW_FIXTURES), sql.Literal(season)
+        )
+    )
+    cursor.execute(
+        sql.SQL("create unique index if not exists {} on {} (_dlt_id)").format(
+            sql.Identifier(f"{partition}__dlt_id_key"), sql.Identifier(RAW_SCHEMA, partition)
+        )
+    )
+    if not frozen:
+        cursor.execute(
+            sql.SQL("create index if not exists {} on {} (fixture_id)").format(
+                sql.Identifier(_fixture_id_index(season)), sql.Identifier(RAW_SCHEMA, partition)
+            )
+        )
+
+
+def _partition_raw_fixtures(cursor: psycopg2.extensions.cursor) -> None:
+    """
+    Convert the plain ``raw_fixtures`` table created by dlt to a partitioned one.
+
+    The views reading it (staging) keep their definition and dependents:
+    they are replaced in place to read the new table.
+    """
+    cursor.execute(
+        """
+        select distinct format('%%I.%%I', n.nspname, v.relname), pg_get_viewdef(v.oid)
+        from pg_depend d
+        join pg_rewrite r on r.oid = d.objid
+        join pg_class v on v.oid = r.ev_class
+        join pg_namespace n on n.oid = v.relnamespace
+        where d.refobjid = %s::regclass
+          and v.oid <> d.refobjid
+          and v.relkind = 'v'
+        """,
+        (f"{RAW_SCHEMA}.{RAW_FIXTURES}",),
+    )
+    views = cursor.fetchall()
+
+    unpartitioned = f"{RAW_FIXTURES}_unpartitioned"
+    cursor.execute(
+        sql.SQL("alter table {} rename to {}").format(
+            sql.Identifier(RAW_SCHEMA, RAW_FIXTURES), sql.Identifier(unpartitioned)
+        )
+    )
+    _create_raw_fixtures(cursor, like=unpartitioned)
+    cursor.execute(
+        sql.SQL("select distinct season from {}").format(sql.Identifier(RAW_SCHEMA, unpartitioned))
+    )
+    for (season,) in cursor.fetchall():
+        _create_raw_partition(cursor, season, frozen=False)
+    cursor.execute(
+        sql.SQL("insert into {} select * from {} order by fixture_date").format(
+            sql.Identifier(RAW_SCHEMA, RAW_FIXTURES), sql.Identifier(RAW_SCHEMA, unpartitioned)
+        )
+    )
+    for view, definition in views:
+        cursor.execute(sql.SQL("create or replace view {} as {}").format(sql.SQL(view), sql.SQL(definition)))
+    cursor.execute(sql.SQL("drop table {}").format(sql.Identifier(RAW_SCHEMA, unpartitioned)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    freeze = subparsers.add_parser("freeze", help="Freeze the closed seasons, or --season")
+    freeze.add_argument("--season", type=int, action="append", help="Season to freeze (repeatable)")
+    freeze.add_argument("--after-days", type=int, default=FREEZE_AFTER_DAYS, help="Days since the last fixture")
+    unfreeze = subparsers.add_parser("unfreeze", help="Let a season be loaded again")
+    unfreeze.add_argument("season", type=int)
+    args = parser.parse_args()
+
+    if args.command == "freeze":
+        seasons = args.season or closed_seasons(args.after_days)
+        freeze_seasons(seasons)
+        print(f"Frozen seasons: {', '.join(map(str, seasons)) or 'none'}")
+    else:
+        unfreeze_season(args.season)
+        print(f"Season {args.season} unfrozen")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""
+Export all sensors for Dagster.
+"""
+from .api_football import api_football_partitions_sensor
+
+__all__ = [
+    "api_football_partitions_sensor",
+]
@@ -0,0 +1,169 @@
+"""
+Sensor keeping the partitioned API Football assets complete and fresh.
+
+Instead of re-running every team and season, the sensor only requests runs
+for partitions that were never materialized, or whose last materialization
+is older than their refresh interval. Past seasons do not change, so their
+fixtures are only loaded when missing. Fixture details are loaded after the
+fixtures of their partition, whenever those were loaded again.
+"""
+import os
+import time
+from typing import Iterator, Optional
+from dagster import (
+    AssetKey,
+    AssetRecordsFilter,
+    AssetsDefinition,
+    AssetSelection,
+    DagsterEventType,
+    DagsterInstance,
+    DefaultSensorStatus,
+    RunRequest,
+    SensorEvaluationContext,
+    SkipReason,
+    sensor,
+)
+
+from ..assets.leagues import (
+    api_football_fixture_details_assets,
+    api_football_fixtures_assets,
+    api_football_team_assets,
+)
+from ..assets.partitions import SEASONS
+
+HOUR = 60 * 60
+
+# Age after which a partition is loaded again
+TEAMS_REFRESH_HOURS = float(os.getenv("TEAMS_REFRESH_HOURS", "24"))
+FIXTURES_REFRESH_HOURS = float(os.getenv("FIXTURES_REFRESH_HOURS", "6"))
+
+
+@sensor(
+    name="api_football_partitions_sensor",
+    asset_selection=AssetSelection.assets(
+        api_football_team_assets,
+        api_football_fixtures_assets,
+        api_football_fixture_details_assets,
+    ),
+    minimum_interval_seconds=15 * 60,
+    default_status=DefaultSensorStatus.RUNNING,
+)
+def api_football_partitions_sensor(context: SensorEvaluationContext):
+    """
+    Request runs for missing or stale team and fixtures partitions.
+
+    - Teams: missing, or older than TEAMS_REFRESH_HOURS
+    - Fixtures of the latest season: missing, or older than FIXTURES_REFRESH_HOURS
+    - Fixtures of past seasons: missing only
+    - Fixture details: fixtures of the partition loaded since the details
+    """
+    current_season = str(max(SEASONS))
+
+    requests = list(_stale_partitions(context.instance, api_football_team_assets, TEAMS_REFRESH_HOURS * HOUR))
+    requests.extend(
+        _stale_partitions(
+            context.instance,
+            api_football_fixtures_assets,
+            FIXTURES_REFRESH_HOURS * HOUR,
+            refresh=lambda partition_key: partition_key.keys_by_dimension["season"] == current_season,
+        )
+    )
+
+    requests.extend(
+        _outdated_partitions(context.instance, api_football_fixture_details_assets, api_football_fixtures_assets)
+    )
+
+    if not requests:
+        return SkipReason("All API Football partitions are materialized and fresh")
+    return requests
+
+
+def _stale_partitions(
+    instance: DagsterInstance,
+    assets_def: AssetsDefinition,
+    max_age: float,
+    refresh=lambda partition_key: True,
+) -> Iterator[RunRequest]:
+    """
+    Yield a run request for every missing or stale partition of ``assets_def``.
+
+    All the assets of a dlt asset are materialized by the same run, so the
+    first of them stands for the whole partition.
+
+    Args:
+        instance: Dagster instance
+        assets_def: Partitioned dlt assets
+        max_age: Seconds after which a partition is stale
+        refresh: Tells whether a materialized partition may be refreshed at all
+
+    Yields:
+        Run requests, keyed by the partition's last materialization so each
+        state of a partition is requested at most once
+    """
+    asset_key = min(assets_def.keys, key=AssetKey.to_user_string)
+    partition_keys = assets_def.partitions_def.get_partition_keys()  # type: ignore[union-attr]
+    materialized_at = _latest_materializations(instance, asset_key)
+    now = time.time()
+
+    for partition_key in partition_keys:
+        latest: Optional[tuple[int, float]] = materialized_at.get(partition_key)
+        if latest is not None and (not refresh(partition_key) or now - latest[1] < max_age):
+            continue
+
+        yield RunRequest(
+            run_key=f"{assets_def.node_def.name}:{partition_key}:{latest[0] if latest else 'missing'}",
+            partition_key=partition_key,
+            asset_selection=list(assets_def.keys),
+        )
+
+
+def _outdated_partitions(
+    instance: DagsterInstance,
+    assets_def: AssetsDefinition,
+    upstream_def: AssetsDefinition,
+) -> Iterator[RunRequest]:
+    """
+    Yield a run request for every partition of ``assets_def`` older than the same partition of ``upstream_def``.
+
+    Partitions whose upstream was never materialized are left alone.
+
+    Args:
+        instance: Dagster instance
+        assets_def: Partitioned dlt assets reading the tables of ``upstream_def``
+        upstream_def: Partitioned dlt assets with the same partitions
+
+    Yields:
+        Run requests, keyed by the upstream partition's last materialization
+    """
+    materialized_at = _latest_materializations(instance, min(assets_def.keys, key=AssetKey.to_user_string))
+    upstream_at = _latest_materializations(instance, min(upstream_def.keys, key=AssetKey.to_user_string))
+
+    for partition_key, (upstream_id, upstream_time) in upstream_at.items():
+        latest = materialized_at.get(partition_key)
+        if latest is not None and latest[1] >= upstream_time:
+            continue
+
+        yield RunRequest(
+            run_key=f"{assets_def.node_def.name}:{partition_key}:{upstream_id}",
+            partition_key=partition_key,
+            asset_selection=list(assets_def.keys),
+        )
+
+
+def _latest_materializations(instance: DagsterInstance, asset_key: AssetKey) -> dict[str, tuple[int, float]]:
+    """Storage id and timestamp of the latest materialization of each partition of an asset."""
+    storage_ids = instance.get_latest_storage_id_by_partition(asset_key, DagsterEventType.ASSET_MATERIALIZATION)
+    if not storage_ids:
+        return {}
+
+    records = instance.fetch_materializations(
+        AssetRecordsFilter(asset_key=asset_key, storage_ids=list(storage_ids.values())),
+        limit=len(storage_ids),
+    ).records
+    timestamps = {record.storage_id: record.timestamp for record in records}
+
+    return {
+        partition: (storage_id, timestamps[storage_id])
+        for partition, storage_id in storage_ids.items()
+        if storage_id in timestamps
+    }
@@ -1,23 +1,44 @@
 """
 API Football dlt source.
 """
+from pathlib import Path
 import dlt
+from .cache import ResponseCache
 from .client import APIFootballClient
+from .coalesce import MAX_RESULTS
+from .metrics import RequestMetrics
 from .raw_countries import raw_countries_resource
 from .raw_leagues import raw_leagues_resource
+from .raw_league_seasons import raw_league_seasons_resource
 from .raw_team_info import raw_team_info_resource
 from .raw_team_seasons import raw_team_seasons_resource
 from .raw_venues import raw_venues_resource
 from .raw_fixtures import raw_fixtures_resource
 from .raw_players import raw_players_resource
+from .raw_fixture_details import (
+    fixture_details_resource,
+    raw_fixture_events_resource,
+    raw_fixture_lineups_resource,
+    raw_fixture_players_resource,
+    raw_fixture_statistics_resource,
+)
 
 
 @dlt.source(name="api_football")
 def api_football_source(
     api_key: str,
     api_host: str = "v3.football.api-sports.io",
+    base_url: str | None = None,
     season: int = 2025,
     team_ids: list[int] | None = None,
+    league_ids: list[int] | None = None,
+    max_workers: int = 4,
+    requests_per_minute: int = 10,
+    cache_dir: str | None = None,
+    offline: bool = False,
+    fixtures_backfill: bool = False,
+    skip_unchanged: bool = True,
+    metrics: RequestMetrics | None = None,
 ):
     """
     Source for loading raw data from API Football.
@@ -26,26 +47,69 @@ def api_football_source(
     Args:
         api_key: API key for API Football
         api_host: API host
+        base_url: Server URL (default: None -> https://{api_host})
         season: Season year
         team_ids: List of team IDs (default: None -> [2184, 6654] for Servette FC and Étoile Carouge)
+        league_ids: League crawl mode: follow every team of these competitions instead of
+            ``team_ids`` (fixtures with one call per competition, teams discovered from them)
+        max_workers: Number of API requests kept in flight concurrently by per-team resources
+        requests_per_minute: Initial per-minute limit, adjusted from the API's rate-limit headers
+        cache_dir: Directory of the on-disk response cache (default: None -> no cache)
+        offline: Replay responses from the cache only, without calling the API
+        fixtures_backfill: Reload full seasons of fixtures instead of only open/recent ones
+        skip_unchanged: Only write rows whose JSON changed since their last load (see ``ChangeDetector``)
+        metrics: Collector of request latencies and items per resource (default: None -> the client's own)
         
     Returns:
         dlt source with raw data resources storing complete JSON responses
     """
     # Initialize client
-    client = APIFootballClient(api_key=api_key, api_host=api_host)
+    cache = None
+    if cache_dir:
+        cache = ResponseCache(Path(cache_dir) / "api_football.sqlite", offline=offline)
     
     # Default team IDs if not provided
     if team_ids is None:
         team_ids = [2184, 6654]
+
+    client = APIFootballClient(
+        api_key=api_key,
+        api_host=api_host,
+        base_url=base_url,
+        max_workers=max_workers,
+        requests_per_minute=requests_per_minute,
+        # Room for every result kept (one teams result per team, or per
+        # competition in league crawl mode, and the leagues one), so none is
+        # dropped before every resource has read it
+        coalesced_results=max(MAX_RESULTS, len(league_ids or team_ids) + 1),
+        cache=cache,
+        metrics=metrics,
+    )
     
-    # Return all raw resources
-    return (
-        raw_countries_resource(client=client),
-        raw_leagues_resource(client=client),
-        raw_team_info_resource(client=client, team_ids=team_ids),
-        raw_team_seasons_resource(client=client, team_ids=team_ids),
-        raw_venues_resource(client=client, team_ids=team_ids),
-        raw_fixtures_resource(client=client, season=season, team_ids=team_ids),
-        raw_players_resource(client=client, team_ids=team_ids),
+    # Team-scoped resources: the followed teams, or the teams of the crawled competitions
+    teams = {"team_ids": team_ids, "league_ids": league_ids, "season": season}
+
+    # Fetched once by id for all the fixture detail tables
+    fixture_details = fixture_details_resource(client=client, **teams)
+
+    # Return all raw resources, counting the items each of them yields
+    resources = (
+        raw_countries_resource(client=client, skip_unchanged=skip_unchanged),
+        raw_leagues_resource(client=client, skip_unchanged=skip_unchanged),
+        raw_league_seasons_resource(client=client, skip_unchanged=skip_unchanged),
+        raw_team_info_resource(client=client, **teams, skip_unchanged=skip_unchanged),
+        raw_team_seasons_resource(client=client, **teams, skip_unchanged=skip_unchanged),
+        raw_venues_resource(client=client, **teams, skip_unchanged=skip_unchanged),
+        raw_fixtures_resource(
+            client=client,
+            **teams,
+            backfill=fixtures_backfill,
+            skip_unchanged=skip_unchanged,
+        ),
+        raw_players_resource(client=client, **teams, skip_unchanged=skip_unchanged),
+        fixture_details | raw_fixture_events_resource(client=client, skip_unchanged=skip_unchanged),
+        fixture_details | raw_fixture_lineups_resource(client=client, skip_unchanged=skip_unchanged),
+        fixture_details | raw_fixture_statistics_resource(client=client, skip_unchanged=skip_unchanged),
+        fixture_details | raw_fixture_players_resource(client=client, skip_unchanged=skip_unchanged),
     )
+    return tuple(resource.add_map(client.metrics.count_items(resource.name)) for resource in resources)
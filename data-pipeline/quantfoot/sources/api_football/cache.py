@@ -0,0 +1,236 @@
+"""
+Persistent on-disk cache for API Football responses.
+
+Responses are stored zlib-compressed in a SQLite file, keyed by a hash of the
+server URL, endpoint and params. Each endpoint has its own time-to-live: reference
+data (countries, leagues, team seasons) is reused for days, while fixtures are
+always revalidated. Stale entries are revalidated with ``If-None-Match`` /
+``If-Modified-Since`` when the API sent an ETag or Last-Modified header.
+
+The cache also records every response it sees, so a whole source run can be
+replayed offline (``offline=True``) for benchmarks and tests.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+DAY = 24 * 60 * 60
+
+# Seconds a cached response is served without asking the API again
+DEFAULT_TTLS: dict[str, float] = {
+    "countries": 30 * DAY,
+    "leagues": DAY,
+    "teams/seasons": 7 * DAY,
+    "teams": 7 * DAY,
+    "players/squads": DAY,
+    "fixtures": 0,
+}
+
+
+class CacheMissError(Exception):
+    """Raised in offline mode when a request has no cached response."""
+
+
+@dataclass
+class CachedResponse:
+    """A cached API payload with its validators."""
+
+    payload: dict[str, Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class ResponseCache:
+    """SQLite-backed response cache with per-endpoint TTL and LRU eviction.
+
+    Args:
+        path: SQLite file (parent directories are created)
+        ttls: Seconds each endpoint stays fresh (endpoints not listed use default_ttl)
+        default_ttl: TTL for endpoints missing from ttls
+        max_bytes: Upper bound of the compressed payload size; least recently
+            used entries are evicted beyond it
+        offline: Serve every request from the cache, whatever its age, and
+            raise CacheMissError when a response is missing
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttls: Optional[dict[str, float]] = None,
+        default_ttl: float = 0,
+        max_bytes: int = 512 * 1024 * 1024,
+        offline: bool = False,
+    ):
+        self.path = Path(path)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def metrics(self) -> dict[str, int]:
+        """Hit/miss counters since the cache was opened."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+        }
+
+    @staticmethod
+    def key(base_url: str, endpoint: str, params: dict[str, Any]) -> str:
+        """Hash identifying a request."""
+        raw = json.dumps([base_url, endpoint, {k: str(v) for k, v in params.items()}], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def ttl(self, endpoint: str) -> float:
+        """Seconds a response of ``endpoint`` stays fresh."""
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Look up a cached response, fresh or not.
+
+        Args:
+            key: Request key (see ``key``)
+
+        Returns:
+            The cached response, or None
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT payload, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connect().execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        payload, etag, last_modified, fetched_at = row
+        return CachedResponse(json.loads(zlib.decompress(payload)), etag, last_modified, fetched_at)
+
+    def lookup(self, key: str, endpoint: str) -> tuple[Optional[CachedResponse], bool]:
+        """
+        Look up a request and tell whether it can be served without the API.
+
+        Args:
+            key: Request key (see ``key``)
+            endpoint: API endpoint, selects the TTL
+
+        Returns:
+            (cached response or None, is fresh) - a stale entry is still
+            returned so its validators can be sent with the request
+
+        Raises:
+            CacheMissError: In offline mode, if the request was never cached
+        """
+        entry = self.get(key)
+        fresh = entry is not None and (
+            self.offline or time.time() - entry.fetched_at < self.ttl(endpoint)
+        )
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not fresh and self.offline:
+            raise CacheMissError(f"No cached response for {endpoint} ({key}) in offline mode")
+        return entry, fresh
+
+    def put(
+        self,
+        key: str,
+        endpoint: str,
+        payload: dict[str, Any],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """
+        Store a response, then evict least recently used entries above max_bytes.
+
+        Args:
+            key: Request key (see ``key``)
+            endpoint: API endpoint
+            payload: Whole JSON payload
+            etag: ETag response header
+            last_modified: Last-Modified response header
+        """
+        blob = zlib.compress(json.dumps(payload, separators=(",", ":")).encode())
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (key, endpoint, payload, etag, last_modified, fetched_at, accessed_at, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, endpoint, blob, etag, last_modified, now, now, len(blob)),
+            )
+            self._evict(connection)
+
+    def touch(self, key: str) -> None:
+        """Mark a revalidated (304) entry as freshly fetched."""
+        now = time.time()
+        with self._lock:
+            self.revalidations += 1
+            self._connect().execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        (total,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        while total > self.max_bytes:
+            row = connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return
+            connection.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            total -= row[1]
+            self.evictions += 1
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (keeps client construction free of I/O)."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self._connection = connection
+        return self._connection
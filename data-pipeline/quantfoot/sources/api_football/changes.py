@@ -0,0 +1,176 @@
+"""
+Change detection of raw rows through a content hash of their JSON.
+"""
+import hashlib
+import json
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+import dlt
+from dlt.destinations.exceptions import DatabaseUndefinedRelation
+
+from .metrics import RequestMetrics
+
+# Hashes kept per resource, the least recently written are dropped first
+# (a row whose hash was dropped is written again once)
+MAX_DATA_HASHES = 50_000
+
+# (load id, table) of the destination tables checked in the current load
+_checked_tables: set[tuple[str, str]] = set()
+
+
+def content_hash(data: Any) -> str:
+    """
+    Stable hash of a JSON document.
+
+    Keys are sorted and whitespace removed before hashing, so the hash only
+    changes when the content does, not when the API reorders keys.
+
+    Args:
+        data: JSON-serializable document (a row's "data" column)
+
+    Returns:
+        64-bit BLAKE2b digest as 16 hex characters
+    """
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+class ChangeDetector:
+    """Skips the rows of a resource whose ``data`` did not change since their last load.
+
+    Every row gets a ``data_hash`` column. The hashes of the rows loaded so
+    far are kept in the resource state (``data_hashes``, by primary key), which
+    dlt stores in the destination with the rows, so a row whose hash matches
+    is not written again. Must be created inside the resource's generator.
+
+    Resources with a ``merge_key`` (all rows of a team replaced on each load)
+    compare whole groups with ``filter_group``: a group is skipped when none
+    of its rows changed, appeared or disappeared, and written in full otherwise,
+    so the rows that did not change are not deleted by the merge.
+
+    The hashes describe the rows of one destination table: they are reset
+    when the table is missing or empty, or was recreated or truncated since
+    they were stored (its storage, ``pg_relation_filenode``, changed), so a
+    dropped or re-partitioned table is filled again. At most
+    ``MAX_DATA_HASHES`` are kept, the least recently written are dropped.
+
+    The rows found changed and the rows skipped are counted in ``metrics``.
+    """
+
+    def __init__(self, metrics: RequestMetrics, key: Sequence[str], skip_unchanged: bool = True):
+        """
+        Args:
+            metrics: Metrics of the source run
+            key: Primary key columns of the resource (within a group for ``filter_group``)
+            skip_unchanged: Drop unchanged rows (with False, every row is
+                written and the stored hashes are still updated)
+        """
+        self.metrics = metrics
+        self.key = key
+        self.skip_unchanged = skip_unchanged
+        self.resource = dlt.current.resource_name()
+        state = dlt.current.resource_state()
+        table = dlt.current.resource().table_name
+        self._check_destination(state, table if isinstance(table, str) else self.resource)
+        self.hashes: dict[str, Any] = state.setdefault("data_hashes", {})
+
+    def filter(self, rows: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """
+        Hash rows and yield the ones that changed.
+
+        Args:
+            rows: Rows with a "data" column
+
+        Yields:
+            New or changed rows (every row without ``skip_unchanged``), with "data_hash" set
+        """
+        for row in rows:
+            row["data_hash"] = content_hash(row["data"])
+            row_key = self._row_key(row)
+            changed = self.hashes.get(row_key) != row["data_hash"]
+            self._store(row_key, row["data_hash"])
+            self.metrics.record_changes(self.resource, changed=int(changed), skipped=int(self._skips(changed)))
+            if not self._skips(changed):
+                yield row
+
+    def filter_group(self, group: Any, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Hash the rows of a merge key group and return them all if the group changed.
+
+        Args:
+            group: Merge key value of the rows (e.g., the team_id)
+            rows: Every row of the group, with a "data" column
+
+        Returns:
+            The rows with "data_hash" set, or an empty list when the group is unchanged
+        """
+        for row in rows:
+            row["data_hash"] = content_hash(row["data"])
+        hashes = {self._row_key(row): row["data_hash"] for row in rows}
+        stored = self.hashes.get(str(group), {})
+        changed_rows = sum(stored.get(row_key) != data_hash for row_key, data_hash in hashes.items())
+        changed = changed_rows > 0 or stored.keys() != hashes.keys()
+        self._store(str(group), hashes)
+
+        skipped = len(rows) if self._skips(changed) else 0
+        self.metrics.record_changes(self.resource, changed=changed_rows, skipped=skipped)
+        return [] if skipped else rows
+
+    def _store(self, key: str, value: Any) -> None:
+        """Keep the hash of ``key`` as the most recently written, dropping the oldest ones."""
+        self.hashes.pop(key, None)
+        self.hashes[key] = value
+        while len(self.hashes) > MAX_DATA_HASHES:
+            del self.hashes[next(iter(self.hashes))]
+
+    @staticmethod
+    def _check_destination(state: dict[str, Any], table: str) -> None:
+        """Reset the stored hashes when they do not describe the rows of ``table`` (once per load)."""
+        load_id = dlt.current.load_package_state()["load_id"]
+        if (load_id, table) in _checked_tables:
+            return
+        identity = _table_identity(table)
+        stored = state.get("data_hashes_table")
+        # A table first seen holding rows was created by the previous load
+        if identity is None or (stored is not None and stored != identity):
+            state["data_hashes"] = {}
+        if identity is None:
+            state.pop("data_hashes_table", None)
+        else:
+            state["data_hashes_table"] = identity
+        _checked_tables.add((load_id, table))
+
+    def _skips(self, changed: bool) -> bool:
+        return self.skip_unchanged and not changed
+
+    def _row_key(self, row: dict[str, Any]) -> str:
+        return "-".join(str(row[column]) for column in self.key)
+
+
+def _table_identity(table: str) -> Optional[str]:
+    """
+    Storage of a destination table holding rows, None when it is missing or empty.
+
+    The relfilenode of a table changes when it is truncated or recreated; a
+    partitioned table is identified by those of its partitions.
+    """
+    with dlt.current.pipeline().sql_client() as sql_client:
+        name = sql_client.make_qualified_table_name(table)
+        try:
+            rows = sql_client.execute_sql(
+                f"""
+                select coalesce(
+                    pg_relation_filenode(%(table)s::regclass)::text,
+                    (
+                        select string_agg(pg_relation_filenode(inhrelid)::text, ',' order by inhrelid)
+                        from pg_inherits
+                        where inhparent = %(table)s::regclass
+                    )
+                )
+                from (select 1 from {name} limit 1) has_rows
+                """,
+                table=name,
+            )
+        except DatabaseUndefinedRelation:
+            return None
+    return rows[0][0] if rows else None
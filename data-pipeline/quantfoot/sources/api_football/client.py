@@ -1,43 +1,393 @@
 """
 API Football client for making requests.
 """
-from typing import Optional, Any
-from dlt.sources.helpers import requests
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional, Any, Iterable, Iterator
+import dlt
+from dlt.common.exceptions import ResourceNameNotAvailable
+from dlt.sources.helpers.requests import Client, Response
+
+from .cache import ResponseCache
+from .coalesce import MAX_RESULTS, RequestCoalescer, request_key
+from .metrics import CACHE_HIT, RequestMetrics
+from .rate_limit import QuotaExhaustedError, RateLimiter, request_priority
+
+# A request is an (endpoint, params) pair, e.g. ("teams", {"id": 2184})
+APIRequest = tuple[str, Optional[dict[str, Any]]]
+
+# Endpoints whose requests several resources of a source make (raw_leagues and
+# raw_league_seasons; raw_team_info and raw_venues, and the team discovery of
+# league crawl mode): only their results are kept for later callers
+SHARED_ENDPOINTS = frozenset({"leagues", "teams"})
 
 
 class APIFootballClient:
-    """Client for API Football REST API."""
-    
-    def __init__(self, api_key: str, api_host: str = "v3.football.api-sports.io"):
+    """Client for API Football REST API.
+
+    All requests share a keep-alive connection pool, so the TLS handshake is
+    paid once per connection instead of once per call. With ``max_workers > 1``
+    the batch API (``get_many``) keeps up to ``max_workers`` requests in flight
+    on a bounded thread pool.
+
+    Every request first takes a token from a shared ``RateLimiter`` that follows
+    the API's rate-limit headers, so concurrent resources stay just under the
+    plan's per-minute limit and higher-priority requests (live fixtures) are
+    sent before reference data. 429s pause the limiter and are retried.
+
+    Identical requests made by different resources of the same run (e.g. the
+    ``teams?id=`` calls shared by ``raw_team_info`` and ``raw_venues``) are
+    coalesced: the first one is sent, the others reuse its result. Only the
+    single-page results of ``SHARED_ENDPOINTS``, up to ``coalesced_results``,
+    are kept for later callers, so the results no other resource reads never
+    push them out; other requests, and the following pages of a paged
+    endpoint, are only shared while in flight, so streaming them keeps
+    memory bounded.
+
+    An optional on-disk ``ResponseCache`` sits below the coalescer and serves
+    reference data across runs according to per-endpoint TTLs.
+
+    Latency, status and size of every request, and the requests avoided by
+    coalescing or the cache, are recorded in ``metrics``.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_host: str = "v3.football.api-sports.io",
+        base_url: Optional[str] = None,
+        max_workers: int = 1,
+        max_connections: int = 10,
+        requests_per_minute: int = 10,
+        daily_limit: Optional[int] = None,
+        max_rate_limit_retries: int = 5,
+        coalesce: bool = True,
+        coalesced_results: int = MAX_RESULTS,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[RequestMetrics] = None,
+    ):
         self.api_key = api_key
         self.api_host = api_host
-        self.base_url = f"https://{api_host}"
-    
+        # Another server speaking the same API (e.g. the benchmarks' stand-in)
+        self.base_url = (base_url or f"https://{api_host}").rstrip("/")
+        self.max_workers = max(1, max_workers)
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.rate_limiter = RateLimiter(requests_per_minute, daily_limit)
+        self.coalescer = RequestCoalescer(coalesced_results) if coalesce else None
+        self.cache = cache
+        self.metrics = metrics or RequestMetrics()
+        # dlt's Client keeps one session per thread on top of a shared HTTPAdapter
+        # pool, and retries 5xx/connection errors with exponential backoff.
+        # 429s are left to the rate limiter so every retry also waits for a token.
+        self._http = Client(
+            max_connections=max(max_connections, self.max_workers),
+            raise_for_status=False,
+            status_codes=range(500, 600),
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+
     def _get_headers(self) -> dict[str, str]:
         """Get headers for API requests."""
         return {
             "x-rapidapi-key": self.api_key,
             "x-rapidapi-host": self.api_host
         }
-    
-    def get(self, endpoint: str, params: Optional[dict[str, Any]] = None) -> list[dict[str, Any]]:
+
+    @property
+    def quota_usage(self) -> dict[str, int]:
+        """Number of API requests (daily quota) used by each dlt resource so far."""
+        return dict(self.rate_limiter.usage)
+
+    @property
+    def coalesced_requests(self) -> int:
+        """Number of API calls avoided by reusing the result of an identical request."""
+        return self.coalescer.hits if self.coalescer is not None else 0
+
+    def get(
+        self,
+        endpoint: str,
+        params: Optional[dict[str, Any]] = None,
+        resource: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
         """
         Make a GET request to the API.
-        
+
+        All pages of a paged endpoint are fetched; use ``paginate`` to stream
+        large result sets instead of holding them in memory.
+
         Args:
             endpoint: API endpoint (e.g., "leagues", "teams")
             params: Query parameters
-            
+            resource: dlt resource charged for the request (default: the calling resource)
+
         Returns:
             JSON response data
         """
+        return list(self.paginate(endpoint, params, resource=resource))
+
+    def paginate(
+        self,
+        endpoint: str,
+        params: Optional[dict[str, Any]] = None,
+        prefetch: Optional[int] = None,
+        resource: Optional[str] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over every item of a paged endpoint, one item at a time.
+
+        The first page tells how many pages there are (``paging.total``). The
+        following pages are fetched on the worker pool up to ``prefetch`` pages
+        ahead of the consumer, so downloads overlap with downstream processing
+        while memory stays bounded to ``prefetch + 1`` pages.
+
+        Args:
+            endpoint: API endpoint (e.g., "players")
+            params: Query parameters (without "page")
+            prefetch: Number of pages fetched ahead (default: max_workers)
+            resource: dlt resource charged for the requests (default: the calling resource)
+
+        Yields:
+            Items of the "response" array of every page, in page order
+        """
+        params = params or {}
+        resource = resource or _current_resource()
+        prefetch = prefetch or self.max_workers
+
+        first_page = self._request(endpoint, params, resource)
+        next_pages = iter(range(2, _total_pages(first_page) + 1))
+
+        if self.max_workers == 1:
+            yield from first_page.get("response", [])
+            for page in next_pages:
+                yield from self._request(endpoint, {**params, "page": page}, resource).get("response", [])
+            return
+
+        executor = self._get_executor()
+        queue: deque[Future[dict[str, Any]]] = deque()
+
+        def fill() -> None:
+            while len(queue) < prefetch:
+                page = next(next_pages, None)
+                if page is None:
+                    return
+                queue.append(executor.submit(self._request, endpoint, {**params, "page": page}, resource))
+
+        try:
+            fill()
+            yield from first_page.get("response", [])
+            del first_page
+            while queue:
+                payload = queue.popleft().result()
+                fill()
+                yield from payload.get("response", [])
+        finally:
+            for future in queue:
+                future.cancel()
+
+    def _request(self, endpoint: str, params: dict[str, Any], resource: Optional[str]) -> dict[str, Any]:
+        """Fetch a single page and return the whole JSON payload (response, paging, ...)."""
+        if self.coalescer is None:
+            return self._send(endpoint, params, resource)
+
+        sent = False
+
+        def send() -> dict[str, Any]:
+            nonlocal sent
+            sent = True
+            return self._send(endpoint, params, resource)
+
+        # Later pages are streamed once: keeping them would hold the whole listing
+        keep = endpoint in SHARED_ENDPOINTS and "page" not in params
+        payload = self.coalescer.fetch(request_key(endpoint, params), send, keep=keep)
+        if not sent:
+            self.metrics.record_coalesced(resource)
+        return payload
+
+    def _send(self, endpoint: str, params: dict[str, Any], resource: Optional[str]) -> dict[str, Any]:
+        """Send a request through the cache and rate limiter, retrying when rate limited."""
         url = f"{self.base_url}/{endpoint}"
-        response = requests.get(url, headers=self._get_headers(), params=params or {})  # type: ignore
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("errors"):
-            raise Exception(f"API Error: {data['errors']}")
-        
-        return data.get("response", [])  # type: ignore
+        priority = request_priority(endpoint, params)
+        headers = self._get_headers()
+
+        cache_key = None
+        cached = None
+        if self.cache is not None:
+            started = time.perf_counter()
+            cache_key = self.cache.key(self.base_url, endpoint, params)
+            cached, fresh = self.cache.lookup(cache_key, endpoint)
+            if cached is not None and fresh:
+                self.metrics.record_request(endpoint, CACHE_HIT, time.perf_counter() - started, 0, resource)
+                return cached.payload
+            # Stale entry: let the API answer 304 if nothing changed
+            if cached is not None and cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached is not None and cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        for _ in range(self.max_rate_limit_retries + 1):
+            self.rate_limiter.acquire(priority, resource)
+            started = time.perf_counter()
+            response = self._http.get(url, headers=headers, params=params)
+            self.metrics.record_request(
+                endpoint, response.status_code, time.perf_counter() - started, len(response.content), resource
+            )
+            self.rate_limiter.update_from_headers(response.headers)
+
+            if response.status_code == 304 and cached is not None and cache_key is not None:
+                self.cache.touch(cache_key)  # type: ignore[union-attr]
+                return cached.payload
+
+            if response.status_code == 429:
+                self.rate_limiter.pause(_retry_after(response, self.rate_limiter.requests_per_minute))
+                continue
+            response.raise_for_status()
+
+            data = response.json()
+            errors = data.get("errors")
+
+            # API Football also reports limits as errors on a 200 response
+            if isinstance(errors, dict) and "rateLimit" in errors:
+                self.rate_limiter.pause(_retry_after(response, self.rate_limiter.requests_per_minute))
+                continue
+            if isinstance(errors, dict) and "requests" in errors:
+                raise QuotaExhaustedError(f"API Error: {errors['requests']}")
+            if errors:
+                raise Exception(f"API Error: {errors}")
+
+            if self.cache is not None and cache_key is not None:
+                self.cache.put(
+                    cache_key,
+                    endpoint,
+                    data,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+            return data  # type: ignore
+
+        raise Exception(
+            f"API Error: still rate limited on {endpoint} after {self.max_rate_limit_retries} retries"
+        )
+
+    def get_many(
+        self,
+        requests: Iterable[APIRequest],
+        paginate: bool = True,
+    ) -> Iterator[tuple[str, dict[str, Any], list[dict[str, Any]]]]:
+        """
+        Run a batch of GET requests and yield each result as soon as it completes.
+
+        At most ``2 * max_workers`` requests are submitted ahead of the consumer,
+        so arbitrarily long batches (e.g. one request per team) run in constant
+        memory. Results come back in completion order, not submission order.
+
+        With ``paginate``, the remaining pages of a paged endpoint are queued
+        as soon as its first page arrives, and every page is yielded on its own.
+
+        Args:
+            requests: Iterable of (endpoint, params) pairs
+            paginate: Follow ``paging.total`` and fetch every page
+
+        Yields:
+            (endpoint, params, response) tuples, one per page
+        """
+        pending_requests = ((endpoint, params or {}) for endpoint, params in requests)
+        # Worker threads do not see dlt's resource context, resolve it here
+        resource = _current_resource()
+
+        if self.max_workers == 1:
+            for endpoint, params in pending_requests:
+                if paginate:
+                    for page in self._iter_pages(endpoint, params, resource):
+                        yield endpoint, params, page.get("response", [])
+                else:
+                    yield endpoint, params, self._request(endpoint, params, resource).get("response", [])
+            return
+
+        executor = self._get_executor()
+        in_flight: dict[Future[dict[str, Any]], tuple[str, dict[str, Any]]] = {}
+        # Follow-up pages go first so partially fetched requests finish early
+        next_pages: deque[tuple[str, dict[str, Any]]] = deque()
+        max_in_flight = 2 * self.max_workers
+        exhausted = False
+
+        try:
+            while in_flight or next_pages or not exhausted:
+                while len(in_flight) < max_in_flight:
+                    if next_pages:
+                        request = next_pages.popleft()
+                    elif not exhausted:
+                        request = next(pending_requests, None)
+                        if request is None:
+                            exhausted = True
+                            continue
+                    else:
+                        break
+                    in_flight[executor.submit(self._request, *request, resource)] = request
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    endpoint, params = in_flight.pop(future)
+                    payload = future.result()
+                    if paginate and "page" not in params:
+                        next_pages.extend(
+                            (endpoint, {**params, "page": page})
+                            for page in range(2, _total_pages(payload) + 1)
+                        )
+                    yield endpoint, params, payload.get("response", [])
+        finally:
+            # Consumer stopped early or a request failed: drop what has not started yet
+            for future in in_flight:
+                future.cancel()
+
+    def _iter_pages(self, endpoint: str, params: dict[str, Any], resource: Optional[str]) -> Iterator[dict[str, Any]]:
+        """Fetch the pages of a request one after another."""
+        page = self._request(endpoint, params, resource)
+        yield page
+        for page_number in range(2, _total_pages(page) + 1):
+            yield self._request(endpoint, {**params, "page": page_number}, resource)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the worker pool shared by all batch calls."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="api_football",
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker pool and close the cache. The client can still be used afterwards."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self.cache is not None:
+            self.cache.close()
+
+
+def _current_resource() -> Optional[str]:
+    """Name of the dlt resource being extracted, if called from one."""
+    try:
+        return dlt.current.resource_name()
+    except ResourceNameNotAvailable:
+        return None
+
+
+def _total_pages(payload: dict[str, Any]) -> int:
+    """Number of pages announced by a response's "paging" block."""
+    paging = payload.get("paging") or {}
+    try:
+        return max(1, int(paging.get("total") or 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def _retry_after(response: Response, requests_per_minute: int) -> float:
+    """Seconds to wait before retrying a rate-limited request."""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return 60.0 / requests_per_minute
@@ -0,0 +1,99 @@
+"""
+Request coalescing for API Football calls made within one source run.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Mapping
+
+RequestKey = tuple[str, tuple[tuple[str, str], ...]]
+
+# Completed results kept for later callers (least recently used dropped first)
+MAX_RESULTS = 256
+
+
+def request_key(endpoint: str, params: Mapping[str, Any]) -> RequestKey:
+    """
+    Build a hashable key identifying a request.
+
+    Param values are compared as strings, so {"id": 33} and {"id": "33"} are
+    the same request, as they are on the wire.
+
+    Args:
+        endpoint: API endpoint (e.g., "teams")
+        params: Query parameters
+
+    Returns:
+        (endpoint, sorted params) key
+    """
+    return endpoint, tuple(sorted((name, str(value)) for name, value in params.items()))
+
+
+class RequestCoalescer:
+    """Fetch each distinct request once and share the result with every caller.
+
+    Callers asking for a request that is already in flight wait for it instead
+    of sending a second one. Once completed, a request is forgotten unless its
+    result is kept (``keep``): only the ``max_results`` most recently used
+    results are, so a long-lived coalescer does not hold every payload of a
+    run. Failed requests are not kept, so a later caller retries them.
+    """
+
+    def __init__(self, max_results: int = MAX_RESULTS) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.max_results = max_results
+        self._in_flight: dict[Hashable, Future[Any]] = {}
+        self._results: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fetch(self, key: Hashable, fetch: Callable[[], Any], keep: bool = True) -> Any:
+        """
+        Return the result for ``key``, calling ``fetch`` only if nobody did yet.
+
+        Args:
+            key: Request key (see ``request_key``)
+            fetch: Function performing the request
+            keep: Keep the result for later callers (otherwise it is only
+                shared with the callers waiting for it)
+
+        Returns:
+            The (shared) result of ``fetch``
+        """
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                self._results.move_to_end(key)
+                return self._results[key]
+            result = self._in_flight.get(key)
+            if result is not None:
+                self.hits += 1
+                owner = False
+            else:
+                self.misses += 1
+                result = self._in_flight[key] = Future()
+                owner = True
+
+        if not owner:
+            return result.result()
+
+        try:
+            value = fetch()
+        except BaseException as error:
+            with self._lock:
+                del self._in_flight[key]
+            result.set_exception(error)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            if keep and self.max_results > 0:
+                self._results[key] = value
+                while len(self._results) > self.max_results:
+                    self._results.popitem(last=False)
+        result.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        """Forget all completed results."""
+        with self._lock:
+            self._results.clear()
@@ -0,0 +1,49 @@
+"""
+Teams of the crawled competitions (league crawl mode).
+
+In league crawl mode the source follows competitions instead of a fixed list
+of teams: the teams are discovered with one ``teams?league=&season=`` call per
+competition. Within a source run that call is made once and shared
+(coalesced) by every resource that needs it.
+"""
+from typing import Any
+from .client import APIFootballClient, APIRequest
+
+
+def league_team_requests(league_ids: list[int], season: int) -> list[APIRequest]:
+    """
+    Requests returning the teams (with their venue) of every competition.
+
+    Args:
+        league_ids: List of league IDs
+        season: Season year
+
+    Returns:
+        One ``teams?league=&season=`` request per competition
+    """
+    return [("teams", {"league": league_id, "season": season}) for league_id in league_ids]
+
+
+def discover_team_ids(client: APIFootballClient, league_ids: list[int], season: int) -> list[int]:
+    """
+    Ids of the teams playing in ``league_ids`` in ``season``.
+
+    A team playing several of the competitions (e.g. a league and a cup) is
+    listed once.
+
+    Args:
+        client: API Football client
+        league_ids: List of league IDs
+        season: Season year
+
+    Returns:
+        Sorted team IDs
+    """
+    team_ids: set[int] = set()
+    for _, _, response in client.get_many(league_team_requests(league_ids, season)):
+        team_ids.update(_team_id(item) for item in response if _team_id(item) is not None)
+    return sorted(team_ids)
+
+
+def _team_id(item: dict[str, Any]) -> Any:
+    return item.get("team", {}).get("id")
@@ -0,0 +1,169 @@
+"""
+Request and item metrics collected during an API Football source run.
+"""
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Pseudo status of a request served from the response cache without calling the API
+CACHE_HIT = "cache"
+
+
+@dataclass
+class EndpointStats:
+    """Requests sent to one endpoint."""
+
+    requests: int = 0
+    bytes: int = 0
+    statuses: Counter[str] = field(default_factory=Counter)
+    latencies: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "statuses": dict(self.statuses),
+            "bytes": self.bytes,
+            "total_s": round(sum(latencies), 3),
+            "mean_ms": round(1000 * sum(latencies) / len(latencies), 1) if latencies else None,
+            "p95_ms": round(1000 * latencies[int(0.95 * (len(latencies) - 1))], 1) if latencies else None,
+            "max_ms": round(1000 * latencies[-1], 1) if latencies else None,
+        }
+
+
+@dataclass
+class ResourceStats:
+    """Activity of one dlt resource."""
+
+    items: int = 0
+    requests: int = 0
+    coalesced_requests: int = 0
+    cache_hits: int = 0
+    rows_changed: int = 0
+    rows_skipped: int = 0
+    started_at: Optional[float] = None
+    last_item_at: Optional[float] = None
+
+    def summary(self) -> dict[str, Any]:
+        active = None
+        if self.started_at is not None and self.last_item_at is not None:
+            active = self.last_item_at - self.started_at
+        return {
+            "items": self.items,
+            "requests": self.requests,
+            "coalesced_requests": self.coalesced_requests,
+            "cache_hits": self.cache_hits,
+            "rows_changed": self.rows_changed,
+            "rows_skipped": self.rows_skipped,
+            "active_s": round(active, 3) if active is not None else None,
+            "items_per_s": round(self.items / active, 1) if active else None,
+        }
+
+
+class RequestMetrics:
+    """Thread-safe collector of what a source run asked from the API.
+
+    The client records every HTTP response (latency, status, bytes), every
+    response served from the cache and every request coalesced with an
+    identical one. Resources count the items they yield through ``count_items``,
+    and the rows found changed or skipped as unchanged through ``record_changes``.
+    """
+
+    def __init__(self) -> None:
+        self._endpoints: dict[str, EndpointStats] = {}
+        self._resources: dict[str, ResourceStats] = {}
+        self._lock = threading.Lock()
+
+    def record_request(
+        self,
+        endpoint: str,
+        status: int | str,
+        seconds: float,
+        size: int,
+        resource: Optional[str],
+    ) -> None:
+        """
+        Record one request.
+
+        Args:
+            endpoint: API endpoint (e.g., "teams")
+            status: HTTP status, or CACHE_HIT when the API was not called
+            seconds: Time spent waiting for the response
+            size: Response body size in bytes
+            resource: dlt resource the request was made for
+        """
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.bytes += size
+            stats.statuses[str(status)] += 1
+            stats.latencies.append(seconds)
+
+            # The resource started waiting when the request was sent
+            resource_stats = self._resource(resource, started_at=time.monotonic() - seconds)
+            if status == CACHE_HIT:
+                resource_stats.cache_hits += 1
+            else:
+                resource_stats.requests += 1
+
+    def record_coalesced(self, resource: Optional[str]) -> None:
+        """Record a request answered by an identical request of the same run."""
+        with self._lock:
+            self._resource(resource).coalesced_requests += 1
+
+    def record_changes(self, resource: Optional[str], changed: int, skipped: int) -> None:
+        """
+        Record rows compared with their last loaded version.
+
+        Args:
+            resource: dlt resource name
+            changed: Rows that are new or whose content changed
+            skipped: Unchanged rows not written again
+        """
+        with self._lock:
+            stats = self._resource(resource)
+            stats.rows_changed += changed
+            stats.rows_skipped += skipped
+
+    def count_items(self, resource: str) -> Callable[[T], T]:
+        """
+        Map function counting the items yielded by ``resource``.
+
+        Args:
+            resource: dlt resource name
+
+        Returns:
+            Function for ``DltResource.add_map`` returning items unchanged
+        """
+
+        def count(item: T) -> T:
+            now = time.monotonic()
+            with self._lock:
+                stats = self._resource(resource)
+                stats.items += 1
+                stats.last_item_at = now
+            return item
+
+        return count
+
+    def endpoints(self) -> dict[str, dict[str, Any]]:
+        """Summary of the requests made to each endpoint, slowest (total time) first."""
+        with self._lock:
+            summaries = {endpoint: stats.summary() for endpoint, stats in self._endpoints.items()}
+        return dict(sorted(summaries.items(), key=lambda item: item[1]["total_s"], reverse=True))
+
+    def resources(self) -> dict[str, dict[str, Any]]:
+        """Summary of the items and requests of each resource."""
+        with self._lock:
+            return {resource: stats.summary() for resource, stats in self._resources.items()}
+
+    def _resource(self, resource: Optional[str], started_at: Optional[float] = None) -> ResourceStats:
+        """Stats of a resource, started on first use (caller holds the lock)."""
+        stats = self._resources.get(resource or "unknown")
+        if stats is None:
+            stats = self._resources[resource or "unknown"] = ResourceStats(started_at=started_at or time.monotonic())
+        return stats
@@ -0,0 +1,183 @@
+"""
+Quota-aware rate limiting for API Football requests.
+
+API Football enforces a per-minute limit and a daily quota and reports both on
+every response:
+
+- ``X-RateLimit-Limit`` / ``X-RateLimit-Remaining``: requests per minute
+- ``x-ratelimit-requests-limit`` / ``x-ratelimit-requests-remaining``: requests per day
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter
+from typing import Any, Mapping, Optional
+
+
+class QuotaExhaustedError(Exception):
+    """Raised when the daily API Football quota has been used up."""
+
+
+# Lower value is served first when several requests wait for a token
+PRIORITY_LIVE = 0
+PRIORITY_FIXTURES = 1
+PRIORITY_TEAMS = 2
+PRIORITY_REFERENCE = 3
+
+ENDPOINT_PRIORITIES = {
+    "fixtures": PRIORITY_FIXTURES,
+    "players": PRIORITY_TEAMS,
+    "players/squads": PRIORITY_TEAMS,
+    "teams": PRIORITY_TEAMS,
+    "teams/seasons": PRIORITY_REFERENCE,
+    "leagues": PRIORITY_REFERENCE,
+    "countries": PRIORITY_REFERENCE,
+}
+
+
+def request_priority(endpoint: str, params: Mapping[str, Any]) -> int:
+    """
+    Get the scheduling priority of a request.
+
+    Args:
+        endpoint: API endpoint (e.g., "fixtures", "countries")
+        params: Query parameters
+
+    Returns:
+        Priority, lower is more urgent (live fixtures first, reference data last)
+    """
+    if endpoint == "fixtures" and params.get("live"):
+        return PRIORITY_LIVE
+    return ENDPOINT_PRIORITIES.get(endpoint, PRIORITY_TEAMS)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """Thread-safe token bucket with priority ordering and daily quota accounting.
+
+    The bucket holds up to ``requests_per_minute`` tokens and refills
+    continuously. Limits start from the configured values and are then kept in
+    sync with the rate-limit headers of every response, so the limiter runs as
+    close to the plan's limit as the server allows without going over it.
+    """
+
+    def __init__(self, requests_per_minute: int = 10, daily_limit: Optional[int] = None):
+        self.requests_per_minute = max(1, requests_per_minute)
+        self.daily_limit = daily_limit
+        self.daily_remaining = daily_limit
+        # Requests (including retries) charged to each dlt resource
+        self.usage: Counter[str] = Counter()
+        self._tokens = float(self.requests_per_minute)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def acquire(self, priority: int = PRIORITY_TEAMS, resource: Optional[str] = None) -> None:
+        """
+        Block until a request may be sent.
+
+        Waiting requests are served by priority, then in arrival order.
+
+        Args:
+            priority: Request priority (see ``request_priority``)
+            resource: Name of the dlt resource the request is charged to
+
+        Raises:
+            QuotaExhaustedError: If the daily quota is used up
+        """
+        with self._condition:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    if self.daily_remaining is not None and self.daily_remaining <= 0:
+                        raise QuotaExhaustedError(
+                            f"Daily API Football quota of {self.daily_limit} requests is used up"
+                        )
+                    if self._waiters[0] == ticket:
+                        delay = self._delay()
+                        if delay <= 0:
+                            break
+                    else:
+                        delay = None
+                    self._condition.wait(timeout=delay)
+            except BaseException:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+                raise
+
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            if self.daily_remaining is not None:
+                self.daily_remaining -= 1
+            self.usage[resource or "unknown"] += 1
+            self._condition.notify_all()
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Synchronize limits with the rate-limit headers of a response.
+
+        Args:
+            headers: Response headers (case-insensitive mapping)
+        """
+        minute_limit = _header_int(headers, "X-RateLimit-Limit")
+        minute_remaining = _header_int(headers, "X-RateLimit-Remaining")
+        daily_limit = _header_int(headers, "x-ratelimit-requests-limit")
+        daily_remaining = _header_int(headers, "x-ratelimit-requests-remaining")
+
+        with self._condition:
+            self._refill()
+            if minute_limit and minute_limit != self.requests_per_minute:
+                # Plan differs from the configured default: grow or shrink the bucket
+                self._tokens = max(0.0, self._tokens + minute_limit - self.requests_per_minute)
+                self.requests_per_minute = minute_limit
+            if minute_remaining is not None:
+                self._tokens = min(self._tokens, float(minute_remaining))
+            if daily_limit:
+                self.daily_limit = daily_limit
+            if daily_remaining is not None:
+                self.daily_remaining = daily_remaining
+            self._condition.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for a while, e.g. after a 429 response.
+
+        Args:
+            seconds: Pause duration
+        """
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            # Resume with a single token once the pause is over
+            self._tokens = 1.0
+            self._refilled_at = self._paused_until
+            self._condition.notify_all()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now <= self._refilled_at:
+            return
+        rate = self.requests_per_minute / 60.0
+        self._tokens = min(float(self.requests_per_minute), self._tokens + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+
+    def _delay(self) -> float:
+        """Seconds until the next token is available (0 if one is available now)."""
+        self._refill()
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) * 60.0 / self.requests_per_minute
@@ -3,29 +3,35 @@ Raw countries resource - stores complete JSON response from API Football.
 """
 import dlt
 from typing import Iterator, Any
+from .changes import ChangeDetector
 from .client import APIFootballClient
 
 
 @dlt.resource(
     name="raw_countries",
-    write_disposition="replace",
+    write_disposition="merge",
+    primary_key="country_name",  # the "World" pseudo-country has no code
     columns={"data": {"data_type": "json"}}
 )
-def raw_countries_resource(client: APIFootballClient) -> Iterator[dict[str, Any]]:
+def raw_countries_resource(client: APIFootballClient, skip_unchanged: bool = True) -> Iterator[dict[str, Any]]:
     """
     Fetch all countries from API Football and store as raw JSON.
     
     Args:
         client: API Football client
+        skip_unchanged: Only write countries whose JSON changed since the last load
         
     Yields:
         Raw country data with JSON stored in 'data' column
     """
+    changes = ChangeDetector(client.metrics, key=["country_name"], skip_unchanged=skip_unchanged)
     response = client.get("countries", {})
     
-    for item in response:
-        yield {
+    yield from changes.filter(
+        {
             "country_code": item.get("code"),
             "country_name": item.get("name"),
             "data": item,  # Store complete JSON
         }
+        for item in response
+    )
@@ -0,0 +1,310 @@
+"""
+Raw fixture details resources - events, lineups and statistics of the stored fixtures from API Football.
+
+Details are only returned when fixtures are requested by id, so the stored
+fixtures are fetched again in batches of ``MAX_IDS_PER_REQUEST`` ids
+(``fixtures?ids=``) by ``fixture_details_resource``, and each nested array of
+the payloads is written to its own child table by a transformer:
+- raw_fixture_events: goals, cards, substitutions and VAR decisions
+- raw_fixture_lineups: formation, coach, starting XI and substitutes of each team
+- raw_fixture_statistics: team statistics (shots, possession, ...)
+- raw_fixture_players: statistics of every player who took part
+"""
+import time
+import dlt
+from typing import Iterator, Any
+from dlt.destinations.exceptions import DatabaseUndefinedRelation
+from .changes import ChangeDetector
+from .client import APIFootballClient, APIRequest
+from .raw_fixtures import FINAL_STATUSES, MAX_IDS_PER_REQUEST, NOT_STARTED_STATUSES
+
+# Lineups are published up to an hour before kickoff
+LINEUPS_LEAD_MINUTES = 60
+
+# Hours after kickoff before the details of a final fixture are settled:
+# statistics, player ratings and lineups are still amended after the final whistle
+DETAILS_SETTLE_HOURS = 24
+
+# Statuses of a fixture that was not played at its kickoff: it has no details
+# until it is rescheduled, with a new fixture_date
+UNPLAYED_STATUSES = NOT_STARTED_STATUSES | {"PST"}
+
+
+def _stored_fixture_ids(
+    season: int,
+    team_ids: list[int],
+    lead_minutes: int,
+    league_ids: list[int] | None = None,
+) -> list[int]:
+    """
+    Ids of the stored fixtures of ``team_ids`` (or ``league_ids``) in ``season`` that started or kick off within ``lead_minutes``.
+
+    Read from ``raw_fixtures`` in the destination of the running pipeline
+    (home or away team, whichever followed team the row was loaded for).
+    Fixtures still postponed (or not started) ``DETAILS_SETTLE_HOURS`` after
+    their kickoff are left out until they are rescheduled.
+    """
+    if league_ids:
+        scope = "(data -> 'league' ->> 'id')::bigint = any(%s)"
+        scope_args: tuple[Any, ...] = (league_ids,)
+    else:
+        scope = """((data -> 'teams' -> 'home' ->> 'id')::bigint = any(%s)
+                       or (data -> 'teams' -> 'away' ->> 'id')::bigint = any(%s))"""
+        scope_args = (team_ids, team_ids)
+
+    with dlt.current.pipeline().sql_client() as sql_client:
+        try:
+            rows = sql_client.execute_sql(
+                f"""
+                select fixture_id
+                from {sql_client.make_qualified_table_name("raw_fixtures")}
+                where season = %s
+                  and fixture_date <= now() + make_interval(mins => %s)
+                  and not (status = any(%s) and fixture_date < now() - make_interval(hours => %s))
+                  and {scope}
+                order by fixture_id
+                """,
+                season,
+                lead_minutes,
+                sorted(UNPLAYED_STATUSES),
+                DETAILS_SETTLE_HOURS,
+                *scope_args,
+            )
+        except DatabaseUndefinedRelation:
+            # Fixtures not loaded yet
+            return []
+    return [fixture_id for (fixture_id,) in rows or []]
+
+
+def _frozen_seasons() -> set[int]:
+    """Seasons frozen in the destination of the running pipeline (never loaded again)."""
+    with dlt.current.pipeline().sql_client() as sql_client:
+        try:
+            rows = sql_client.execute_sql(
+                f"select season from {sql_client.make_qualified_table_name('frozen_seasons')}"
+            )
+        except DatabaseUndefinedRelation:
+            return set()
+    return {season for (season,) in rows or []}
+
+
+@dlt.resource(name="fixture_details", selected=False)
+def fixture_details_resource(
+    client: APIFootballClient,
+    season: int,
+    team_ids: list[int],
+    league_ids: list[int] | None = None,
+    lead_minutes: int = LINEUPS_LEAD_MINUTES,
+) -> Iterator[dict[str, Any]]:
+    """
+    Fetch the details of the stored fixtures of ``team_ids`` (or ``league_ids``) in ``season``.
+
+    One ``fixtures?ids=`` call returns the details of up to
+    ``MAX_IDS_PER_REQUEST`` fixtures, instead of one call per fixture and
+    detail endpoint (``fixtures/events``, ``fixtures/lineups``, ...).
+    Fixtures that were final and had kicked off ``DETAILS_SETTLE_HOURS`` ago
+    when their details were loaded are remembered in the resource state
+    (``complete_fixtures``, by season) and never requested again. Seasons
+    frozen since are dropped from the state. Postponed fixtures are no
+    longer requested once their kickoff is ``DETAILS_SETTLE_HOURS`` past,
+    until they are rescheduled.
+
+    Not loaded itself: the ``raw_fixture_*`` transformers split its payloads
+    into child tables.
+
+    Args:
+        client: API Football client
+        season: Season year
+        team_ids: List of team IDs (e.g., [2184, 6654]), ignored with ``league_ids``
+        league_ids: List of league IDs whose fixtures are fetched instead (league crawl mode)
+        lead_minutes: Minutes before kickoff from which a fixture's details
+            (lineups) are fetched
+
+    Yields:
+        Fixture payloads with their "events", "lineups", "statistics" and "players" arrays
+    """
+    state = dlt.current.resource_state()
+    # fixture ids (as strings, JSON keys) whose settled details are stored, by season
+    complete_fixtures: dict[str, dict[str, bool]] = state.setdefault("complete_fixtures", {})
+    frozen = _frozen_seasons()
+    for key in list(complete_fixtures):
+        # Fixture ids kept before seasons were tracked may have been marked before their details settled
+        if not isinstance(complete_fixtures[key], dict) or int(key) in frozen:
+            del complete_fixtures[key]
+    complete = complete_fixtures.setdefault(str(season), {})
+
+    fixture_ids = [
+        str(fixture_id)
+        for fixture_id in _stored_fixture_ids(season, team_ids, lead_minutes, league_ids)
+        if str(fixture_id) not in complete
+    ]
+    requests: list[APIRequest] = [
+        ("fixtures", {"ids": "-".join(fixture_ids[i:i + MAX_IDS_PER_REQUEST])})
+        for i in range(0, len(fixture_ids), MAX_IDS_PER_REQUEST)
+    ]
+
+    settled_before = time.time() - DETAILS_SETTLE_HOURS * 3600
+    for _, _, response in client.get_many(requests):
+        for item in response:
+            fixture = item.get("fixture", {})
+            if (
+                fixture.get("status", {}).get("short") in FINAL_STATUSES
+                and (fixture.get("timestamp") or settled_before) <= settled_before
+            ):
+                complete[str(fixture.get("id"))] = True
+            yield item
+
+
+def _team_id(entry: dict[str, Any]) -> Any:
+    return entry.get("team", {}).get("id")
+
+
+@dlt.transformer(
+    name="raw_fixture_events",
+    write_disposition="merge",
+    primary_key=["fixture_id", "event_index"],
+    merge_key="fixture_id",  # a fixture load replaces all its events (VAR can cancel one)
+    columns={"data": {"data_type": "json"}}
+)
+def raw_fixture_events_resource(
+    item: dict[str, Any],
+    client: APIFootballClient,
+    skip_unchanged: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """
+    Split the events of a fixture payload into rows.
+
+    Args:
+        item: Fixture payload from ``fixture_details_resource``
+        client: API Football client
+        skip_unchanged: Skip fixtures whose events did not change since the last load
+
+    Yields:
+        Raw event data with JSON stored in 'data' column
+    """
+    changes = ChangeDetector(client.metrics, key=["event_index"], skip_unchanged=skip_unchanged)
+    fixture_id = item.get("fixture", {}).get("id")
+    rows = [
+        {
+            "fixture_id": fixture_id,
+            "event_index": index,  # events have no id, their order is stable
+            "team_id": _team_id(event),
+            "player_id": event.get("player", {}).get("id"),
+            "elapsed": event.get("time", {}).get("elapsed"),
+            "event_type": event.get("type"),
+            "data": event,  # Store complete event JSON
+        }
+        for index, event in enumerate(item.get("events") or [])
+    ]
+    yield from changes.filter_group(fixture_id, rows)
+
+
+@dlt.transformer(
+    name="raw_fixture_lineups",
+    write_disposition="merge",
+    primary_key=["fixture_id", "team_id"],
+    merge_key="fixture_id",
+    columns={"data": {"data_type": "json"}}
+)
+def raw_fixture_lineups_resource(
+    item: dict[str, Any],
+    client: APIFootballClient,
+    skip_unchanged: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """
+    Split the lineups of a fixture payload into one row per team.
+
+    Args:
+        item: Fixture payload from ``fixture_details_resource``
+        client: API Football client
+        skip_unchanged: Skip fixtures whose lineups did not change since the last load
+
+    Yields:
+        Raw lineup data with JSON stored in 'data' column
+    """
+    changes = ChangeDetector(client.metrics, key=["team_id"], skip_unchanged=skip_unchanged)
+    fixture_id = item.get("fixture", {}).get("id")
+    rows = [
+        {
+            "fixture_id": fixture_id,
+            "team_id": _team_id(lineup),
+            "formation": lineup.get("formation"),
+            "data": lineup,  # Store complete lineup JSON (coach, startXI, substitutes)
+        }
+        for lineup in item.get("lineups") or []
+    ]
+    yield from changes.filter_group(fixture_id, rows)
+
+
+@dlt.transformer(
+    name="raw_fixture_statistics",
+    write_disposition="merge",
+    primary_key=["fixture_id", "team_id"],
+    merge_key="fixture_id",
+    columns={"data": {"data_type": "json"}}
+)
+def raw_fixture_statistics_resource(
+    item: dict[str, Any],
+    client: APIFootballClient,
+    skip_unchanged: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """
+    Split the team statistics of a fixture payload into one row per team.
+
+    Args:
+        item: Fixture payload from ``fixture_details_resource``
+        client: API Football client
+        skip_unchanged: Skip fixtures whose statistics did not change since the last load
+
+    Yields:
+        Raw team statistics with JSON stored in 'data' column
+    """
+    changes = ChangeDetector(client.metrics, key=["team_id"], skip_unchanged=skip_unchanged)
+    fixture_id = item.get("fixture", {}).get("id")
+    rows = [
+        {
+            "fixture_id": fixture_id,
+            "team_id": _team_id(statistics),
+            "data": statistics,  # Store complete statistics JSON (list of type/value)
+        }
+        for statistics in item.get("statistics") or []
+    ]
+    yield from changes.filter_group(fixture_id, rows)
+
+
+@dlt.transformer(
+    name="raw_fixture_players",
+    write_disposition="merge",
+    primary_key=["fixture_id", "player_id"],
+    merge_key="fixture_id",
+    columns={"data": {"data_type": "json"}}
+)
+def raw_fixture_players_resource(
+    item: dict[str, Any],
+    client: APIFootballClient,
+    skip_unchanged: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """
+    Split the player statistics of a fixture payload into one row per player.
+
+    Args:
+        item: Fixture payload from ``fixture_details_resource``
+        client: API Football client
+        skip_unchanged: Skip fixtures whose player statistics did not change since the last load
+
+    Yields:
+        Raw player statistics with JSON stored in 'data' column
+    """
+    changes = ChangeDetector(client.metrics, key=["player_id"], skip_unchanged=skip_unchanged)
+    fixture_id = item.get("fixture", {}).get("id")
+    rows = [
+        {
+            "fixture_id": fixture_id,
+            "player_id": player.get("player", {}).get("id"),
+            "team_id": _team_id(team),
+            "data": player,  # Store complete player JSON (player + statistics)
+        }
+        for team in item.get("players") or []
+        for player in team.get("players") or []
+    ]
+    yield from changes.filter_group(fixture_id, rows)
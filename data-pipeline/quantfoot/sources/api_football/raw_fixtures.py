@@ -2,44 +2,161 @@
 Raw fixtures resource - stores complete JSON response for Servette FC fixtures from API Football.
 """
 import dlt
+from datetime import date, timedelta
 from typing import Iterator, Any
-from .client import APIFootballClient
+from .changes import ChangeDetector
+from .client import APIFootballClient, APIRequest
+
+# Statuses after which a fixture no longer changes
+FINAL_STATUSES = {"FT", "AET", "PEN", "CANC", "ABD", "AWD", "WO"}
+
+# Statuses of a fixture that has not kicked off yet (and is not postponed)
+NOT_STARTED_STATUSES = {"TBD", "NS"}
+
+# API Football accepts at most 20 ids per "fixtures?ids=" call
+MAX_IDS_PER_REQUEST = 20
 
 
 @dlt.resource(
     name="raw_fixtures",
     write_disposition="merge",
     primary_key="fixture_id",
-    columns={"data": {"data_type": "json"}}
+    # team_id is always null in league crawl mode, declared so the column exists
+    columns={"data": {"data_type": "json"}, "team_id": {"data_type": "bigint", "nullable": True}}
 )
 def raw_fixtures_resource(
     client: APIFootballClient,
     season: int,
-    team_ids: list[int]
+    team_ids: list[int],
+    league_ids: list[int] | None = None,
+    backfill: bool = False,
+    window_days: int = 3,
+    skip_unchanged: bool = True,
 ) -> Iterator[dict[str, Any]]:
     """
-    Fetch all fixtures (with history) for multiple teams in a season and store as raw JSON.
-    
+    Fetch fixtures for multiple teams in a season and store as raw JSON.
+
+    In league crawl mode (``league_ids``), the fixtures of every team of the
+    competitions come from one ``fixtures?league=&season=`` call per
+    competition instead of one ``fixtures?team=&season=`` call per team, so
+    requests grow with the competitions, not the teams, and a match between
+    two followed teams is downloaded once. Their ``team_id`` is left empty.
+
+    The first run for a team (or competition) and season (or any run with
+    ``backfill``) loads the whole season. Later runs are incremental: the
+    resource state remembers the open fixtures (started, postponed or
+    suspended, or kicking off within ``window_days`` of today), and only
+    those (``fixtures?ids=``) plus the fixtures within ``window_days`` of today
+    (``from``/``to``) are fetched again. Later fixtures are not tracked: the
+    window picks them up as their kickoff gets near. A fixture returned by
+    several requests is kept once, in memory, and only the fixtures whose
+    JSON changed since their last load are written.
+
+    Once the ``fixtures?ids=`` batches of the open fixtures would take at
+    least as many requests as the full seasons of the teams or competitions
+    (one call each), the full seasons are fetched instead, and only the open
+    fixtures they did not return (other teams, competitions or seasons) are
+    fetched by id.
+
     Args:
         client: API Football client
         season: Season year
-        team_ids: List of team IDs (e.g., [2184, 6654])
-        
+        team_ids: List of team IDs (e.g., [2184, 6654]), ignored with ``league_ids``
+        league_ids: List of league IDs crawled instead of ``team_ids``
+        backfill: Reload the full season for every team or competition
+        window_days: Days before and after today re-fetched on incremental runs
+        skip_unchanged: Only write fixtures whose JSON changed since the last load
+
     Yields:
         Raw fixture data with JSON stored in 'data' column
     """
-    for team_id in team_ids:
-        params = {"team": team_id, "season": season}
-        response = client.get("fixtures", params)
-        
+    changes = ChangeDetector(client.metrics, key=["fixture_id"], skip_unchanged=skip_unchanged)
+    state = dlt.current.resource_state()
+    # fixture_id -> team_id of fixtures that may still change (JSON keys are strings)
+    open_fixtures: dict[str, int | None] = state.setdefault("open_fixtures", {})
+    # Teams (or competitions) whose full season was loaded
+    if league_ids:
+        scope, scope_ids = "league", league_ids
+        loaded: list[int] = state.setdefault("loaded_league_seasons", {}).setdefault(str(season), [])
+    else:
+        scope, scope_ids = "team", team_ids
+        loaded = state.setdefault("loaded_seasons", {}).setdefault(str(season), [])
+
+    today = date.today()
+    window = {
+        "from": (today - timedelta(days=window_days)).isoformat(),
+        "to": (today + timedelta(days=window_days)).isoformat(),
+    }
+
+    open_ids = [] if backfill else list(open_fixtures)
+    id_batches = -(-len(open_ids) // MAX_IDS_PER_REQUEST)
+    # A full season is one request, and returns the open fixtures of the team or competition
+    full_seasons = id_batches >= len(scope_ids)
+
+    requests: list[APIRequest] = []
+    for scope_id in scope_ids:
+        params: dict[str, Any] = {scope: scope_id, "season": season}
+        if scope_id in loaded and not backfill and not full_seasons:
+            params.update(window)
+        requests.append(("fixtures", params))
+
+    seen: set[int] = set()
+
+    if full_seasons:
+        yield from _fixtures(client.get_many(requests), season, window, open_fixtures, seen, changes)
+        # Open fixtures the full seasons did not return
+        open_ids = [fixture_id for fixture_id in open_ids if int(fixture_id) not in seen]
+        requests = []
+    requests.extend(_ids_requests(open_ids))
+    yield from _fixtures(client.get_many(requests), season, window, open_fixtures, seen, changes)
+
+    for scope_id in scope_ids:
+        if scope_id not in loaded:
+            loaded.append(scope_id)
+
+
+def _ids_requests(fixture_ids: list[str]) -> list[APIRequest]:
+    """``fixtures?ids=`` requests of fixtures, ``MAX_IDS_PER_REQUEST`` per call."""
+    return [
+        ("fixtures", {"ids": "-".join(fixture_ids[i:i + MAX_IDS_PER_REQUEST])})
+        for i in range(0, len(fixture_ids), MAX_IDS_PER_REQUEST)
+    ]
+
+
+def _fixtures(
+    responses: Iterator[tuple[str, dict[str, Any], list[dict[str, Any]]]],
+    season: int,
+    window: dict[str, str],
+    open_fixtures: dict[str, int | None],
+    seen: set[int],
+    changes: ChangeDetector,
+) -> Iterator[dict[str, Any]]:
+    """Rows of the fixtures of ``responses`` not in ``seen`` yet, tracking the open ones."""
+    for _, params, response in responses:
         for item in response:
             fixture = item.get("fixture", {})
-            
-            yield {
-                "fixture_id": fixture.get("id"),
+            fixture_id = fixture.get("id")
+            status = fixture.get("status", {}).get("short")
+
+            # The same fixture comes back from the window and the ids requests
+            if fixture_id in seen:
+                continue
+            seen.add(fixture_id)
+
+            team_id = params.get("team", open_fixtures.get(str(fixture_id)))
+            kickoff = (fixture.get("date") or "")[:10]
+            if status in FINAL_STATUSES or (
+                status in NOT_STARTED_STATUSES and not window["from"] <= kickoff <= window["to"]
+            ):
+                open_fixtures.pop(str(fixture_id), None)
+            else:
+                open_fixtures[str(fixture_id)] = team_id
+
+            yield from changes.filter([{
+                "fixture_id": fixture_id,
                 "fixture_date": fixture.get("date"),
                 "team_id": team_id,
-                "season": season,
-                "status": fixture.get("status", {}).get("short"),
+                "season": item.get("league", {}).get("season") or season,
+                "status": status,
                 "data": item,  # Store complete JSON (fixture + teams + score + league, etc.)
-            }
\ No newline at end of file
+            }])
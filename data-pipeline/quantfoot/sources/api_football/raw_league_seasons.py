@@ -0,0 +1,46 @@
+"""
+Raw league seasons resource - stores one row per league season from API Football.
+"""
+import dlt
+from typing import Iterator, Any
+from .changes import ChangeDetector
+from .client import APIFootballClient
+
+
+@dlt.resource(
+    name="raw_league_seasons",
+    write_disposition="merge",
+    primary_key=["league_id", "season"],
+    columns={"data": {"data_type": "json"}}
+)
+def raw_league_seasons_resource(client: APIFootballClient, skip_unchanged: bool = True) -> Iterator[dict[str, Any]]:
+    """
+    Fetch the seasons of every league and store them as raw JSON.
+    
+    Uses the same "leagues" response as raw_leagues (the request is only sent once per run).
+    
+    Args:
+        client: API Football client
+        skip_unchanged: Only write seasons whose JSON changed since the last load
+        
+    Yields:
+        Raw season data (dates, current flag, coverage) with JSON stored in 'data' column
+    """
+    changes = ChangeDetector(client.metrics, key=["league_id", "season"], skip_unchanged=skip_unchanged)
+    response = client.get("leagues", {})
+    
+    def rows() -> Iterator[dict[str, Any]]:
+        for item in response:
+            league_id = item.get("league", {}).get("id")
+            
+            for season in item.get("seasons", []):
+                yield {
+                    "league_id": league_id,
+                    "season": season.get("year"),
+                    "season_start": season.get("start"),
+                    "season_end": season.get("end"),
+                    "is_current": season.get("current"),
+                    "data": season,  # Store complete season JSON including coverage
+                }
+    
+    yield from changes.filter(rows())
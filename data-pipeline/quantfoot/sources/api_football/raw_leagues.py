@@ -1,39 +1,43 @@
 """
-Raw leagues resource - stores complete JSON response for all leagues/seasons from API Football.
+Raw leagues resource - stores one row per league (league + country JSON) from API Football.
+Seasons are stored separately in raw_league_seasons.
 """
 import dlt
 from typing import Iterator, Any
+from .changes import ChangeDetector
 from .client import APIFootballClient
 
 
 @dlt.resource(
     name="raw_leagues",
-    write_disposition="replace",
+    write_disposition="merge",
+    primary_key="league_id",
     columns={"data": {"data_type": "json"}}
 )
-def raw_leagues_resource(client: APIFootballClient) -> Iterator[dict[str, Any]]:
+def raw_leagues_resource(client: APIFootballClient, skip_unchanged: bool = True) -> Iterator[dict[str, Any]]:
     """
-    Fetch all leagues and their seasons from API Football and store as raw JSON.
+    Fetch all leagues from API Football and store as raw JSON.
     
     Args:
         client: API Football client
+        skip_unchanged: Only write leagues whose JSON changed since the last load
         
     Yields:
-        Raw league data with JSON stored in 'data' column
+        Raw league data with league and country JSON stored in 'data' column
     """
+    changes = ChangeDetector(client.metrics, key=["league_id"], skip_unchanged=skip_unchanged)
     response = client.get("leagues", {})
     
-    for item in response:
-        league = item.get("league", {})
-        country = item.get("country", {})
-        seasons = item.get("seasons", [])
-        
-        # Store each league-season combination
-        for season in seasons:
+    def rows() -> Iterator[dict[str, Any]]:
+        for item in response:
+            league = item.get("league", {})
+            country = item.get("country", {})
+            
             yield {
                 "league_id": league.get("id"),
                 "league_name": league.get("name"),
                 "country_name": country.get("name"),
-                "season": season.get("year"),
-                "data": item,  # Store complete JSON including all seasons
+                "data": {"league": league, "country": country},  # Seasons live in raw_league_seasons
             }
+    
+    yield from changes.filter(rows())
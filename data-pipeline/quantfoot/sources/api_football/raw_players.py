@@ -3,42 +3,58 @@ Raw players resource - stores player squad information for Servette FC from API
 """
 import dlt
 from typing import Iterator, Any
+from .changes import ChangeDetector
 from .client import APIFootballClient
+from .league_teams import discover_team_ids
 
 
 @dlt.resource(
     name="raw_players",
-    write_disposition="replace",
+    write_disposition="merge",
+    primary_key=["player_id", "team_id"],
+    merge_key="team_id",  # a team load replaces all rows of that team
     columns={"data": {"data_type": "json"}}
 )
 def raw_players_resource(
     client: APIFootballClient,
-    team_ids: list[int]
+    team_ids: list[int],
+    league_ids: list[int] | None = None,
+    season: int | None = None,
+    skip_unchanged: bool = True,
 ) -> Iterator[dict[str, Any]]:
     """
     Fetch player squad for multiple teams and store as raw JSON.
     
     Args:
         client: API Football client
-        team_ids: List of team IDs (e.g., [2184, 6654])
+        team_ids: List of team IDs (e.g., [2184, 6654]), ignored with ``league_ids``
+        league_ids: List of league IDs whose teams are loaded instead of ``team_ids``
+        season: Season year of the competitions (league crawl mode)
+        skip_unchanged: Skip teams whose squad did not change since the last load
         
     Yields:
         Raw player data with JSON stored in 'data' column
     """
-    for team_id in team_ids:
-        params = {"team": team_id}
-        response = client.get("players/squads", params)
-        
+    changes = ChangeDetector(client.metrics, key=["player_id"], skip_unchanged=skip_unchanged)
+    if league_ids:
+        # Teams of the competitions (``teams?league=`` calls shared with raw_team_info)
+        team_ids = discover_team_ids(client, league_ids, season)
+    requests = (("players/squads", {"team": team_id}) for team_id in team_ids)
+    
+    for _, params, response in client.get_many(requests):
+        rows = []
         for item in response:
             team = item.get("team", {})
             players = item.get("players", [])
             
             for player in players:
-                yield {
+                rows.append({
                     "player_id": player.get("id"),
                     "player_name": player.get("name"),
                     "team_id": team.get("id"),
                     "position": player.get("position"),
                     "number": player.get("number"),
                     "data": player,  # Store complete player JSON
-                }
\ No newline at end of file
+                })
+        # The whole squad is replaced (merge_key), so it is written or skipped as one
+        yield from changes.filter_group(params["team"], rows)
\ No newline at end of file
@@ -3,40 +3,62 @@ Raw team info resource - stores complete JSON response for Servette FC from API
 """
 import dlt
 from typing import Iterator, Any
+from .changes import ChangeDetector
 from .client import APIFootballClient
+from .league_teams import league_team_requests
 
 
 @dlt.resource(
     name="raw_team_info",
-    write_disposition="replace",
+    write_disposition="merge",
+    primary_key="team_id",
     columns={"data": {"data_type": "json"}}
 )
 def raw_team_info_resource(
     client: APIFootballClient,
-    team_ids: list[int]
+    team_ids: list[int],
+    league_ids: list[int] | None = None,
+    season: int | None = None,
+    skip_unchanged: bool = True,
 ) -> Iterator[dict[str, Any]]:
     """
     Fetch team information for multiple teams and store as raw JSON.
+
+    In league crawl mode (``league_ids``), the teams of every competition in
+    ``season`` come from one ``teams?league=&season=`` call per competition
+    instead of one call per team; a team found in several competitions is
+    written once.
     
     Args:
         client: API Football client
-        team_ids: List of team IDs (e.g., [2184, 6654])
+        team_ids: List of team IDs (e.g., [2184, 6654]), ignored with ``league_ids``
+        league_ids: List of league IDs whose teams are loaded instead of ``team_ids``
+        season: Season year of the competitions (league crawl mode)
+        skip_unchanged: Only write teams whose JSON changed since the last load
         
     Yields:
         Raw team data with JSON stored in 'data' column
     """
-    for team_id in team_ids:
-        params = {"id": team_id}
-        response = client.get("teams", params)
-        
+    changes = ChangeDetector(client.metrics, key=["team_id"], skip_unchanged=skip_unchanged)
+    if league_ids:
+        requests = league_team_requests(league_ids, season)
+    else:
+        requests = [("teams", {"id": team_id}) for team_id in team_ids]
+    seen: set[int] = set()
+    
+    for _, _, response in client.get_many(requests):
         for item in response:
             team = item.get("team", {})
             venue = item.get("venue", {})
+
+            if team.get("id") in seen:
+                continue
+            seen.add(team.get("id"))
             
-            yield {
+            yield from changes.filter([{
                 "team_id": team.get("id"),
                 "team_name": team.get("name"),
                 "venue_id": venue.get("id"),
                 "venue_name": venue.get("name"),
                 "data": item,  # Store complete JSON (team + venue)
-            }
\ No newline at end of file
+            }])
\ No newline at end of file
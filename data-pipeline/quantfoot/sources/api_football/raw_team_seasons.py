@@ -3,36 +3,54 @@ Raw team seasons resource - stores seasons available for Servette FC from API Fo
 """
 import dlt
 from typing import Iterator, Any
+from .changes import ChangeDetector
 from .client import APIFootballClient
+from .league_teams import discover_team_ids
 
 
 @dlt.resource(
     name="raw_team_seasons",
-    write_disposition="replace",
+    write_disposition="merge",
+    primary_key=["team_id", "season"],
+    merge_key="team_id",  # a team load replaces all rows of that team
     columns={"data": {"data_type": "json"}}
 )
 def raw_team_seasons_resource(
     client: APIFootballClient,
-    team_ids: list[int]
+    team_ids: list[int],
+    league_ids: list[int] | None = None,
+    season: int | None = None,
+    skip_unchanged: bool = True,
 ) -> Iterator[dict[str, Any]]:
     """
     Fetch seasons available for multiple teams and store as raw JSON.
     
     Args:
         client: API Football client
-        team_ids: List of team IDs (e.g., [2184, 6654])
+        team_ids: List of team IDs (e.g., [2184, 6654]), ignored with ``league_ids``
+        league_ids: List of league IDs whose teams are loaded instead of ``team_ids``
+        season: Season year of the competitions (league crawl mode)
+        skip_unchanged: Skip teams whose seasons did not change since the last load
         
     Yields:
         Raw season data with JSON stored in 'data' column
     """
-    for team_id in team_ids:
-        params = {"team": team_id}
-        response = client.get("teams/seasons", params)
+    changes = ChangeDetector(client.metrics, key=["season"], skip_unchanged=skip_unchanged)
+    if league_ids:
+        # Teams of the competitions (``teams?league=`` calls shared with raw_team_info)
+        team_ids = discover_team_ids(client, league_ids, season)
+    requests = (("teams/seasons", {"team": team_id}) for team_id in team_ids)
+    
+    for _, params, response in client.get_many(requests):
+        team_id = params["team"]
         
         # Response is a simple array of years
-        for season_year in response:
-            yield {
+        rows = [
+            {
                 "team_id": team_id,
                 "season": season_year,
                 "data": {"team_id": team_id, "season": season_year},  # Store as JSON
-            }
\ No newline at end of file
+            }
+            for season_year in response
+        ]
+        yield from changes.filter_group(team_id, rows)
\ No newline at end of file
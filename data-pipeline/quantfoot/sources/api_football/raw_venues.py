@@ -4,40 +4,69 @@ Note: Venue info is already included in team info, but this provides dedicated a
 """
 import dlt
 from typing import Iterator, Any
+from .changes import ChangeDetector
 from .client import APIFootballClient
+from .league_teams import league_team_requests
 
 
 @dlt.resource(
     name="raw_venues",
-    write_disposition="replace",
+    write_disposition="merge",
+    primary_key=["venue_id", "team_id"],
+    merge_key="team_id",  # a team load replaces all rows of that team
     columns={"data": {"data_type": "json"}}
 )
 def raw_venues_resource(
     client: APIFootballClient,
-    team_ids: list[int]
+    team_ids: list[int],
+    league_ids: list[int] | None = None,
+    season: int | None = None,
+    skip_unchanged: bool = True,
 ) -> Iterator[dict[str, Any]]:
     """
     Fetch venue information for multiple teams and store as raw JSON.
+
+    In league crawl mode (``league_ids``), the venues of every team of the
+    competitions come with the ``teams?league=&season=`` calls (shared with
+    raw_team_info) instead of one call per team.
     
     Args:
         client: API Football client
-        team_ids: List of team IDs (e.g., [2184, 6654])
+        team_ids: List of team IDs (e.g., [2184, 6654]), ignored with ``league_ids``
+        league_ids: List of league IDs whose teams are loaded instead of ``team_ids``
+        season: Season year of the competitions (league crawl mode)
+        skip_unchanged: Skip teams whose venue did not change since the last load
         
     Yields:
         Raw venue data with JSON stored in 'data' column
     """
-    for team_id in team_ids:
-        # Get team info which includes venue
-        params = {"id": team_id}
-        response = client.get("teams", params)
-        
+    changes = ChangeDetector(client.metrics, key=["venue_id"], skip_unchanged=skip_unchanged)
+    # Get team info which includes venue (shared with raw_team_info, fetched once per run)
+    if league_ids:
+        requests = league_team_requests(league_ids, season)
+    else:
+        requests = [("teams", {"id": team_id}) for team_id in team_ids]
+    seen: set[int] = set()
+    
+    for _, params, response in client.get_many(requests):
+        # One team per response by id, every team of the competition by league
+        venues: dict[Any, list[dict[str, Any]]] = {params["id"]: []} if "id" in params else {}
         for item in response:
+            team_id = item.get("team", {}).get("id")
             venue = item.get("venue", {})
+            rows = venues.setdefault(team_id, [])
             
             if venue:
-                yield {
+                rows.append({
                     "venue_id": venue.get("id"),
                     "venue_name": venue.get("name"),
-                    "team_id": item.get("team", {}).get("id"),
+                    "team_id": team_id,
                     "data": venue,  # Store complete venue JSON
-                }
\ No newline at end of file
+                })
+
+        for team_id, rows in venues.items():
+            # A team found in several competitions is written once
+            if team_id in seen:
+                continue
+            seen.add(team_id)
+            yield from changes.filter_group(team_id, rows)
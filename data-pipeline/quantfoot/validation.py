@@ -0,0 +1,435 @@
+"""
+Single-pass data-quality validation of the raw tables and the marts.
+
+The row-level rules of a table (not null, ranges, accepted values, home team
+different from away team, orphan foreign keys, uniqueness) are compiled into
+one query: the table is scanned once, every rule is a boolean column of the
+scan, and one aggregate counts the violations of every rule and keeps the
+first few sample rows of each (a running count of the violations of each
+rule caps them, so only those rows are aggregated). A dbt schema test costs
+one query (one scan) per rule.
+
+Foreign keys are checked with a left join on the (small) referenced table;
+uniqueness with a window over the key in a full validation, and with a
+lookup of the key in the whole table when only new loads are validated
+(fixtures are unique per season: the lookup only reads one partition).
+
+With ``new_loads_only``, only the rows of the loads completed since the
+table was last validated (``_dlt_load_id`` of raw tables, ``source_load_id``
+of the marts, see ``quantfoot.loads``) are validated. The loads validated
+are recorded per table in ``raw.validation_watermarks``.
+
+The results are reported as Dagster asset checks (see
+``quantfoot.assets.validation``).
+
+Usage:
+    python -m quantfoot.validation                     # every table
+    python -m quantfoot.validation marts.fixtures --new-loads-only
+"""
+import argparse
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Optional
+
+import psycopg2.extensions
+from psycopg2 import sql
+
+from .loads import completed_loads
+from .postgres import connect
+from .publish import MARTS_SCHEMA
+from .seasons import RAW_SCHEMA
+
+# Sample rows kept per rule
+SAMPLE_SIZE = int(os.getenv("VALIDATION_SAMPLE_SIZE", "5"))
+
+# Asset checks validate the rows of the loads completed since the last check only, unless run with new_loads_only: false
+NEW_LOADS_ONLY = os.getenv("VALIDATION_NEW_LOADS_ONLY", "true").lower() == "true"
+
+# Loads validated so far, by table (see quantfoot.loads)
+WATERMARKS_TABLE = "validation_watermarks"
+
+FIXTURE_STATUSES = (
+    "TBD", "NS", "LIVE", "1H", "HT", "2H", "ET", "P", "FT", "AET", "PEN",
+    "BT", "SUSP", "INT", "PST", "CANC", "ABD", "AWD", "WO",
+)
+PLAYER_POSITIONS = ("Goalkeeper", "Defender", "Midfielder", "Attacker")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    A row-level rule.
+
+    ``violation`` is a SQL condition on the row (alias ``t``), true when the
+    row breaks the rule; ``join`` adds the table it needs to the scan.
+    """
+
+    name: str
+    description: str
+    violation: str
+    columns: tuple[str, ...] = ()
+    join: Optional[str] = None
+    # Key of a uniqueness rule, checked across the whole table
+    unique: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class TableRules:
+    """The rules of a table."""
+
+    schema: str
+    table: str
+    # Columns identifying the sample rows
+    key: tuple[str, ...]
+    # Load id column of the new_loads_only mode
+    load_column: str
+    rules: tuple[Rule, ...]
+
+    @property
+    def name(self) -> str:
+        return f"{self.schema}.{self.table}"
+
+
+@dataclass
+class RuleResult:
+    """Violations of a rule."""
+
+    rule: Rule
+    violations: int
+    samples: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return self.violations == 0
+
+
+@dataclass
+class TableValidation:
+    """Result of the validation of a table."""
+
+    table: TableRules
+    rows: int
+    seconds: float
+    new_loads_only: bool
+    # Loads validated in the new_loads_only mode
+    load_ids: list[str]
+    results: list[RuleResult]
+
+
+def not_null(column: str) -> Rule:
+    """Rule: ``column`` is set."""
+    return Rule(f"{column}_not_null", f"{column} is set", f"t.{column} is null", (column,))
+
+
+def accepted_range(column: str, min_value: Optional[int] = None, max_value: Optional[int] = None) -> Rule:
+    """Rule: ``column`` is null or between the bounds."""
+    bounds = []
+    if min_value is not None:
+        bounds.append(f"t.{column} < {min_value}")
+    if max_value is not None:
+        bounds.append(f"t.{column} > {max_value}")
+    return Rule(
+        f"{column}_range",
+        f"{column} between {min_value if min_value is not None else '-inf'} and {max_value if max_value is not None else 'inf'}",
+        " or ".join(bounds),
+        (column,),
+    )
+
+
+def accepted_values(column: str, values: tuple[str, ...]) -> Rule:
+    """Rule: ``column`` is null or one of ``values``."""
+    literals = ", ".join(f"'{value}'" for value in values)
+    return Rule(f"{column}_accepted_values", f"{column} in ({', '.join(values)})", f"t.{column} not in ({literals})", (column,))
+
+
+def unique(*columns: str) -> Rule:
+    """Rule: no other row has the same (non-null) ``columns``."""
+    return Rule(
+        f"{'_'.join(columns)}_unique",
+        f"({', '.join(columns)}) is unique",
+        " and ".join(f"t.{column} is not null" for column in columns),
+        columns,
+        unique=columns,
+    )
+
+
+def references(column: str, table: str, referenced_column: str, name: Optional[str] = None) -> Rule:
+    """Rule: ``column`` is null or exists in ``table`` (no orphan row)."""
+    alias = f"ref_{column}"
+    return Rule(
+        name or f"{column}_references_{table.split('.')[-1]}",
+        f"{column} exists in {table}",
+        f"t.{column} is not null and {alias}.{referenced_column} is null",
+        (column,),
+        join=f"left join {table} {alias} on {alias}.{referenced_column} = t.{column}",
+    )
+
+
+def table_rules() -> list[TableRules]:
+    """Rules of every validated table (those of the marts mirror the dbt tests and CHECK constraints)."""
+    marts_teams = f"{MARTS_SCHEMA}.teams"
+    return [
+        TableRules(RAW_SCHEMA, "raw_fixtures", ("fixture_id", "season"), "_dlt_load_id", (
+            not_null("fixture_id"),
+            not_null("season"),
+            not_null("data"),
+            unique("fixture_id", "season"),
+            Rule(
+                "home_away_different",
+                "home and away teams differ",
+                "t.data->'teams'->'home'->>'id' = t.data->'teams'->'away'->>'id'",
+            ),
+        )),
+        TableRules(RAW_SCHEMA, "raw_team_info", ("team_id",), "_dlt_load_id", (
+            not_null("team_id"),
+            not_null("team_name"),
+            unique("team_id"),
+        )),
+        TableRules(RAW_SCHEMA, "raw_players", ("player_id", "team_id"), "_dlt_load_id", (
+            not_null("player_id"),
+            not_null("team_id"),
+            unique("player_id", "team_id"),
+        )),
+        TableRules(MARTS_SCHEMA, "teams", ("team_id",), "source_load_id", (
+            not_null("team_id"),
+            not_null("team_name"),
+            unique("team_id"),
+            accepted_range("team_founded", 1850, date.today().year),
+        )),
+        TableRules(MARTS_SCHEMA, "players", ("player_id",), "source_load_id", (
+            not_null("player_id"),
+            not_null("player_name"),
+            unique("player_id"),
+            references("team_id", marts_teams, "team_id"),
+            accepted_range("age", 15, 50),
+            accepted_values("position", PLAYER_POSITIONS),
+        )),
+        TableRules(MARTS_SCHEMA, "fixtures", ("fixture_id", "season"), "source_load_id", (
+            not_null("fixture_id"),
+            not_null("fixture_date"),
+            not_null("home_team_id"),
+            not_null("away_team_id"),
+            unique("fixture_id", "season"),
+            references("home_team_id", marts_teams, "team_id"),
+            references("away_team_id", marts_teams, "team_id"),
+            Rule("home_away_different", "home and away teams differ", "t.home_team_id = t.away_team_id", ("home_team_id", "away_team_id")),
+            Rule(
+                "scores_positive",
+                "goals are positive",
+                "t.goals_home < 0 or t.goals_away < 0",
+                ("goals_home", "goals_away"),
+            ),
+            accepted_values("status", FIXTURE_STATUSES),
+        )),
+    ]
+
+
+def compile_validation(table: TableRules, new_loads_only: bool = False) -> str:
+    """
+    SQL validating every rule of ``table`` in one scan.
+
+    The query returns one row: the rows validated, then the violation count
+    and sample rows (JSON array) of each rule, in the order of the rules.
+    With ``new_loads_only``, it takes the load ids as parameter.
+
+    Args:
+        table: Rules of the table
+        new_loads_only: Only validate the rows of some loads (``%(load_ids)s``)
+
+    Returns:
+        The query
+    """
+    relation = table.name
+    columns = list(dict.fromkeys([*table.key, *(column for rule in table.rules for column in rule.columns)]))
+    # The JSON column is only read by the rules, samples show the key
+    sample_columns = [column for column in columns if column != "data"]
+
+    flags = []
+    for index, rule in enumerate(table.rules):
+        violation = rule.violation
+        if rule.unique:
+            key = ", ".join(f"t.{column}" for column in rule.unique)
+            if new_loads_only:
+                # Duplicates may be older rows: look the key up in the whole table
+                others = ", ".join(f"o.{column}" for column in rule.unique)
+                duplicate = (
+                    f"exists (select 1 from {relation} o where ({others}) = ({key}) "
+                    f"and (o.tableoid, o.ctid) <> (t.tableoid, t.ctid))"
+                )
+            else:
+                duplicate = f"count(*) over (partition by {key}) > 1"
+            violation = f"({violation}) and {duplicate}"
+        flags.append(f"({violation}) as violation_{index}")
+
+    joins = "\n".join(dict.fromkeys(rule.join for rule in table.rules if rule.join))
+    where = f"where t.{table.load_column} = any(%(load_ids)s)" if new_loads_only else ""
+
+    # Violations of each rule so far, in scan order: a running count needs no
+    # sort, and only the rows it numbers up to SAMPLE_SIZE are aggregated
+    seen = [
+        f"count(*) filter (where violation_{index}) over (rows unbounded preceding) as seen_{index}"
+        for index in range(len(table.rules))
+    ]
+    sample = "jsonb_build_object(" + ", ".join(f"'{column}', {column}" for column in sample_columns) + ")"
+    aggregates = ["count(*)"]
+    for index, rule in enumerate(table.rules):
+        aggregates.append(f"count(*) filter (where violation_{index})")
+        aggregates.append(
+            f"coalesce(jsonb_agg({sample}) filter (where violation_{index} and seen_{index} <= {SAMPLE_SIZE}), '[]'::jsonb)"
+        )
+
+    return "\n".join([
+        "select",
+        "    " + ",\n    ".join(aggregates),
+        "from (",
+        "    select checked.*,",
+        "        " + ",\n        ".join(seen),
+        "    from (",
+        "        select " + ", ".join(f"t.{column}" for column in sample_columns) + ",",
+        "            " + ",\n            ".join(flags),
+        f"        from {relation} t",
+        f"        {joins}",
+        f"        {where}",
+        # Keeps the flags computed once per row, not inlined into every expression using them
+        "        offset 0",
+        "    ) checked",
+        ") counted",
+    ])
+
+
+def validate_table(
+    connection: psycopg2.extensions.connection,
+    table: TableRules,
+    new_loads_only: bool = False,
+    record_loads: bool = True,
+) -> Optional[TableValidation]:
+    """
+    Validate every rule of a table in one scan.
+
+    With ``new_loads_only``, the loads validated are recorded with the
+    results' transaction: the next validation of the table starts after them.
+    A validation of some of the table's rules only must not record them, or
+    the other rules would never see those loads.
+
+    Args:
+        connection: Connection to the data database
+        table: Rules of the table
+        new_loads_only: Only validate the rows of the loads completed since
+            the table was last validated
+        record_loads: Record the loads validated (with ``new_loads_only``),
+            only when ``table`` has every rule of the table
+
+    Returns:
+        Per-rule violations, None when the table does not exist yet
+    """
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute("select to_regclass(%s) is not null", (table.name,))
+        if not cursor.fetchone()[0]:
+            return None
+
+        load_ids: list[str] = []
+        loads: dict[str, Any] = {}
+        if new_loads_only:
+            load_ids, loads = completed_loads(cursor, _validated_loads(cursor, table))
+
+        cursor.execute(compile_validation(table, new_loads_only), {"load_ids": load_ids})
+        row = cursor.fetchone()
+        if new_loads_only and record_loads:
+            _save_validated_loads(cursor, table, loads)
+    connection.commit()
+
+    results = [
+        RuleResult(rule, violations=row[1 + 2 * index], samples=row[2 + 2 * index])
+        for index, rule in enumerate(table.rules)
+    ]
+    return TableValidation(
+        table=table,
+        rows=row[0],
+        seconds=time.perf_counter() - started,
+        new_loads_only=new_loads_only,
+        load_ids=load_ids,
+        results=results,
+    )
+
+
+def _validated_loads(cursor: psycopg2.extensions.cursor, table: TableRules) -> dict[str, Any]:
+    """Loads validated so far in ``table`` (see ``quantfoot.loads``), empty on its first validation."""
+    cursor.execute(sql.SQL("create schema if not exists {}").format(sql.Identifier(RAW_SCHEMA)))
+    cursor.execute(
+        sql.SQL(
+            """
+            create table if not exists {} (
+                table_name varchar primary key,
+                inserted_at timestamptz,
+                load_ids varchar[] not null default '{{}}',
+                validated_at timestamptz not null default now()
+            )
+            """
+        ).format(sql.Identifier(RAW_SCHEMA, WATERMARKS_TABLE))
+    )
+    cursor.execute(
+        sql.SQL("select inserted_at, load_ids from {} where table_name = %s").format(
+            sql.Identifier(RAW_SCHEMA, WATERMARKS_TABLE)
+        ),
+        (table.name,),
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return {}
+    return {"inserted_at": row[0].isoformat() if row[0] else None, "load_ids": row[1]}
+
+
+def _save_validated_loads(cursor: psycopg2.extensions.cursor, table: TableRules, loads: dict[str, Any]) -> None:
+    cursor.execute(
+        sql.SQL(
+            """
+            insert into {} as w (table_name, inserted_at, load_ids)
+            values (%s, %s, %s)
+            on conflict (table_name) do update set
+                inserted_at = excluded.inserted_at,
+                load_ids = excluded.load_ids,
+                validated_at = now()
+            """
+        ).format(sql.Identifier(RAW_SCHEMA, WATERMARKS_TABLE)),
+        (table.name, loads["inserted_at"], loads["load_ids"]),
+    )
+
+
+def main() -> None:
+    tables = {table.name: table for table in table_rules()}
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("tables", nargs="*", help=f"Tables to validate (default: all): {', '.join(tables)}")
+    parser.add_argument(
+        "--new-loads-only",
+        action="store_true",
+        help="Only validate the rows of the loads completed since the last validation (and record them)",
+    )
+    args = parser.parse_args()
+    unknown = sorted(set(args.tables) - set(tables))
+    if unknown:
+        parser.error(f"unknown tables: {', '.join(unknown)}")
+
+    failed = False
+    connection = connect("quantfoot-validation")
+    try:
+        for name in args.tables or tables:
+            validation = validate_table(connection, tables[name], args.new_loads_only)
+            if validation is None:
+                print(f"{name}: missing")
+                continue
+            print(f"{name}: {validation.rows} rows in {validation.seconds:.3f}s")
+            for result in validation.results:
+                print(f"  {'ok' if result.passed else 'FAIL'} {result.rule.name}: {result.violations}")
+                for sample in result.samples:
+                    print(f"       {sample}")
+                failed = failed or not result.passed
+    finally:
+        connection.close()
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
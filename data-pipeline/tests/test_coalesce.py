@@ -0,0 +1,92 @@
+"""
+Tests of the request coalescer.
+"""
+import threading
+from typing import Any, Optional
+
+from quantfoot.sources.api_football.client import APIFootballClient
+from quantfoot.sources.api_football.coalesce import RequestCoalescer
+
+# Seconds a test waits for another thread before failing
+TIMEOUT = 5
+
+
+class SignallingCoalescer(RequestCoalescer):
+    """RequestCoalescer setting ``coalesced`` once a caller reuses another's request."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.coalesced = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @hits.setter
+    def hits(self, value: int) -> None:
+        self._hits = value
+        if value:
+            self.coalesced.set()
+
+
+def test_in_flight_request_is_shared_but_not_kept():
+    coalescer = SignallingCoalescer()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(TIMEOUT)
+        return {"page": len(calls)}
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(coalescer.fetch("key", fetch, keep=False)))
+    owner.start()
+    assert started.wait(TIMEOUT)
+    waiter = threading.Thread(target=lambda: results.append(coalescer.fetch("key", fetch, keep=False)))
+    waiter.start()
+    # The waiter blocks on the owner's request
+    assert coalescer.coalesced.wait(TIMEOUT)
+    release.set()
+    owner.join(TIMEOUT)
+    waiter.join(TIMEOUT)
+    assert not owner.is_alive() and not waiter.is_alive()
+
+    assert results == [{"page": 1}, {"page": 1}]
+    # Not kept: the next caller sends the request again
+    assert coalescer.fetch("key", fetch, keep=False) == {"page": 2}
+    assert len(calls) == 2
+
+
+def test_kept_results_are_bounded():
+    coalescer = RequestCoalescer(max_results=2)
+    for key in ("a", "b", "c"):
+        coalescer.fetch(key, lambda: key)
+
+    # "a" was the least recently used
+    assert coalescer.fetch("a", lambda: "a again") == "a again"
+    assert coalescer.fetch("c", lambda: "c again") == "c"
+    assert coalescer.hits == 1
+
+
+def test_client_keeps_shared_results_only():
+    client = APIFootballClient(api_key="test", coalesced_results=1)
+    sent: list[tuple[str, dict[str, Any]]] = []
+
+    def send(endpoint: str, params: dict[str, Any], resource: Optional[str]) -> dict[str, Any]:
+        sent.append((endpoint, params))
+        return {"response": [{"endpoint": endpoint}], "paging": {"current": 1, "total": 1}}
+
+    client._send = send
+    try:
+        client.get("teams", {"id": 33})
+        # Results no other resource reads do not push the shared one out
+        for team_id in range(10):
+            client.get("players/squads", {"team": team_id})
+        client.get("teams", {"id": 33})
+    finally:
+        client.close()
+
+    assert [request for request in sent if request[0] == "teams"] == [("teams", {"id": 33})]
+    assert client.coalesced_requests == 1
@@ -0,0 +1,24 @@
+"""
+Tests of the metadata added to the results of the instrumented runs.
+"""
+from dagster import AssetCheckResult, AssetKey, DataVersion, MaterializeResult
+
+from quantfoot.instrumentation import _with_metadata
+
+
+def test_with_metadata_keeps_every_field():
+    check = AssetCheckResult(asset_key=AssetKey("raw_fixtures"), check_name="fixture_id_not_null", passed=True)
+    result = MaterializeResult(
+        asset_key=AssetKey("raw_fixtures"),
+        metadata={"rows_loaded": 10},
+        check_results=[check],
+        data_version=DataVersion("abc"),
+        tags={"season": "2024"},
+    )
+
+    copy = _with_metadata(result, {"items": 12})
+
+    assert copy.metadata == {"rows_loaded": 10, "items": 12}
+    assert copy.check_results == [check]
+    assert copy.data_version == DataVersion("abc")
+    assert copy.tags == {"season": "2024"}
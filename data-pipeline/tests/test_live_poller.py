@@ -0,0 +1,80 @@
+"""
+Tests of the live poller's cycles against a stubbed API.
+"""
+import asyncio
+from typing import Any, Optional
+
+from quantfoot.live.poller import LivePoller
+from quantfoot.sources.api_football.client import APIFootballClient
+
+FIXTURE_ID = 1035000
+
+
+def _fixture(elapsed: int, goals_home: int) -> dict[str, Any]:
+    return {
+        "fixture": {"id": FIXTURE_ID, "timestamp": 0, "status": {"short": "1H", "elapsed": elapsed}},
+        "teams": {"home": {"id": 33}, "away": {"id": 34}},
+        "goals": {"home": goals_home, "away": 0},
+        "score": {},
+        "events": [],
+    }
+
+
+class StubStore:
+    """FixtureStore recording what is published."""
+
+    def __init__(self) -> None:
+        self.published: list[list[dict[str, Any]]] = []
+
+    def watched_fixtures(self, lead_minutes: int) -> dict[int, dict[str, Any]]:
+        return {}
+
+    def next_kickoff(self) -> Optional[Any]:
+        return None
+
+    def publish(self, changes: list[dict[str, Any]], team_ids: list[int]) -> None:
+        self.published.append(changes)
+
+
+def _poll_twice(client: APIFootballClient) -> tuple[StubStore, list[dict[str, Any]]]:
+    payloads = [
+        {"response": [_fixture(elapsed=10, goals_home=0)], "paging": {"current": 1, "total": 1}},
+        {"response": [_fixture(elapsed=11, goals_home=1)], "paging": {"current": 1, "total": 1}},
+    ]
+    sent: list[dict[str, Any]] = []
+
+    def send(endpoint: str, params: dict[str, Any], resource: Optional[str]) -> dict[str, Any]:
+        sent.append(params)
+        return payloads[len(sent) - 1]
+
+    client._send = send
+    store = StubStore()
+    poller = LivePoller(client, store, mode="all")
+    asyncio.run(poller.poll_once())
+    asyncio.run(poller.poll_once())
+    return store, sent
+
+
+def test_second_poll_publishes_new_payload():
+    client = APIFootballClient(api_key="test", coalesce=False)
+    try:
+        store, sent = _poll_twice(client)
+    finally:
+        client.close()
+
+    assert sent == [{"live": "all"}, {"live": "all"}]
+    assert [change["changed"] for change in store.published[0]] == [["new"]]
+    assert [change["changed"] for change in store.published[1]] == [["elapsed", "goals"]]
+    assert store.published[1][0]["goals"] == {"home": 1, "away": 0}
+
+
+def test_coalescing_client_is_not_served_previous_cycle():
+    # A client shared with other code may coalesce: each cycle still hits the API
+    client = APIFootballClient(api_key="test")
+    try:
+        store, sent = _poll_twice(client)
+    finally:
+        client.close()
+
+    assert len(sent) == 2
+    assert store.published[1][0]["elapsed"] == 11
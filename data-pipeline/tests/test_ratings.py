@@ -0,0 +1,75 @@
+"""
+Tests of the Elo and Dixon-Coles models.
+"""
+import numpy as np
+
+from quantfoot.analytics.dixon_coles import DixonColesParameters, fit_dixon_coles, outcome_probabilities
+from quantfoot.analytics.elo import EloParameters, EloState, update_elo
+from quantfoot.analytics.matches import Matches
+
+ELO = EloParameters(initial=1500.0, k=20.0, home_advantage=0.0, half_life_days=730.0)
+
+
+def _matches(day, home, away, goals_home, goals_away, n_teams):
+    return Matches.from_columns(
+        fixture_id=np.arange(len(day)),
+        day=np.asarray(day, dtype=np.float64),
+        home_team_id=np.asarray(home),
+        away_team_id=np.asarray(away),
+        goals_home=np.asarray(goals_home),
+        goals_away=np.asarray(goals_away),
+        team_ids=np.arange(n_teams),
+    )
+
+
+def test_late_result_is_applied_without_decay():
+    state = EloState.initial(2, ELO)
+    state, _, _ = update_elo(state, _matches([1000.0], [0], [1], [1], [0], 2), ELO)
+    after_win = state.ratings.copy()
+
+    # A result dated before the one already rated
+    state, home_before, away_before = update_elo(state, _matches([0.0], [1], [0], [0], [0], 2), ELO)
+
+    # Pre-match ratings are the current ones, not pushed away from the mean
+    assert home_before[0] == after_win[1]
+    assert away_before[0] == after_win[0]
+    assert np.all(np.abs(state.ratings - ELO.initial) <= np.abs(after_win - ELO.initial))
+    # The last match day does not move backwards
+    assert np.all(state.last_day == 1000.0)
+
+
+def test_ratings_decay_towards_the_mean_between_matches():
+    state = EloState.initial(2, ELO)
+    state, _, _ = update_elo(state, _matches([0.0], [0], [1], [1], [0], 2), ELO)
+    gap = state.ratings[0] - ELO.initial
+
+    state, home_before, _ = update_elo(state, _matches([730.0], [0], [1], [0], [0], 2), ELO)
+
+    np.testing.assert_allclose(home_before[0] - ELO.initial, gap / 2)
+
+
+def test_dixon_coles_recovers_the_simulated_strengths():
+    rng = np.random.default_rng(7)
+    n_teams = 8
+    attack = np.linspace(-0.4, 0.4, n_teams)
+    defence = -attack / 2
+    intercept, home_advantage = 0.1, 0.3
+
+    # Double round robins, played every few days
+    home, away = np.array([(h, a) for h in range(n_teams) for a in range(n_teams) if h != a] * 10).T
+    day = np.sort(rng.uniform(0.0, 300.0, len(home)))
+    goals_home = rng.poisson(np.exp(intercept + home_advantage + attack[home] + defence[away]))
+    goals_away = rng.poisson(np.exp(intercept + attack[away] + defence[home]))
+    matches = _matches(day, home, away, goals_home, goals_away, n_teams)
+
+    fit = fit_dixon_coles(matches, reference_day=300.0, parameters=DixonColesParameters(half_life_days=1e6))
+
+    assert fit.matches == len(home)
+    assert fit.iterations < DixonColesParameters().max_iterations
+    assert abs(fit.home_advantage - home_advantage) < 0.1
+    np.testing.assert_allclose(fit.attack, attack - attack.mean(), atol=0.15)
+    assert np.all(np.diff(fit.attack) > -0.15)
+
+    p_home, p_draw, p_away = outcome_probabilities(*fit.expected_goals(np.array([7, 0]), np.array([0, 7])), fit.rho)
+    np.testing.assert_allclose(p_home + p_draw + p_away, 1.0, atol=1e-6)
+    assert p_home[0] > p_away[0] and p_away[1] > p_home[1]